@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from app.models import CustomUser, UserText  # Note: StoredResume removed
+from app.models import CustomUser, ResearchJob, UserText  # Note: StoredResume removed
 
 
 @admin.register(UserText)
@@ -13,3 +13,10 @@ class UserTextAdmin(admin.ModelAdmin):
 class CustomUserAdmin(admin.ModelAdmin):
     list_display = ("id", "username", "email")
     ordering = ("-id",)
+
+
+@admin.register(ResearchJob)
+class ResearchJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "state", "worker_id", "attempts", "created_at", "finished_at")
+    list_filter = ("kind", "state")
+    ordering = ("-created_at",)
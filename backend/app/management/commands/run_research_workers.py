@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.services.job_queue import JobWorkerPool
+
+
+class Command(BaseCommand):
+    help = "Run a pool of research job workers that claim jobs from the shared database queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Number of concurrent research runs.")
+        parser.add_argument("--poll-interval", type=float, default=None, help="Seconds between idle polls.")
+
+    def handle(self, *args, **options):
+        pool = JobWorkerPool(options["workers"], poll_interval=options["poll_interval"])
+        pool.start()
+        self.stdout.write(self.style.SUCCESS(f"Research workers running on {pool.node_id}. Press Ctrl+C to stop."))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping research workers...")
+            pool.stop(timeout=5)
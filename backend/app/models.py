@@ -1,3 +1,5 @@
+import uuid
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
@@ -20,3 +22,39 @@ class UserText(models.Model):
 
     def __str__(self) -> str:
         return f"UserText #{self.id} - {self.content[:30]}"
+
+
+class ResearchJob(models.Model):
+    """
+    A research run submitted through the API and executed by a background worker.
+    States mirror the Celery names the task status endpoint has always reported.
+    """
+
+    class Kind(models.TextChoices):
+        ANALYSIS = "analysis", "Analysis"
+        CHAT = "chat", "Chat"
+
+    class State(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        STARTED = "STARTED", "Started"
+        SUCCESS = "SUCCESS", "Success"
+        FAILURE = "FAILURE", "Failure"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=32, choices=Kind.choices)
+    inputs = models.JSONField(default=dict)
+    state = models.CharField(max_length=16, choices=State.choices, default=State.PENDING)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    worker_id = models.CharField(max_length=128, blank=True, default="")
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["state", "created_at"], name="researchjob_state_created")]
+
+    def __str__(self) -> str:
+        return f"ResearchJob {self.id} ({self.kind}, {self.state})"
@@ -6,19 +6,15 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from app.models import ResearchJob
 from app.serializers import ChatSerializer
-from app.tools.current_date_tool import CurrentDateTool
-from crewai_config.crew import LatestAIResearchCrew
+from app.services.job_queue import submit_job
+from app.services.research_runner import run_chat
 
 # Toggle authentication based on an environment variable.
 ENABLE_AUTH = os.getenv("ENABLE_AUTH", "false").lower() in ["true", "1", "yes"]
 
 
-class SafeDict(dict):
-    def __missing__(self, key):
-        return ""
-
-
 class ResearchView(APIView):
     permission_classes = [permissions.IsAuthenticated] if ENABLE_AUTH else [permissions.AllowAny]
     serializer_class = ChatSerializer
@@ -28,17 +24,18 @@ class ResearchView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        inputs = serializer.validated_data
-        safe_inputs = SafeDict(inputs)
+        inputs = dict(serializer.validated_data)
+        background = inputs.pop("background", False)
 
-        safe_inputs.setdefault("url", "")
-        safe_inputs["query"] = safe_inputs.get("message", "")
-        safe_inputs["current_date"] = CurrentDateTool()._run().strip()  # Inject current date
+        if background:
+            job = submit_job(ResearchJob.Kind.CHAT, inputs)
+            return Response(
+                {"task_id": str(job.id), "state": job.state, "status_url": f"/api/tasks/{job.id}/"},
+                status=status.HTTP_202_ACCEPTED,
+            )
 
         try:
-            crew_instance = LatestAIResearchCrew(inputs=safe_inputs)
-            crew = crew_instance.crew()
-            result = crew.kickoff(inputs=safe_inputs)
+            result = run_chat(inputs)
         except Exception as e:
             error_trace = traceback.format_exc()
             return Response(
@@ -0,0 +1,29 @@
+# backend/app/routers/metrics_router.py
+
+import os
+
+from django.http import HttpResponse
+from django.urls import path
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+from app.services.metrics import registry
+
+ENABLE_AUTH = os.getenv("ENABLE_AUTH", "false").lower() in ["true", "1", "yes"]
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsView(APIView):
+    # Toggle auth: if ENABLE_AUTH is true, require authenticated access; else allow any.
+    permission_classes = [permissions.IsAuthenticated] if ENABLE_AUTH else [permissions.AllowAny]
+
+    @extend_schema(responses={(200, "text/plain"): str})
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+urlpatterns = [
+    path("", MetricsView.as_view(), name="metrics_view"),
+]
@@ -1,16 +1,24 @@
 # backend/app/routers/research_analysis_router.py
 
-import os
-import re
+import json
+import logging
+import threading
+import uuid
 
+from django.http import StreamingHttpResponse
 from django.urls import path
 from drf_spectacular.utils import extend_schema
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from app.models import ResearchJob
 from app.serializers import AnalysisQuerySerializer
-from crewai_config.crew import LatestAIResearchCrew
+from app.services.job_queue import submit_job
+from app.services.research_runner import run_analysis
+from app.services.run_events import run_event_broker
+
+logger = logging.getLogger(__name__)
 
 
 class ResearchAnalysisView(APIView):
@@ -42,65 +50,125 @@ class ResearchAnalysisView(APIView):
                             },
                         },
                     },
+                    "cache": {
+                        "type": "object",
+                        "properties": {
+                            "hit": {"type": "boolean"},
+                            "similarity": {"type": "number"},
+                            "matched_query": {"type": "string"},
+                        },
+                    },
+                    "timings": {
+                        "type": "object",
+                        "properties": {
+                            "total_ms": {"type": "number"},
+                            "stages": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "stage": {"type": "string"},
+                                        "start_ms": {"type": "number"},
+                                        "duration_ms": {"type": "number"},
+                                    },
+                                },
+                            },
+                        },
+                    },
                 },
-            }
+            },
+            202: {
+                "type": "object",
+                "properties": {
+                    "task_id": {"type": "string"},
+                    "state": {"type": "string"},
+                    "status_url": {"type": "string"},
+                },
+            },
         },
     )
     def post(self, request):
-        data = request.data
-        query = data.get("query", "")
-        max_links = data.get("max_links", 3)
-        if not query:
-            return Response({"error": "Query is required."}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            # Pass the max_links parameter along with the query
-            crew_instance = LatestAIResearchCrew(inputs={"query": query, "max_links": max_links})
-            crew_obj = crew_instance.crew()
-            final_output = crew_obj.kickoff()
-
-            log_file = "output_log.txt"
-            if os.path.exists(log_file):
-                with open(log_file, encoding="utf-8", errors="ignore") as f:
-                    log_data = f.read()
-                raw_entries = re.split(
-                    r"(?=^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}:)",
-                    log_data,
-                    flags=re.MULTILINE,
-                )
-                raw_entries = [entry.strip() for entry in raw_entries if entry.strip()]
-                seen = set()
-                agent_workflow = []
-                for entry in raw_entries:
-                    match = re.search(r'task_name="([^"]+)"', entry)
-                    content_match = re.search(r'task="([^"]+)"', entry)
-                    if match and content_match:
-                        key = (match.group(1), content_match.group(1))
-                        if key not in seen:
-                            seen.add(key)
-                            agent_workflow.append(entry)
-                    else:
-                        agent_workflow.append(entry)
-            else:
-                agent_workflow = crew_instance.collected_steps
-
-            aggregator_links = crew_instance.aggregator_links
-            final_answer = crew_instance.final_answer
+        serializer = AnalysisQuerySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        query, max_links, fresh = data["query"], data["max_links"], data["fresh"]
 
+        if data["background"]:
+            job = submit_job(ResearchJob.Kind.ANALYSIS, {"query": query, "max_links": max_links, "fresh": fresh})
             return Response(
-                {
-                    "agentWorkflow": agent_workflow,
-                    "finalAnalysis": {
-                        "summary": [final_answer],
-                        "confidence": getattr(final_output, "confidence", 0.92),
-                    },
-                    "search_links": aggregator_links,
-                },
-                status=status.HTTP_200_OK,
+                {"task_id": str(job.id), "state": job.state, "status_url": f"/api/tasks/{job.id}/"},
+                status=status.HTTP_202_ACCEPTED,
             )
+
+        try:
+            # Pass the max_links parameter along with the query
+            return Response(run_analysis(query, max_links, fresh=fresh), status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class ResearchAnalysisStreamView(APIView):
+    """
+    Runs the research crew on a background thread and streams its progress.
+
+    Emits Server-Sent Events by default (``step``, ``tool_result``, ``search_links``,
+    ``source``, ``final_answer``, then ``result`` or ``error``). Pass ``?stream=ndjson``
+    to receive one JSON object per line instead.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(request=AnalysisQuerySerializer, responses={200: {"type": "string"}})
+    def post(self, request):
+        serializer = AnalysisQuerySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        query, max_links, fresh = data["query"], data["max_links"], data["fresh"]
+
+        run_id = uuid.uuid4().hex
+        # The broker keeps each run's history, so nothing published before the client reads is lost.
+        events = run_event_broker.subscribe(run_id)
+        worker = threading.Thread(target=_run_in_background, args=(query, max_links, run_id, fresh), daemon=True)
+        worker.start()
+
+        if request.query_params.get("stream") == "ndjson":
+            response = StreamingHttpResponse(_ndjson_stream(run_id, events), content_type="application/x-ndjson")
+        else:
+            response = StreamingHttpResponse(_sse_stream(run_id, events), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # Stop nginx from buffering the stream
+        response["X-Run-Id"] = run_id
+        return response
+
+
+def _run_in_background(query, max_links, run_id, fresh=False):
+    try:
+        run_analysis(query, max_links, run_id=run_id, fresh=fresh)
+    except Exception:
+        # run_analysis has already published the error event to the stream.
+        logger.exception("Streaming research run %s failed", run_id)
+
+
+def _sse_stream(run_id, events):
+    yield f"event: run\ndata: {json.dumps({'run_id': run_id})}\n\n"
+    for event in events:
+        if event is None:
+            yield ": keep-alive\n\n"
+            continue
+        payload = json.dumps(event.data, default=str)
+        yield f"id: {event.seq}\nevent: {event.type}\ndata: {payload}\n\n"
+
+
+def _ndjson_stream(run_id, events):
+    yield json.dumps({"type": "run", "data": {"run_id": run_id}}) + "\n"
+    for event in events:
+        if event is None:
+            yield "\n"
+            continue
+        yield json.dumps(event.to_dict(), default=str) + "\n"
+
+
 urlpatterns = [
     path("", ResearchAnalysisView.as_view(), name="research_analysis"),
+    path("stream/", ResearchAnalysisStreamView.as_view(), name="research_analysis_stream"),
 ]
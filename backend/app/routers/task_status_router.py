@@ -2,12 +2,16 @@
 
 import os
 
-from celery.result import AsyncResult
+from django.core.exceptions import ValidationError
 from django.urls import path
+from drf_spectacular.utils import extend_schema
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from app.models import ResearchJob
+from app.serializers import TaskStatusSerializer
+
 ENABLE_AUTH = os.getenv("ENABLE_AUTH", "false").lower() in ["true", "1", "yes"]
 
 
@@ -15,14 +19,23 @@ class TaskStatusView(APIView):
     # Toggle auth: if ENABLE_AUTH is true, require authenticated access; else allow any.
     permission_classes = [permissions.IsAuthenticated] if ENABLE_AUTH else [permissions.AllowAny]
 
+    @extend_schema(responses={200: TaskStatusSerializer})
     def get(self, request, task_id):
-        result = AsyncResult(task_id)
+        try:
+            job = ResearchJob.objects.get(pk=task_id)
+        except (ResearchJob.DoesNotExist, ValidationError):
+            return Response({"error": "Task not found."}, status=status.HTTP_404_NOT_FOUND)
+
         response_data = {
-            "task_id": task_id,
-            "state": result.state,
-            "result": result.result if result.ready() else None,
+            "task_id": str(job.id),
+            "state": job.state,
+            "result": job.result if job.state == ResearchJob.State.SUCCESS else None,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
         }
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(TaskStatusSerializer(response_data).data, status=status.HTTP_200_OK)
 
 
 urlpatterns = [
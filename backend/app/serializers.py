@@ -3,6 +3,22 @@ from rest_framework import serializers
 
 class ChatSerializer(serializers.Serializer):
     message = serializers.CharField(required=True, max_length=1024)
+    route = serializers.ChoiceField(
+        choices=["auto", "direct", "research"],
+        required=False,
+        default="auto",
+        help_text="auto lets the router send simple questions to a direct LLM answer; direct or research forces one.",
+    )
+    background = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Queue the run and return a task id to poll at /api/tasks/<task_id>/.",
+    )
+    fresh = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Skip the answer cache and run the crew even if a similar question was answered today.",
+    )
 
 
 class AnalysisQuerySerializer(serializers.Serializer):
@@ -11,3 +27,26 @@ class AnalysisQuerySerializer(serializers.Serializer):
         max_length=1024,
         help_text="The search query for the research workflow.",
     )
+    max_links = serializers.IntegerField(
+        required=False, default=3, min_value=1, max_value=10, help_text="Maximum number of links to fetch."
+    )
+    background = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Queue the run and return a task id to poll at /api/tasks/<task_id>/.",
+    )
+    fresh = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Skip the answer cache and run the crew even if a similar question was answered today.",
+    )
+
+
+class TaskStatusSerializer(serializers.Serializer):
+    task_id = serializers.CharField()
+    state = serializers.CharField()
+    result = serializers.JSONField(allow_null=True)
+    error = serializers.CharField(allow_blank=True)
+    created_at = serializers.DateTimeField()
+    started_at = serializers.DateTimeField(allow_null=True)
+    finished_at = serializers.DateTimeField(allow_null=True)
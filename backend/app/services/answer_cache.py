@@ -0,0 +1,98 @@
+"""
+Semantic cache of synthesized answers.
+
+Near-identical questions asked on the same day ("latest AI news", "AI news today")
+reuse the earlier answer instead of running the whole crew again. Entries are
+scoped by kind (analysis or chat), ``current_date`` and the request options that
+shape the crew's inputs (``max_links``, ...); a lookup embeds the query and returns
+the stored payload of the most similar earlier query when the cosine similarity
+reaches ``threshold``.
+
+Every lookup costs an embedding call, so the cache is opt-in (``ANSWER_CACHE_ENABLED``).
+"""
+
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+
+from app.services.cache import CacheStats, SQLiteCache, cache_path
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        ttl_seconds: float | None = 86400,
+        max_entries: int | None = 5000,
+        path: str | Path | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.store = SQLiteCache(
+            path or cache_path("answers"), table="answers", ttl_seconds=ttl_seconds, max_entries=max_entries
+        )
+        self.stats = CacheStats("answers")
+
+    @staticmethod
+    def scope(kind: str, current_date: str, options: dict | None = None) -> str:
+        """Key prefix of the entries a lookup compares against; ``options`` go in as a hash."""
+        encoded = json.dumps(options or {}, sort_keys=True).encode("utf-8")
+        return f"{kind}:{current_date}:{hashlib.sha256(encoded).hexdigest()[:16]}:"
+
+    def lookup(
+        self, kind: str, current_date: str, query_vector: np.ndarray, options: dict | None = None
+    ) -> dict | None:
+        """
+        The best entry for ``query_vector`` among those stored with the same ``options``, as
+        ``{"query", "payload", "similarity"}``, or None when nothing reaches the threshold.
+        """
+        try:
+            rows = self.store.scan(self.scope(kind, current_date, options))
+        except sqlite3.Error as e:
+            print(f"[AnswerCache] Read failed: {e}")
+            rows = []
+        entries = [json.loads(value) for _, value in rows]
+        if entries:
+            matrix = np.vstack(
+                [np.frombuffer(base64.b64decode(entry["vector"]), dtype=np.float32) for entry in entries]
+            )
+            query_vector = np.asarray(query_vector, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+            scores = (matrix @ query_vector) / np.maximum(norms, np.finfo(np.float32).tiny)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                self.stats.incr("hits")
+                entry = entries[best]
+                return {"query": entry["query"], "payload": entry["payload"], "similarity": float(scores[best])}
+        self.stats.incr("misses")
+        return None
+
+    def put(
+        self,
+        kind: str,
+        current_date: str,
+        query: str,
+        query_vector: np.ndarray,
+        payload: dict,
+        options: dict | None = None,
+    ) -> None:
+        key = self.scope(kind, current_date, options) + hashlib.sha256(query.encode("utf-8")).hexdigest()
+        vector = base64.b64encode(np.asarray(query_vector, dtype=np.float32).tobytes()).decode("ascii")
+        entry = {"query": query, "options": options or {}, "vector": vector, "payload": payload}
+        value = json.dumps(entry).encode("utf-8")
+        try:
+            self.store.set(key, value)
+        except sqlite3.Error as e:
+            print(f"[AnswerCache] Write failed: {e}")
+
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() in ["true", "1", "yes"]
+answer_cache = AnswerCache(
+    threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400")),
+    max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000")),
+)
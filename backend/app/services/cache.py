@@ -0,0 +1,287 @@
+"""
+Small caching building blocks shared by the research tools.
+
+- ``LRUCache``: in-process, thread-safe LRU with a TTL.
+- ``SQLiteCache``: on-disk key/value store shared by every worker process on the
+  host (WAL mode), with TTL and entry-count/byte-size eviction.
+- ``TieredCache``: an LRU in front of a SQLite cache for JSON-serialisable values,
+  with hit/miss counters.
+
+Cache files live under ``CACHE_DIR`` (default ``backend/.cache``).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from app.services.metrics import CACHE_EVENTS
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / ".cache"
+
+
+def cache_path(name: str) -> Path:
+    """Location of the SQLite file for cache ``name``."""
+    return Path(os.getenv("CACHE_DIR", DEFAULT_CACHE_DIR)) / f"{name}.sqlite3"
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters, mirrored to ``cache_events_total{cache=...}`` when named."""
+
+    def __init__(self, cache: str | None = None) -> None:
+        self.cache = cache
+        self._counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+        if self.cache:
+            CACHE_EVENTS.inc(amount, cache=self.cache, event=name)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        hits = sum(value for key, value in counts.items() if key.startswith("hits"))
+        lookups = hits + counts.get("misses", 0)
+        counts["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return counts
+
+
+class LRUCache:
+    def __init__(self, max_entries: int = 512, ttl_seconds: float | None = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl_seconds: float | None = None) -> None:
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Blob key/value store in a SQLite file. Entries expire after ``ttl_seconds``; once the
+    table holds more than ``max_entries`` rows or ``max_bytes`` of values, the oldest rows
+    are evicted.
+    """
+
+    # Run eviction once every this many writes rather than on each one.
+    EVICT_EVERY = 32
+
+    def __init__(
+        self,
+        path: str | Path,
+        table: str = "cache",
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+    ) -> None:
+        self.path = str(path)
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread, opened lazily so importing a module with a cache has no side effects.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                    "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                    "created_at REAL NOT NULL, expires_at REAL)"
+                )
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_created_at ON {self.table} (created_at)")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> bytes | None:
+        entry = self.get_with_expiry(key)
+        return entry[0] if entry else None
+
+    def get_with_expiry(self, key: str) -> tuple[bytes, float | None] | None:
+        """The live value for ``key`` and when it expires (a ``time.time()`` timestamp, None for never)."""
+        return (
+            self._connect()
+            .execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        """Fetch several keys with as few queries as possible; missing keys are left out."""
+        found: dict[str, bytes] = {}
+        now = time.time()
+        conn = self._connect()
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, value FROM {self.table} "
+                f"WHERE key IN ({placeholders}) AND (expires_at IS NULL OR expires_at > ?)",
+                (*chunk, now),
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    def scan(self, prefix: str) -> list[tuple[str, bytes]]:
+        """Every live (key, value) pair whose key starts with ``prefix``, oldest first."""
+        return (
+            self._connect()
+            .execute(
+                f"SELECT key, value FROM {self.table} WHERE substr(key, 1, ?) = ? "
+                "AND (expires_at IS NULL OR expires_at > ?) ORDER BY created_at",
+                (len(prefix), prefix, time.time()),
+            )
+            .fetchall()
+        )
+
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None:
+        self.set_many({key: value}, ttl_seconds)
+
+    def set_many(self, items: dict[str, bytes], ttl_seconds: float | None = None) -> None:
+        if not items:
+            return
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(key, value, len(value), now, expires_at) for key, value in items.items()],
+            )
+        with self._writes_lock:
+            self._writes += len(items)
+            due = self._writes >= self.EVICT_EVERY
+            if due:
+                self._writes = 0
+        if due:
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def evict(self) -> int:
+        """Drop expired rows, then the oldest rows beyond the size limits. Returns rows removed."""
+        conn = self._connect()
+        removed = 0
+        with conn:
+            removed += conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).rowcount
+            if self.max_entries is not None:
+                removed += conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                ).rowcount
+            if self.max_bytes is not None:
+                # Keep the newest rows whose running total of sizes fits in max_bytes.
+                removed += conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY created_at DESC, key) AS running "
+                    f"FROM {self.table}) WHERE running > ?)",
+                    (self.max_bytes,),
+                ).rowcount
+        return removed
+
+    def stats(self) -> dict:
+        count, total = self._connect().execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        return {"entries": count, "bytes": total}
+
+
+class TieredCache:
+    """
+    JSON values cached in an in-process LRU backed by a SQLite file shared across processes.
+    A disk hit is promoted into the LRU for the rest of the disk entry's lifetime, so a value
+    is never served for longer than ``ttl_seconds`` after it was written.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        memory_entries: int = 512,
+        disk_entries: int | None = 10_000,
+        disk_path: str | Path | None = None,
+    ) -> None:
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUCache(max_entries=memory_entries, ttl_seconds=ttl_seconds)
+        self.disk = SQLiteCache(disk_path or cache_path(name), ttl_seconds=ttl_seconds, max_entries=disk_entries)
+        self.stats = CacheStats(name)
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.incr("hits_memory")
+            return value
+        try:
+            entry = self.disk.get_with_expiry(key)
+        except sqlite3.Error as e:
+            print(f"[TieredCache:{self.name}] Disk read failed: {e}")
+            entry = None
+        if entry is not None:
+            raw, expires_at = entry
+            value = json.loads(raw)
+            self.memory.set(key, value, ttl_seconds=expires_at - time.time() if expires_at is not None else None)
+            self.stats.incr("hits_disk")
+            return value
+        self.stats.incr("misses")
+        return None
+
+    def set(self, key: str, value) -> None:
+        self.memory.set(key, value)
+        try:
+            self.disk.set(key, json.dumps(value).encode("utf-8"))
+        except sqlite3.Error as e:
+            print(f"[TieredCache:{self.name}] Disk write failed: {e}")
+        self.stats.incr("sets")
@@ -0,0 +1,102 @@
+"""
+Chunking and passage selection for long reader pages.
+
+``sliding_window_chunks`` covers the whole document with token-bounded windows:
+paragraphs are packed together up to ``chunk_tokens``, each window repeats the
+tail of the previous one, and a paragraph that is too long on its own is cut by
+tokens. ``spread_sample`` thins out the chunks of very long documents evenly
+across the whole text. ``mmr_select`` then picks the chunks to keep with Maximal
+Marginal Relevance until a token budget is spent, so every source contributes a
+predictable amount of text.
+"""
+
+import re
+
+import numpy as np
+
+from app.services.tokens import count_tokens, split_by_tokens
+
+
+def sliding_window_chunks(text: str, chunk_tokens: int = 200, overlap_tokens: int = 40) -> list[str]:
+    units = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        size = count_tokens(paragraph)
+        if size <= chunk_tokens:
+            units.append((paragraph, size))
+        else:
+            units.extend(
+                (piece, count_tokens(piece)) for piece in split_by_tokens(paragraph, chunk_tokens, overlap_tokens)
+            )
+
+    chunks: list[str] = []
+    window: list[tuple[str, int]] = []
+    window_tokens = 0
+    for unit in units:
+        if window and window_tokens + unit[1] > chunk_tokens:
+            chunks.append("\n\n".join(piece for piece, _ in window))
+            # Carry the trailing paragraphs that fit in the overlap into the next window.
+            carried: list[tuple[str, int]] = []
+            carried_tokens = 0
+            for previous in reversed(window):
+                if (
+                    carried_tokens + previous[1] > overlap_tokens
+                    or carried_tokens + previous[1] + unit[1] > chunk_tokens
+                ):
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous[1]
+            window, window_tokens = carried, carried_tokens
+        window.append(unit)
+        window_tokens += unit[1]
+    if window:
+        chunks.append("\n\n".join(piece for piece, _ in window))
+    return chunks
+
+
+def spread_sample(chunks: list[str], limit: int) -> list[str]:
+    """At most ``limit`` chunks, evenly spaced from the first to the last so no part of the document is skipped."""
+    if len(chunks) <= limit:
+        return chunks
+    positions = np.linspace(0, len(chunks) - 1, max(limit, 1)).round().astype(int)
+    return [chunks[i] for i in positions]
+
+
+def mmr_select(
+    query_vector: np.ndarray,
+    chunk_vectors: np.ndarray,
+    chunk_sizes: list[int],
+    token_budget: int,
+    diversity: float = 0.3,
+) -> list[int]:
+    """
+    Indices of the chunks to keep, in selection order. Each step takes the chunk with the best
+    ``(1 - diversity) * relevance - diversity * redundancy`` among those that still fit in the budget,
+    where redundancy is the highest similarity to a chunk already selected.
+    """
+    if not chunk_sizes:
+        return []
+    matrix = _normalize(np.asarray(chunk_vectors, dtype=np.float32))
+    relevance = matrix @ _normalize(np.asarray(query_vector, dtype=np.float32)[None, :])[0]
+    redundancy = np.zeros(len(chunk_sizes), dtype=np.float32)
+    sizes = np.asarray(chunk_sizes)
+    available = np.ones(len(chunk_sizes), dtype=bool)
+    selected: list[int] = []
+    remaining = token_budget
+    while True:
+        available &= sizes <= remaining
+        if not available.any():
+            return selected
+        scores = np.where(available, (1 - diversity) * relevance - diversity * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        remaining -= int(sizes[best])
+        redundancy = np.maximum(redundancy, matrix @ matrix[best])
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, np.finfo(np.float32).tiny)
@@ -0,0 +1,118 @@
+"""
+Process-wide, pooled clients for the outbound calls made during a research run.
+
+Building an ``AzureOpenAI`` client or calling ``requests.get`` without a session
+opens a new connection (and TLS handshake) every time. These helpers hand out
+one keep-alive client per process instead, plus a bounded executor for page
+fetches so the number of threads no longer depends on user input.
+
+Async clients are bound to the event loop that created them, so they are kept
+per loop, together with the semaphore that bounds the loop's concurrent page
+fetches. Code using them runs inside ``async_client_scope()``; when the last
+scope on a loop exits, the loop's clients are closed.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+import httpx
+import requests
+from openai import AsyncAzureOpenAI, AzureOpenAI
+from requests.adapters import HTTPAdapter
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+
+
+def _azure_kwargs() -> dict:
+    return {
+        "api_key": os.getenv("AZURE_API_KEY"),
+        "api_version": os.getenv("AZURE_API_VERSION", "2024-06-01"),
+        "azure_endpoint": os.getenv("AZURE_API_BASE"),
+    }
+
+
+@lru_cache(maxsize=1)
+def get_http_session() -> requests.Session:
+    """Shared ``requests`` session with a keep-alive connection pool."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@lru_cache(maxsize=1)
+def get_azure_openai_client() -> AzureOpenAI:
+    """Shared Azure OpenAI client. Use ``.with_options(...)`` for per-call settings; it reuses the pool."""
+    return AzureOpenAI(**_azure_kwargs())
+
+
+@lru_cache(maxsize=1)
+def get_fetch_executor() -> ThreadPoolExecutor:
+    """Bounded executor shared by every page fetch in this process."""
+    return ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS, thread_name_prefix="reader-fetch")
+
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+
+def _loop_clients() -> dict:
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        return _async_clients.setdefault(loop, {})
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Keep-alive ``httpx`` client for the running event loop."""
+    clients = _loop_clients()
+    if "http" not in clients:
+        limits = httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE)
+        clients["http"] = httpx.AsyncClient(limits=limits, follow_redirects=True)
+    return clients["http"]
+
+
+def get_async_azure_openai_client() -> AsyncAzureOpenAI:
+    """Async Azure OpenAI client for the running event loop."""
+    clients = _loop_clients()
+    if "azure" not in clients:
+        clients["azure"] = AsyncAzureOpenAI(**_azure_kwargs())
+    return clients["azure"]
+
+
+def get_async_fetch_semaphore() -> asyncio.Semaphore:
+    """Bounds concurrent page fetches on the running event loop, like ``get_fetch_executor`` does for threads."""
+    clients = _loop_clients()
+    if "fetch_semaphore" not in clients:
+        clients["fetch_semaphore"] = asyncio.Semaphore(FETCH_MAX_WORKERS)
+    return clients["fetch_semaphore"]
+
+
+async def aclose_async_clients() -> None:
+    """Close the running loop's clients; the next ``get_async_*`` call opens new ones."""
+    clients = _loop_clients()
+    http, azure = clients.pop("http", None), clients.pop("azure", None)
+    if http is not None:
+        await http.aclose()
+    if azure is not None:
+        await azure.close()
+
+
+@asynccontextmanager
+async def async_client_scope() -> AsyncIterator[None]:
+    """Keep the running loop's clients open for the block; the last scope to exit closes them."""
+    clients = _loop_clients()
+    clients["scopes"] = clients.get("scopes", 0) + 1
+    try:
+        yield
+    finally:
+        clients["scopes"] -= 1
+        if not clients["scopes"]:
+            await aclose_async_clients()
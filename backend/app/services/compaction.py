@@ -0,0 +1,222 @@
+"""
+Compaction of research output before it reaches the aggregator.
+
+``compact_context`` works in two passes over the text's paragraphs:
+
+1. Near-duplicate removal. Each paragraph gets a 64-bit SimHash of its word
+   shingles; a paragraph within ``max_distance`` bits of one already kept (in any
+   source) is dropped, so syndicated copies and repeated boilerplate appear once.
+   Candidates are found by splitting fingerprints into ``max_distance + 1`` bands:
+   two hashes at most ``max_distance`` bits apart always agree on at least one band.
+2. Extractive compression. While the text is over ``token_budget``, the first
+   sentence of each source is kept, so no source disappears entirely; the other
+   sentences are ranked by the average document frequency of their content words,
+   and the best ones are added until the budget is spent. Kept sentences stay in
+   their original order.
+
+Lines that identify a source (``URL: ... | Title: ...``) and the
+``----`` separators between sources are kept before any sentence, but they count
+against the budget too: once it is spent, the next one is cut short and the rest
+are dropped.
+"""
+
+import hashlib
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.services.tokens import count_tokens, split_by_tokens
+
+SIMHASH_BITS = 64
+SHINGLE_WORDS = 3
+# Paragraphs shorter than this are only removed when repeated exactly; their SimHash is too noisy.
+MIN_SIMHASH_WORDS = 8
+
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+SOURCE_SEPARATOR = re.compile(r"^-{10,}\s*$")
+PINNED_LINE = re.compile(r"^(URL|Title|Source|Content):(\s|$)", re.IGNORECASE)
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can for from had has have he her his i if in into is it its more "
+    "not of on or our she so than that the their them they this to was we were what when which who will "
+    "with would you your".split()
+)
+
+
+def _words(text: str) -> list[str]:
+    return WORD.findall(text.lower())
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over the word shingles of ``text``."""
+    words = _words(text)
+    if len(words) > SHINGLE_WORDS:
+        features = [" ".join(words[i : i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+    else:
+        features = [" ".join(words)]
+    digests = b"".join(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest() for feature in features)
+    # One row of 64 bits per feature; a fingerprint bit is set where most features have it set.
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(len(features), SIMHASH_BITS)
+    majority = bits.sum(axis=0) * 2 > len(features)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+class SimHashIndex:
+    """Fingerprints seen so far, looked up by band so a query only compares against likely matches."""
+
+    def __init__(self, max_distance: int = 6) -> None:
+        self.max_distance = max_distance
+        self._band_bits = SIMHASH_BITS // (max_distance + 1)
+        self._bands: list[dict[int, list[int]]] = [{} for _ in range(max_distance + 1)]
+
+    def _band_keys(self, fingerprint: int) -> list[int]:
+        mask = (1 << self._band_bits) - 1
+        return [fingerprint >> (band * self._band_bits) & mask for band in range(len(self._bands))]
+
+    def near(self, fingerprint: int) -> bool:
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            for other in band.get(key, ()):
+                if (fingerprint ^ other).bit_count() <= self.max_distance:
+                    return True
+        return False
+
+    def add(self, fingerprint: int) -> None:
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            band.setdefault(key, []).append(fingerprint)
+
+
+@dataclass
+class CompactedContext:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    duplicates_removed: int
+    sentences_dropped: int
+
+    def report(self) -> dict:
+        return {
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "duplicates_removed": self.duplicates_removed,
+            "sentences_dropped": self.sentences_dropped,
+        }
+
+
+def _paragraphs(text: str) -> list[tuple[int, str]]:
+    """
+    (source index, paragraph) pairs; sources are the blocks between separator lines. Separators and
+    source identification lines are paragraphs of their own, so they can be kept as they are.
+    """
+    paragraphs, source, block = [], 0, []
+
+    def flush():
+        paragraph = "\n".join(block).strip()
+        if paragraph:
+            paragraphs.append((source, paragraph))
+        block.clear()
+
+    for line in text.splitlines():
+        if SOURCE_SEPARATOR.match(line):
+            flush()
+            paragraphs.append((source, line.strip()))
+            source += 1
+        elif PINNED_LINE.match(line):
+            flush()
+            paragraphs.append((source, line.strip()))
+        elif not line.strip():
+            flush()
+        else:
+            block.append(line)
+    flush()
+    return paragraphs
+
+
+def _pinned(paragraph: str) -> bool:
+    return bool(SOURCE_SEPARATOR.match(paragraph) or PINNED_LINE.match(paragraph))
+
+
+def remove_near_duplicates(
+    paragraphs: list[tuple[int, str]], max_distance: int = 6
+) -> tuple[list[tuple[int, str]], int]:
+    """Drop paragraphs that repeat an earlier one exactly or within ``max_distance`` SimHash bits."""
+    index = SimHashIndex(max_distance)
+    seen_exact: set[str] = set()
+    kept, removed = [], 0
+    for source, paragraph in paragraphs:
+        if _pinned(paragraph):
+            kept.append((source, paragraph))
+            continue
+        words = _words(paragraph)
+        normalized = " ".join(words)
+        if normalized in seen_exact:
+            removed += 1
+            continue
+        if len(words) >= MIN_SIMHASH_WORDS:
+            fingerprint = simhash(paragraph)
+            if index.near(fingerprint):
+                removed += 1
+                continue
+            index.add(fingerprint)
+        seen_exact.add(normalized)
+        kept.append((source, paragraph))
+    return kept, removed
+
+
+def compress_to_budget(paragraphs: list[tuple[int, str]], token_budget: int) -> tuple[str, int]:
+    """Keep the highest-scoring sentences that fit in ``token_budget``; returns the text and sentences dropped."""
+    # Units are sentences of each line, so Markdown lists and headings keep their line breaks.
+    # Each is charged one token more than it has, for the space or line break that joins it to the next.
+    units = []  # (paragraph index, line index, sentence, tokens, pinned)
+    for p, (_, paragraph) in enumerate(paragraphs):
+        pinned = _pinned(paragraph)
+        for line_index, line in enumerate(paragraph.splitlines()):
+            for sentence in [line] if pinned else SENTENCE_BREAK.split(line.strip()):
+                if sentence:
+                    units.append((p, line_index, sentence, count_tokens(sentence) + 1, pinned))
+
+    frequencies = Counter(word for unit in units for word in _words(unit[2]) if word not in STOPWORDS)
+    top = max(frequencies.values(), default=1)
+    first_of_source: dict[int, int] = {}
+    for i, unit in enumerate(units):
+        if not unit[4]:
+            first_of_source.setdefault(paragraphs[unit[0]][0], i)
+    leads = set(first_of_source.values())
+
+    def score(i: int) -> float:
+        words = [word for word in _words(units[i][2]) if word not in STOPWORDS]
+        return sum(frequencies[word] / top for word in words) / len(words) if words else 0.0
+
+    remaining, selected = token_budget, set()
+    for i, unit in enumerate(units):
+        if not unit[4] or remaining <= 1:
+            continue
+        if unit[3] > remaining:
+            units[i] = (*unit[:2], split_by_tokens(unit[2], remaining - 1)[0], remaining, True)
+        selected.add(i)
+        remaining -= units[i][3]
+    ranked = sorted((i for i, unit in enumerate(units) if not unit[4] and i not in leads), key=score, reverse=True)
+    for i in [*sorted(leads), *ranked]:
+        if units[i][3] <= remaining:
+            selected.add(i)
+            remaining -= units[i][3]
+
+    lines: dict[tuple[int, int], list[str]] = {}
+    for i in sorted(selected):
+        lines.setdefault(units[i][:2], []).append(units[i][2])
+    blocks: dict[int, list[str]] = {}
+    for (p, _), sentences in lines.items():
+        blocks.setdefault(p, []).append(" ".join(sentences))
+    text = "\n\n".join("\n".join(block) for _, block in sorted(blocks.items()))
+    return text, len(units) - len(selected)
+
+
+def compact_context(text: str, token_budget: int, max_distance: int = 6) -> CompactedContext:
+    tokens_before = count_tokens(text)
+    paragraphs, duplicates = remove_near_duplicates(_paragraphs(text), max_distance)
+    compacted = "\n\n".join(paragraph for _, paragraph in paragraphs)
+    dropped = 0
+    if count_tokens(compacted) > token_budget:
+        compacted, dropped = compress_to_budget(paragraphs, token_budget)
+    return CompactedContext(compacted, tokens_before, count_tokens(compacted), duplicates, dropped)
@@ -0,0 +1,69 @@
+"""
+Cache of embedding vectors keyed by (model, dimensions, SHA-256 of the text).
+
+Vectors are stored as raw float32 bytes in SQLite, so a lookup is a single
+``np.frombuffer`` instead of parsing a JSON list, with an in-process LRU in front.
+Callers look up a whole batch at once and only send the misses to the API.
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+
+from app.services.cache import CacheStats, LRUCache, SQLiteCache, cache_path
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = 200_000,
+        memory_entries: int = 4096,
+        path: str | Path | None = None,
+    ) -> None:
+        self.memory = LRUCache(max_entries=memory_entries, ttl_seconds=ttl_seconds)
+        self.disk = SQLiteCache(
+            path or cache_path("embeddings"), table="embeddings", ttl_seconds=ttl_seconds, max_entries=max_entries
+        )
+        self.stats = CacheStats("embeddings")
+
+    @staticmethod
+    def key(model: str, dimensions: int | None, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model}:{dimensions or 'default'}:{digest}"
+
+    def get_many(self, model: str, dimensions: int | None, texts: list[str]) -> list[np.ndarray | None]:
+        """Cached vectors for ``texts`` in order, with None for each miss."""
+        keys = [self.key(model, dimensions, text) for text in texts]
+        vectors: list[np.ndarray | None] = [self.memory.get(key) for key in keys]
+        missing = list({key for key, vector in zip(keys, vectors) if vector is None})
+        found = {}
+        if missing:
+            try:
+                found = self.disk.get_many(missing)
+            except sqlite3.Error as e:
+                print(f"[EmbeddingCache] Disk read failed: {e}")
+        for i, key in enumerate(keys):
+            if vectors[i] is not None:
+                self.stats.incr("hits_memory")
+            elif key in found:
+                vectors[i] = np.frombuffer(found[key], dtype=np.float32)
+                self.memory.set(key, vectors[i])
+                self.stats.incr("hits_disk")
+            else:
+                self.stats.incr("misses")
+        return vectors
+
+    def put_many(self, model: str, dimensions: int | None, texts: list[str], vectors: list) -> None:
+        items = {}
+        for text, vector in zip(texts, vectors):
+            key = self.key(model, dimensions, text)
+            array = np.asarray(vector, dtype=np.float32)
+            self.memory.set(key, array)
+            items[key] = array.tobytes()
+        try:
+            self.disk.set_many(items)
+        except sqlite3.Error as e:
+            print(f"[EmbeddingCache] Disk write failed: {e}")
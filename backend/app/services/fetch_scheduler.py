@@ -0,0 +1,104 @@
+"""
+Per-host limits for page fetches.
+
+Search results often include several pages from one site. Fetching them all at once
+gets the reader throttled by that site and burns retries, so ``HostScheduler`` caps
+concurrent fetches per host and spaces their start times by a politeness delay.
+Fetches to different hosts never wait for each other.
+
+The limits are process-wide and shared by threads and event loops: ``slot()`` blocks
+the calling thread, ``aslot()`` awaits. ``interleave_by_host`` orders a batch so that
+different hosts start first instead of queueing behind one busy host in the fetch pool.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import urllib.parse
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+
+from app.services.metrics import READER_HOST_WAIT_SECONDS
+
+# How often a fetch waiting for a free slot on its host checks again.
+POLL_SECONDS = 0.02
+
+
+def url_host(url: str) -> str:
+    return (urllib.parse.urlsplit(url).hostname or "").lower()
+
+
+def interleave_by_host(items: list, url=lambda item: item) -> list:
+    """``items`` reordered round-robin across hosts, keeping each host's items in their original order."""
+    queues: dict[str, list] = {}
+    for item in items:
+        queues.setdefault(url_host(url(item)), []).append(item)
+    ordered = []
+    while queues:
+        for host in list(queues):
+            ordered.append(queues[host].pop(0))
+            if not queues[host]:
+                del queues[host]
+    return ordered
+
+
+class HostScheduler:
+    def __init__(self, max_per_host: int = 2, delay_seconds: float = 0.5) -> None:
+        self.max_per_host = max_per_host
+        self.delay_seconds = delay_seconds
+        self._active: dict[str, int] = {}
+        self._next_start: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, host: str) -> float:
+        """Take a slot on ``host`` and return 0, or return how long to wait before trying again."""
+        now = time.monotonic()
+        with self._lock:
+            if self._active.get(host, 0) >= self.max_per_host:
+                return POLL_SECONDS
+            wait = self._next_start.get(host, 0.0) - now
+            if wait > 0:
+                return wait
+            self._active[host] = self._active.get(host, 0) + 1
+            self._next_start[host] = now + self.delay_seconds
+            return 0.0
+
+    def _release(self, host: str) -> None:
+        with self._lock:
+            self._active[host] -= 1
+            if not self._active[host]:
+                del self._active[host]
+            # Forget hosts whose delay has passed so the dict only holds hosts in use.
+            if host not in self._active and self._next_start.get(host, 0.0) <= time.monotonic():
+                self._next_start.pop(host, None)
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = url_host(url)
+        started = time.perf_counter()
+        while wait := self._try_acquire(host):
+            time.sleep(wait)
+        READER_HOST_WAIT_SECONDS.observe(time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    @asynccontextmanager
+    async def aslot(self, url: str) -> AsyncIterator[None]:
+        host = url_host(url)
+        started = time.perf_counter()
+        while wait := self._try_acquire(host):
+            await asyncio.sleep(wait)
+        READER_HOST_WAIT_SECONDS.observe(time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self._release(host)
+
+
+host_scheduler = HostScheduler(
+    max_per_host=int(os.getenv("FETCH_MAX_PER_HOST", "2")),
+    delay_seconds=float(os.getenv("FETCH_HOST_DELAY_SECONDS", "0.5")),
+)
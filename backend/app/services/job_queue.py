@@ -0,0 +1,211 @@
+"""
+Database-backed job queue for long-running research crews.
+
+Jobs live in the ``ResearchJob`` table, so any number of worker processes or
+nodes sharing the database can claim them without a broker. A job is claimed
+with a conditional UPDATE (only one worker can flip it from PENDING), and a
+worker holds a renewable lease while it runs; if the worker dies, the lease
+expires and another worker picks the job up again.
+
+Web processes start a small local pool on first submit. Dedicated worker nodes
+run ``python manage.py run_research_workers`` instead.
+"""
+
+import logging
+import os
+import socket
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from app.models import ResearchJob
+from app.services.research_runner import run_analysis, run_chat
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {
+    ResearchJob.Kind.ANALYSIS: lambda inputs: run_analysis(
+        inputs.get("query", ""), inputs.get("max_links", 3), fresh=inputs.get("fresh", False)
+    ),
+    ResearchJob.Kind.CHAT: run_chat,
+}
+
+
+def _lease_duration() -> timedelta:
+    return timedelta(seconds=settings.RESEARCH_JOB_LEASE_SECONDS)
+
+
+def _claimable() -> Q:
+    # Pending jobs, plus started jobs whose worker stopped renewing its lease.
+    return Q(state=ResearchJob.State.PENDING) | Q(
+        state=ResearchJob.State.STARTED,
+        lease_expires_at__lt=timezone.now(),
+        attempts__lt=settings.RESEARCH_JOB_MAX_ATTEMPTS,
+    )
+
+
+def submit_job(kind: str, inputs: dict) -> ResearchJob:
+    """Persist a new job and make sure a local worker pool is around to run it."""
+    job = ResearchJob.objects.create(kind=kind, inputs=inputs)
+    pool = ensure_local_workers()
+    if pool is not None:
+        pool.wakeup()
+    return job
+
+
+def claim_next_job(worker_id: str) -> ResearchJob | None:
+    """Atomically claim the oldest runnable job for ``worker_id``, or return None."""
+    _fail_exhausted_jobs()
+    candidates = ResearchJob.objects.filter(_claimable()).order_by("created_at").values_list("pk", flat=True)[:10]
+    for pk in candidates:
+        now = timezone.now()
+        claimed = (
+            ResearchJob.objects.filter(_claimable(), pk=pk).update(
+                state=ResearchJob.State.STARTED,
+                worker_id=worker_id,
+                attempts=F("attempts") + 1,
+                started_at=now,
+                lease_expires_at=now + _lease_duration(),
+            )
+            == 1
+        )
+        if claimed:
+            return ResearchJob.objects.get(pk=pk)
+    return None
+
+
+def renew_lease(job: ResearchJob, worker_id: str) -> bool:
+    """Extend the lease on a running job. Returns False if another worker took it over."""
+    return (
+        ResearchJob.objects.filter(pk=job.pk, worker_id=worker_id, state=ResearchJob.State.STARTED).update(
+            lease_expires_at=timezone.now() + _lease_duration()
+        )
+        == 1
+    )
+
+
+def complete_job(job: ResearchJob, worker_id: str, result: dict) -> None:
+    ResearchJob.objects.filter(pk=job.pk, worker_id=worker_id).update(
+        state=ResearchJob.State.SUCCESS,
+        result=result,
+        finished_at=timezone.now(),
+        lease_expires_at=None,
+    )
+
+
+def fail_job(job: ResearchJob, worker_id: str, error: str) -> None:
+    ResearchJob.objects.filter(pk=job.pk, worker_id=worker_id).update(
+        state=ResearchJob.State.FAILURE,
+        error=error,
+        finished_at=timezone.now(),
+        lease_expires_at=None,
+    )
+
+
+def _fail_exhausted_jobs() -> None:
+    ResearchJob.objects.filter(
+        state=ResearchJob.State.STARTED,
+        lease_expires_at__lt=timezone.now(),
+        attempts__gte=settings.RESEARCH_JOB_MAX_ATTEMPTS,
+    ).update(
+        state=ResearchJob.State.FAILURE,
+        error="Job abandoned: worker lease expired too many times.",
+        finished_at=timezone.now(),
+        lease_expires_at=None,
+    )
+
+
+def execute_job(job: ResearchJob, worker_id: str) -> None:
+    """Run a claimed job to completion, renewing its lease while the crew works."""
+    stop_heartbeat = threading.Event()
+
+    def heartbeat():
+        interval = max(settings.RESEARCH_JOB_LEASE_SECONDS / 3, 1)
+        while not stop_heartbeat.wait(interval):
+            try:
+                if not renew_lease(job, worker_id):
+                    logger.warning("Lost lease on job %s", job.pk)
+                    return
+            finally:
+                close_old_connections()
+
+    heartbeat_thread = threading.Thread(target=heartbeat, name=f"job-heartbeat-{job.pk}", daemon=True)
+    heartbeat_thread.start()
+    try:
+        handler = JOB_HANDLERS[job.kind]
+        result = handler(job.inputs)
+    except Exception as e:
+        logger.exception("Research job %s failed", job.pk)
+        fail_job(job, worker_id, f"{e}\n{traceback.format_exc()}")
+    else:
+        complete_job(job, worker_id, result)
+    finally:
+        stop_heartbeat.set()
+        heartbeat_thread.join()
+
+
+class JobWorkerPool:
+    """A fixed set of threads that claim and run jobs from the shared table."""
+
+    def __init__(self, num_workers: int, poll_interval: float | None = None) -> None:
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval if poll_interval is not None else settings.RESEARCH_JOB_POLL_SECONDS
+        self.node_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._loop, args=(f"{self.node_id}/{i}",), name=f"research-worker-{i}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Started %d research job workers on %s", self.num_workers, self.node_id)
+
+    def wakeup(self) -> None:
+        self._wakeup.set()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _loop(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            job = None
+            try:
+                close_old_connections()
+                job = claim_next_job(worker_id)
+                if job is not None:
+                    execute_job(job, worker_id)
+            except Exception:
+                logger.exception("Research worker %s crashed while polling", worker_id)
+            finally:
+                close_old_connections()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+
+_local_pool: JobWorkerPool | None = None
+_local_pool_lock = threading.Lock()
+
+
+def ensure_local_workers() -> JobWorkerPool | None:
+    """Start this process's worker pool once, unless local workers are disabled."""
+    global _local_pool
+    if settings.RESEARCH_JOB_WORKERS <= 0:
+        return None
+    with _local_pool_lock:
+        if _local_pool is None:
+            _local_pool = JobWorkerPool(settings.RESEARCH_JOB_WORKERS)
+            _local_pool.start()
+    return _local_pool
@@ -0,0 +1,86 @@
+"""
+In-process BM25 index kept next to the Chroma collection.
+
+Keyword lookups are answered from an inverted index in memory, with no
+embedding call, and ``reciprocal_rank_fusion`` merges a lexical ranking with a
+dense one for hybrid search.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[str, int]] = defaultdict(dict)
+        self._lengths: dict[str, int] = {}
+        self._texts: dict[str, str] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def add(self, doc_id: str, text: str) -> None:
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self.remove(doc_id)
+            for term, frequency in terms.items():
+                self._postings[term][doc_id] = frequency
+            length = sum(terms.values())
+            self._lengths[doc_id] = length
+            self._texts[doc_id] = text
+            self._total_length += length
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            text = self._texts.pop(doc_id, None)
+            if text is None:
+                return
+            for term in set(tokenize(text)):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= self._lengths.pop(doc_id)
+
+    def text(self, doc_id: str) -> str | None:
+        return self._texts.get(doc_id)
+
+    def search(self, query: str, k: int = 3) -> list[tuple[str, float]]:
+        """Top ``k`` (doc_id, score) pairs for ``query``; documents sharing no term with it are left out."""
+        with self._lock:
+            count = len(self._lengths)
+            if not count:
+                return []
+            average_length = self._total_length / count
+            scores: dict[str, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[str]:
+    """Merge several rankings of ids: each id scores ``sum(1 / (k + rank))`` over the rankings it appears in."""
+    scores: dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1 / (k + rank)
+    return sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
@@ -0,0 +1,96 @@
+"""
+Exact-match cache of the crew agents' LLM completions.
+
+A completion is keyed by the agent it belongs to and a hash of everything that shapes
+the response: model, messages, tools and sampling parameters (temperature, stop words,
+seed, ...). Rerunning a query with the same date and source material, or retrying a run
+after a downstream failure, then costs no LLM calls for the steps that repeat.
+
+Only worth turning on where replaying an earlier completion is acceptable; with a
+non-zero temperature a rerun returns the first sample instead of a new one.
+Hits count the tokens they saved, estimated with ``count_tokens``.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+from app.services.cache import CacheStats, SQLiteCache, cache_path
+from app.services.metrics import registry
+from app.services.tokens import count_tokens
+
+LLM_CACHE_LOOKUPS = registry.counter(
+    "llm_cache_lookups_total", "Agent LLM calls looked up in the response cache.", ("agent", "result")
+)
+LLM_CACHE_TOKENS_SAVED = registry.counter(
+    "llm_cache_tokens_saved_total", "Estimated tokens not sent to the LLM thanks to cache hits.", ("agent", "kind")
+)
+
+
+def _message_text(messages: list[dict]) -> str:
+    return "\n".join(str(message.get("content") or "") for message in messages)
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        ttl_seconds: float | None = 86400,
+        max_entries: int | None = 10_000,
+        max_bytes: int | None = 64 * 1024 * 1024,
+        path: str | Path | None = None,
+    ) -> None:
+        self.store = SQLiteCache(
+            path or cache_path("llm_responses"),
+            table="llm_responses",
+            ttl_seconds=ttl_seconds,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+        )
+        self.stats = CacheStats()
+
+    @staticmethod
+    def key(agent: str, request: dict) -> str:
+        """Scope ``agent`` plus a hash of the request; values JSON cannot encode are hashed by their ``str``."""
+        encoded = json.dumps(request, sort_keys=True, default=str).encode("utf-8")
+        return f"{agent}:{hashlib.sha256(encoded).hexdigest()}"
+
+    def get(self, agent: str, request: dict) -> str | None:
+        try:
+            raw = self.store.get(self.key(agent, request))
+        except sqlite3.Error as e:
+            print(f"[LLMResponseCache] Read failed: {e}")
+            raw = None
+        if raw is None:
+            self.stats.incr("misses")
+            LLM_CACHE_LOOKUPS.inc(agent=agent, result="miss")
+            return None
+        entry = json.loads(raw)
+        self.stats.incr("hits")
+        self.stats.incr("prompt_tokens_saved", entry["prompt_tokens"])
+        self.stats.incr("completion_tokens_saved", entry["completion_tokens"])
+        LLM_CACHE_LOOKUPS.inc(agent=agent, result="hit")
+        LLM_CACHE_TOKENS_SAVED.inc(entry["prompt_tokens"], agent=agent, kind="prompt")
+        LLM_CACHE_TOKENS_SAVED.inc(entry["completion_tokens"], agent=agent, kind="completion")
+        return entry["response"]
+
+    def put(self, agent: str, request: dict, response: str) -> None:
+        entry = {
+            "response": response,
+            "prompt_tokens": count_tokens(_message_text(request.get("messages") or [])),
+            "completion_tokens": count_tokens(response),
+        }
+        try:
+            self.store.set(self.key(agent, request), json.dumps(entry).encode("utf-8"))
+        except sqlite3.Error as e:
+            print(f"[LLMResponseCache] Write failed: {e}")
+        self.stats.incr("sets")
+
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() in ["true", "1", "yes"]
+llm_cache = LLMResponseCache(
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
@@ -0,0 +1,277 @@
+"""
+Process-wide metrics in the Prometheus text format, plus a per-run stage timeline.
+
+``Counter`` and ``Histogram`` keep their samples in memory, one series per label set;
+``registry.render()`` is what ``/api/metrics/`` serves. Every process has its own
+registry, so with several workers each one has to be scraped.
+
+``timed()`` observes a histogram and, while a run is tracked with ``track_run()``,
+also appends a span to that run's ``RunTimeline``; research responses return it
+as ``timings``. The timeline follows the run through ``contextvars``, so work handed
+to a thread pool must be submitted through ``contextvars.copy_context().run`` to
+show up in it.
+"""
+
+import abc
+import bisect
+import contextvars
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# Seconds; covers cached lookups through multi-minute crew runs.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"Unknown labels for {self.name}: {sorted(unknown)}")
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = [*zip(self.labelnames, key), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    @abc.abstractmethod
+    def samples(self) -> list[str]:
+        """The metric's exposition lines, without its HELP and TYPE header."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_format(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: observations per bucket (the last slot is +Inf only), then sum and count.
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.setdefault(key, [0.0] * (len(self.buckets) + 3))
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return int(state[-1]) if state else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            cumulative = 0.0
+            for bound, observed in zip((*self.buckets, float("inf")), state):
+                cumulative += observed
+                le = "+Inf" if bound == float("inf") else _format(bound)
+                lines.append(f"{self.name}_bucket{self._labels(key, (('le', le),))} {_format(cumulative)}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format(state[-2])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {_format(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(f"Metric {metric.name} is already registered with a different type or labels")
+        return existing
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+@dataclass
+class RunTimeline:
+    """Spans recorded while a run is tracked, as offsets from the start of the run."""
+
+    started: float = field(default_factory=time.perf_counter)
+    spans: list[dict] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, stage: str, begin: float, end: float, **detail) -> None:
+        span = {
+            "stage": stage,
+            "start_ms": round((begin - self.started) * 1000, 1),
+            "duration_ms": round((end - begin) * 1000, 1),
+            **detail,
+        }
+        with self._lock:
+            self.spans.append(span)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            stages = sorted(self.spans, key=lambda span: span["start_ms"])
+        return {"total_ms": round((time.perf_counter() - self.started) * 1000, 1), "stages": stages}
+
+
+_current_timeline: contextvars.ContextVar[RunTimeline | None] = contextvars.ContextVar("run_timeline", default=None)
+
+
+@contextmanager
+def track_run() -> Iterator[RunTimeline]:
+    """Collect the spans of every ``timed()`` block in this context into a new timeline."""
+    timeline = RunTimeline()
+    token = _current_timeline.set(timeline)
+    try:
+        yield timeline
+    finally:
+        _current_timeline.reset(token)
+
+
+@contextmanager
+def timed(histogram: Histogram, stage: str | None = None, detail: dict | None = None, **labels) -> Iterator[dict]:
+    """
+    Observe the block's duration in ``histogram`` and, under ``track_run()``, add it to the run's
+    timeline as ``stage``. An ``outcome`` label, if the histogram has one, becomes "ok" or "error".
+    Yields the label dict so the block can fill in labels it only learns as it runs; ``detail``
+    goes to the timeline only, for values too varied to be labels (URLs, counts).
+    """
+    labels = dict(labels)
+    begin = time.perf_counter()
+    outcome = "error"
+    try:
+        yield labels
+        outcome = "ok"
+    finally:
+        end = time.perf_counter()
+        if "outcome" in histogram.labelnames:
+            labels.setdefault("outcome", outcome)
+        histogram.observe(end - begin, **labels)
+        timeline = _current_timeline.get()
+        if timeline is not None and stage:
+            timeline.add(stage, begin, end, **labels, **(detail or {}))
+
+
+registry = MetricsRegistry()
+
+REQUEST_SECONDS = registry.histogram(
+    "research_request_seconds",
+    "End-to-end time to answer a chat or analysis request.",
+    ("endpoint", "route", "outcome"),
+)
+CREW_TASK_SECONDS = registry.histogram("crew_task_seconds", "Time spent running each crew task.", ("task", "outcome"))
+LLM_CALL_SECONDS = registry.histogram(
+    "llm_call_seconds", "Latency of each agent LLM call; cache is off, hit or miss.", ("agent", "cache", "outcome")
+)
+LLM_TOKENS = registry.counter("llm_tokens_total", "Tokens used by each agent's LLM calls.", ("agent", "kind"))
+SERPER_SEARCH_SECONDS = registry.histogram(
+    "serper_search_seconds", "Latency of Serper searches, from the cache or the API.", ("source", "outcome")
+)
+READER_FETCH_SECONDS = registry.histogram(
+    "reader_fetch_seconds", "Latency of each Jina reader fetch attempt.", ("source", "outcome")
+)
+READER_FETCH_RETRIES = registry.counter("reader_fetch_retries_total", "Jina reader fetch attempts that were retried.")
+READER_HOST_WAIT_SECONDS = registry.histogram(
+    "reader_host_wait_seconds", "Time a reader fetch waited for a free slot on its host (per-host limit and delay)."
+)
+SEARCH_DUPLICATE_LINKS = registry.counter(
+    "search_duplicate_links_total", "Search results dropped because their canonical URL was already in the results."
+)
+EMBEDDING_REQUEST_SECONDS = registry.histogram(
+    "embedding_request_seconds", "Latency of each embeddings API request.", ("outcome",)
+)
+EMBEDDING_BATCH_INPUTS = registry.histogram(
+    "embedding_batch_inputs",
+    "Texts sent per embeddings API request.",
+    buckets=(1, 4, 16, 64, 256, 1024, 2048),
+)
+CHROMA_QUERY_SECONDS = registry.histogram(
+    "chroma_query_seconds", "Latency of vector store searches.", ("mode", "outcome")
+)
+CHROMA_WRITE_SECONDS = registry.histogram("chroma_write_seconds", "Latency of vector store writes.", ("outcome",))
+CHROMA_CHUNKS = registry.counter("chroma_chunks_total", "Chunks offered to the vector store.", ("result",))
+CONTEXT_TOKENS = registry.histogram(
+    "context_compaction_tokens",
+    "Tokens of research output before (input) and after (output) compaction for the aggregator.",
+    ("side",),
+    buckets=(500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000),
+)
+CACHE_EVENTS = registry.counter(
+    "cache_events_total",
+    "Lookups and writes on the research caches, by cache and event (hits_*, misses, sets).",
+    ("cache", "event"),
+)
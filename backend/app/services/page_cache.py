@@ -0,0 +1,91 @@
+"""
+Compressed on-disk cache for pages fetched through the Jina reader.
+
+Entries are addressed by the SHA-256 of the URL and stored zlib-compressed in a
+SQLite file shared by all worker processes. Each entry has two lifetimes:
+
+- ``fresh_seconds``: served straight from the cache without touching the network.
+- ``max_age_seconds``: after going stale, an entry that has an ETag or
+  Last-Modified validator is kept this long so it can be revalidated with a
+  conditional request; a 304 answer refreshes it without downloading the page.
+
+The total compressed size is capped at ``max_bytes``; the oldest pages go first.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.services.cache import CacheStats, SQLiteCache, cache_path
+
+
+@dataclass
+class CachedPage:
+    url: str
+    text: str
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def is_fresh(self, fresh_seconds: float) -> bool:
+        return time.time() - self.fetched_at < fresh_seconds
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    def __init__(
+        self,
+        fresh_seconds: float,
+        max_age_seconds: float,
+        max_bytes: int,
+        path: str | Path | None = None,
+    ) -> None:
+        self.fresh_seconds = fresh_seconds
+        self.max_age_seconds = max(max_age_seconds, fresh_seconds)
+        self.store = SQLiteCache(
+            path or cache_path("reader_pages"),
+            table="pages",
+            ttl_seconds=self.max_age_seconds,
+            max_bytes=max_bytes,
+        )
+        self.stats = CacheStats("reader")
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> CachedPage | None:
+        """Return the cached page for ``url``, fresh or stale, or None."""
+        try:
+            blob = self.store.get(self.key(url))
+        except sqlite3.Error as e:
+            print(f"[PageCache] Read failed for {url}: {e}")
+            return None
+        if blob is None:
+            return None
+        record = json.loads(zlib.decompress(blob))
+        return CachedPage(url=url, **record)
+
+    def put(self, url: str, text: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        record = {"text": text, "fetched_at": time.time(), "etag": etag, "last_modified": last_modified}
+        # Without validators a stale page cannot be revalidated, so keep it only while fresh.
+        ttl = self.max_age_seconds if (etag or last_modified) else self.fresh_seconds
+        try:
+            self.store.set(self.key(url), zlib.compress(json.dumps(record).encode("utf-8")), ttl_seconds=ttl)
+        except sqlite3.Error as e:
+            print(f"[PageCache] Write failed for {url}: {e}")
+
+    def mark_revalidated(self, page: CachedPage) -> None:
+        """Record a 304 answer: the cached copy is current again."""
+        self.put(page.url, page.text, page.etag, page.last_modified)
@@ -0,0 +1,138 @@
+"""
+Routes chat messages either to the research crew or straight to ``DirectAnswerTool``.
+
+Local heuristics decide first: arithmetic, greetings and short definitional
+questions with nothing time-sensitive in them go to the direct route; anything
+mentioning news, dates, prices or "latest"-style words goes to research, and so
+does a "what is ..." question about a model or product version ("What is GPT-5?",
+"What's new in iOS 18?") or an AI model family ("What is Gemini?"), which may be
+newer than the model's training data. Other capitalized names ("What is the capital
+of France?", "What is Python?") are ordinary general knowledge and stay direct. When the
+heuristics are unsure and ``QUERY_ROUTER_LLM`` is on, one tiny completion on
+``QUERY_ROUTER_MODEL`` breaks the tie; otherwise the message is researched.
+
+The router also keeps a moving average of how long research runs take, which is
+what a direct answer reports as time saved.
+"""
+
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass
+
+from app.services.clients import get_azure_openai_client
+
+QUERY_ROUTER_ENABLED = os.getenv("QUERY_ROUTER_ENABLED", "true").lower() in ["true", "1", "yes"]
+QUERY_ROUTER_LLM = os.getenv("QUERY_ROUTER_LLM", "false").lower() in ["true", "1", "yes"]
+# A small, cheap deployment: the classifier only ever answers with one word.
+QUERY_ROUTER_MODEL = os.getenv("QUERY_ROUTER_MODEL", "gpt-4o-mini")
+
+ROUTES = ("direct", "research")
+
+TIME_SENSITIVE = re.compile(
+    r"\b(latest|newest|recent(ly)?|today|tonight|yesterday|tomorrow|this (week|month|year)|current(ly)?|now|"
+    r"news|headlines?|update[sd]?|trend(s|ing)?|breaking|announce[sd]?|released?|launch(ed)?|price|stock|"
+    r"weather|score|election|who won|20\d\d)\b",
+    re.IGNORECASE,
+)
+# Numbers joined by at least one operator, so a bare number ("what is 2025?") is not arithmetic;
+# "x" only counts as multiplication between two operands.
+OPERAND = r"\(*\s*-?\d[\d.,]*\s*%?\s*\)*"
+ARITHMETIC = re.compile(
+    rf"^((what is|what's|calculate|compute)\s+)?{OPERAND}(\s*[-+*/^x×]\s*{OPERAND})+\s*=?\s*\??$", re.IGNORECASE
+)
+SMALL_TALK = re.compile(
+    r"^(hi|hello|hey|thanks|thank you|good (morning|afternoon|evening)|who are you)\b[\s!.?]*$", re.I
+)
+DEFINITIONAL = re.compile(
+    r"^(what (is|are|does)|what's|define|explain|meaning of|how (do|does|to)|why (is|are|do|does)|translate|"
+    r"convert|spell|synonym)\b",
+    re.IGNORECASE,
+)
+# "What is X?" style questions whose answer may have changed since the model was trained when X is a name.
+ABOUT_SOMETHING = re.compile(r"^(what (is|are|does)|what's|define|explain|meaning of)\b", re.IGNORECASE)
+# A versioned product or model: a token mixing letters and digits ("GPT-4o", "M3", "3B"), a name with an
+# uppercase letter followed by a version number ("iOS 18", "Llama 3.1"), or an AI model family or assistant.
+MODEL_TERMS = r"chatgpt|openai|gpt|claude|gemini|llama|mistral|copilot|grok|deepseek|qwen|sora"
+NAMED_ENTITY = re.compile(
+    r"\b(?:[A-Za-z][\w.+-]*\d[\w.+-]*|\d[\w.+-]*[A-Za-z][\w.+-]*|[A-Za-z]*[A-Z][\w.+-]*\s+v?\d+(?:\.\d+)*|"
+    rf"(?i:{MODEL_TERMS}))\b",
+    re.ASCII,
+)
+URL = re.compile(r"https?://", re.IGNORECASE)
+MAX_DIRECT_WORDS = 15
+
+
+@dataclass
+class RouteDecision:
+    route: str
+    reason: str
+    classifier: str  # "heuristic", "llm" or "request"
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def classify_query(message: str) -> RouteDecision:
+    text = message.strip()
+    if not text:
+        return RouteDecision("research", "empty message", "heuristic")
+    if URL.search(text):
+        return RouteDecision("research", "mentions a URL", "heuristic")
+    if ARITHMETIC.match(text):
+        return RouteDecision("direct", "arithmetic", "heuristic")
+    if SMALL_TALK.match(text):
+        return RouteDecision("direct", "small talk", "heuristic")
+    if TIME_SENSITIVE.search(text):
+        return RouteDecision("research", "time-sensitive wording", "heuristic")
+    if ABOUT_SOMETHING.match(text) and NAMED_ENTITY.search(text):
+        return RouteDecision("research", "asks about a named product, model or version", "heuristic")
+    if DEFINITIONAL.match(text) and len(text.split()) <= MAX_DIRECT_WORDS:
+        return RouteDecision("direct", "short general-knowledge question", "heuristic")
+    if QUERY_ROUTER_LLM:
+        return _classify_with_llm(text)
+    return RouteDecision("research", "no simple-query pattern matched", "heuristic")
+
+
+def _classify_with_llm(text: str) -> RouteDecision:
+    try:
+        response = get_azure_openai_client().chat.completions.create(
+            model=QUERY_ROUTER_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Reply with one word. DIRECT if the question can be answered from general knowledge "
+                    "that does not change over time; RESEARCH if it needs current information from the web.",
+                },
+                {"role": "user", "content": text},
+            ],
+            temperature=0,
+            max_tokens=2,
+        )
+        label = (response.choices[0].message.content or "").strip().upper()
+    except Exception as e:
+        print(f"[QueryRouter] LLM classification failed, researching: {e}")
+        return RouteDecision("research", "classifier unavailable", "llm")
+    if label.startswith("DIRECT"):
+        return RouteDecision("direct", "classified as general knowledge", "llm")
+    return RouteDecision("research", "classified as needing current information", "llm")
+
+
+class ResearchDurationTracker:
+    """Exponential moving average of research run durations, seeded with a configured baseline."""
+
+    def __init__(self, baseline_seconds: float, alpha: float = 0.2) -> None:
+        self.alpha = alpha
+        self._average = baseline_seconds
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._average += self.alpha * (seconds - self._average)
+
+    @property
+    def average_seconds(self) -> float:
+        return self._average
+
+
+research_durations = ResearchDurationTracker(float(os.getenv("QUERY_ROUTER_RESEARCH_BASELINE_SECONDS", "60")))
@@ -0,0 +1,189 @@
+"""
+Runs the research crew and shapes its output into API payloads.
+
+Both the inline request path and the background job workers go through these
+functions, so a job result is exactly what the synchronous endpoint would return.
+"""
+
+import time
+
+import numpy as np
+
+from app.services.answer_cache import ANSWER_CACHE_ENABLED, answer_cache
+from app.services.metrics import REQUEST_SECONDS, RunTimeline, timed, track_run
+from app.services.query_router import QUERY_ROUTER_ENABLED, RouteDecision, classify_query, research_durations
+from app.services.run_artifacts import run_artifacts
+from app.services.run_events import run_event_broker
+from app.tools.aisearch_tool import embed_texts
+from app.tools.current_date_tool import CurrentDateTool
+from app.tools.direct_answer_tool import ERROR_ANSWERS, DirectAnswerTool
+from crewai_config.crew import LatestAIResearchCrew
+
+
+class SafeDict(dict):
+    def __missing__(self, key):
+        return ""
+
+
+def run_analysis(query: str, max_links: int = 3, run_id: str | None = None, fresh: bool = False) -> dict:
+    """
+    Run the research crew for the analysis endpoint and return its response payload.
+    With the answer cache on, a near-identical query answered earlier today with the same ``max_links``
+    is served from it unless ``fresh``.
+    The payload's ``timings`` lists the stages of this run with their start offsets and durations.
+    """
+    with track_run() as timeline, timed(REQUEST_SECONDS, endpoint="analysis", route="crew") as labels:
+        current_date = CurrentDateTool()._run().strip()
+        options = {"max_links": max_links}
+        cached, query_vector = _cached_answer("analysis", query, current_date, fresh, options)
+        if cached is not None:
+            labels["route"] = "cache"
+            return _publish_result(run_id, cached, timeline)
+
+        crew_instance = LatestAIResearchCrew(inputs={"query": query, "max_links": max_links}, run_id=run_id)
+        try:
+            payload = _analysis_payload(crew_instance)
+        except Exception as e:
+            run_event_broker.publish(crew_instance.run_id, "error", {"error": str(e)})
+            raise
+        if crew_instance.final_answer:
+            _remember_answer("analysis", query, current_date, query_vector, payload, options)
+        return _publish_result(crew_instance.run_id, payload, timeline)
+
+
+def _analysis_payload(crew_instance: LatestAIResearchCrew) -> dict:
+    crew_obj = crew_instance.crew()
+    final_output = crew_obj.kickoff()
+
+    run_id = crew_instance.run_id
+
+    return {
+        "agentWorkflow": run_event_broker.workflow(run_id),
+        "finalAnalysis": {
+            "summary": [crew_instance.final_answer],
+            "confidence": getattr(final_output, "confidence", 0.92),
+        },
+        "search_links": run_artifacts.get(run_id, "search_links", []),
+    }
+
+
+def run_chat(inputs: dict, run_id: str | None = None) -> dict:
+    """
+    Answer a chat message and return the payload the chat UI expects.
+
+    Simple, non-time-sensitive messages are answered by ``DirectAnswerTool``; the rest, and messages
+    the tool fails to answer, run the research crew. ``inputs`` may carry ``route`` ("auto", "direct"
+    or "research") to override the router and ``fresh`` to bypass the answer cache. The chosen route
+    is reported under ``route`` and the stages of the run under ``timings``.
+    """
+    safe_inputs = SafeDict(inputs)
+    fresh = bool(safe_inputs.pop("fresh", False))
+    requested_route = safe_inputs.pop("route", "auto") or "auto"
+    safe_inputs.setdefault("url", "")
+    safe_inputs["query"] = safe_inputs.get("message", "")
+    safe_inputs["current_date"] = CurrentDateTool()._run().strip()  # Inject current date
+
+    with track_run() as timeline, timed(REQUEST_SECONDS, endpoint="chat", route="crew") as labels:
+        decision = _route(safe_inputs["query"], requested_route)
+        if decision.route == "direct":
+            direct = _direct_answer(safe_inputs["query"], decision)
+            if direct is not None:
+                labels["route"] = "direct"
+                return _publish_result(run_id, direct, timeline)
+            decision = RouteDecision("research", "direct answer failed", decision.classifier)
+
+        started = time.perf_counter()
+        options = {"url": safe_inputs["url"]}
+        cached, query_vector = _cached_answer("chat", safe_inputs["query"], safe_inputs["current_date"], fresh, options)
+        if cached is not None:
+            labels["route"] = "cache"
+            cached["route"] = decision.as_dict()
+            return _publish_result(run_id, cached, timeline)
+
+        crew_instance = LatestAIResearchCrew(inputs=safe_inputs, run_id=run_id)
+        try:
+            crew = crew_instance.crew()
+            result = crew.kickoff(inputs=safe_inputs)
+        except Exception as e:
+            run_event_broker.publish(crew_instance.run_id, "error", {"error": str(e)})
+            raise
+
+        payload = {
+            "status": "completed",
+            "result": crew_instance.final_answer or getattr(result, "raw", str(result)),
+            "steps": "\n".join(run_event_broker.workflow(crew_instance.run_id)),
+        }
+        elapsed = time.perf_counter() - started
+        research_durations.record(elapsed)
+        if crew_instance.final_answer:
+            _remember_answer("chat", safe_inputs["query"], safe_inputs["current_date"], query_vector, payload, options)
+        payload["route"] = {**decision.as_dict(), "elapsed_ms": round(elapsed * 1000)}
+        return _publish_result(crew_instance.run_id, payload, timeline)
+
+
+def _publish_result(run_id: str | None, payload: dict, timeline: RunTimeline) -> dict:
+    payload["timings"] = timeline.as_dict()
+    run_event_broker.publish(run_id, "result", payload)
+    return payload
+
+
+def _route(message: str, requested_route: str) -> RouteDecision:
+    if requested_route in ("direct", "research"):
+        return RouteDecision(requested_route, "requested by client", "request")
+    if not QUERY_ROUTER_ENABLED:
+        return RouteDecision("research", "router disabled", "request")
+    return classify_query(message)
+
+
+def _direct_answer(message: str, decision: RouteDecision) -> dict | None:
+    """The direct-answer payload, or None when ``DirectAnswerTool`` could not reach the model."""
+    started = time.perf_counter()
+    answer = DirectAnswerTool()._run(message)
+    if answer in ERROR_ANSWERS:
+        print(f"[QueryRouter] Direct answer failed ({answer}); researching instead")
+        return None
+    answer = answer.removeprefix("Final Answer:").strip()
+    elapsed = time.perf_counter() - started
+    payload = {
+        "status": "completed",
+        "result": answer,
+        "steps": f"Routed to direct answer ({decision.reason})",
+        "route": {
+            **decision.as_dict(),
+            "elapsed_ms": round(elapsed * 1000),
+            "estimated_time_saved_ms": round(max(research_durations.average_seconds - elapsed, 0) * 1000),
+        },
+    }
+    return payload
+
+
+def _cached_answer(
+    kind: str, query: str, current_date: str, fresh: bool, options: dict
+) -> tuple[dict | None, np.ndarray | None]:
+    """
+    Look ``query`` up in the answer cache among answers produced with the same ``options``. Returns
+    the payload to serve (or None) and the query embedding, which is reused to store the answer
+    after a fresh run.
+    """
+    if not ANSWER_CACHE_ENABLED or not query:
+        return None, None
+    try:
+        query_vector = embed_texts([query])[0]
+    except Exception as e:
+        print(f"[AnswerCache] Could not embed query, skipping cache: {e}")
+        return None, None
+    if fresh:
+        return None, query_vector
+    match = answer_cache.lookup(kind, current_date, query_vector, options)
+    if match is None:
+        return None, query_vector
+    payload = dict(match["payload"])
+    payload["cache"] = {"hit": True, "similarity": round(match["similarity"], 4), "matched_query": match["query"]}
+    return payload, query_vector
+
+
+def _remember_answer(
+    kind: str, query: str, current_date: str, query_vector: np.ndarray | None, payload: dict, options: dict
+) -> None:
+    if query_vector is not None:
+        answer_cache.put(kind, current_date, query, query_vector, payload, options)
@@ -0,0 +1,101 @@
+"""
+Run-scoped, in-memory store for task outputs and other artifacts of a crew run.
+
+Tasks used to write ``research_output.txt`` and friends into the working
+directory and read them back, so concurrent runs overwrote each other's files.
+Artifacts now live in memory under the run's id; the store keeps the most
+recent ``max_runs`` runs for at most ``ttl_seconds``.
+
+Set ``CREW_DEBUG_OUTPUT_DIR`` to also write every artifact to
+``<dir>/<run_id>/<name>.txt`` for debugging.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class RunArtifactStore:
+    def __init__(self, max_runs: int = 256, ttl_seconds: float = 3600.0, debug_dir: str | None = None) -> None:
+        self.max_runs = max_runs
+        self.ttl_seconds = ttl_seconds
+        self.debug_dir = Path(debug_dir) if debug_dir else None
+        self._runs: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, run_id: str, name: str, content) -> None:
+        """Store ``content`` as artifact ``name`` of ``run_id``, replacing any previous value."""
+        with self._lock:
+            self._artifacts(run_id)[name] = content
+        self._write_debug(run_id, name, content)
+
+    def append(self, run_id: str, name: str, item) -> None:
+        """Append ``item`` to the list artifact ``name`` of ``run_id``."""
+        with self._lock:
+            self._artifacts(run_id).setdefault(name, []).append(item)
+
+    def get(self, run_id: str, name: str, default=None):
+        with self._lock:
+            entry = self._runs.get(run_id)
+            if entry is None or self._expired(entry[0]):
+                return default
+            value = entry[1].get(name, default)
+            return list(value) if isinstance(value, list) else value
+
+    def get_run(self, run_id: str) -> dict:
+        """Return a shallow copy of every artifact recorded for ``run_id``."""
+        with self._lock:
+            entry = self._runs.get(run_id)
+            if entry is None or self._expired(entry[0]):
+                return {}
+            return dict(entry[1])
+
+    def discard(self, run_id: str) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def debug_path(self, run_id: str, filename: str) -> str | None:
+        """Path for a debug file of ``run_id``, or None when the debug sink is disabled."""
+        if self.debug_dir is None:
+            return None
+        run_dir = self.debug_dir / run_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+        return str(run_dir / filename)
+
+    def _artifacts(self, run_id: str) -> dict:
+        # Caller holds the lock.
+        entry = self._runs.get(run_id)
+        if entry is None:
+            self._evict()
+            entry = (time.monotonic(), {})
+            self._runs[run_id] = entry
+        else:
+            self._runs.move_to_end(run_id)
+        return entry[1]
+
+    def _evict(self) -> None:
+        while self._runs and self._expired(next(iter(self._runs.values()))[0]):
+            self._runs.popitem(last=False)
+        while len(self._runs) >= self.max_runs:
+            self._runs.popitem(last=False)
+
+    def _expired(self, created_at: float) -> bool:
+        return time.monotonic() - created_at > self.ttl_seconds
+
+    def _write_debug(self, run_id: str, name: str, content) -> None:
+        if self.debug_dir is None:
+            return
+        try:
+            Path(self.debug_path(run_id, f"{name}.txt")).write_text(str(content), encoding="utf-8")
+        except OSError as e:
+            print(f"[RunArtifactStore] Could not write debug artifact {run_id}/{name}: {e}")
+
+
+# Process-wide store shared by the crew callbacks and the views.
+run_artifacts = RunArtifactStore(
+    max_runs=int(os.getenv("RUN_ARTIFACTS_MAX_RUNS", "256")),
+    ttl_seconds=float(os.getenv("RUN_ARTIFACTS_TTL_SECONDS", "3600")),
+    debug_dir=os.getenv("CREW_DEBUG_OUTPUT_DIR") or None,
+)
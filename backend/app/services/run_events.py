@@ -0,0 +1,168 @@
+"""
+Structured, per-run event log with publish/subscribe.
+
+The crew's step callback, its task callbacks and AISearchTool publish typed
+``RunEvent`` records under the run's id. Each run keeps its events in a bounded
+ring buffer, so reading a run's workflow costs O(events of that run) no matter
+how long the server has been up, and runs never see each other's steps.
+
+The streaming endpoint subscribes to a run and receives each event as it is
+published; a subscriber that connects late is first replayed the buffered
+history. A run's buffer is dropped once it has had no events and no subscribers
+for ``retention_seconds``, whether or not it ended with a terminal event (runs
+kicked off outside the research runner and subscriptions to unknown ids never
+do), so the number of buffered runs stays bounded. Set ``RUN_EVENTS_JSONL_PATH`` to also append every event to a
+JSON-lines file.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+
+# Event types that end a run's stream.
+TERMINAL_EVENTS = {"result", "error"}
+# Event types that make up the agent workflow shown in the UI.
+WORKFLOW_EVENTS = {"step", "tool_result"}
+
+
+@dataclass(frozen=True)
+class RunEvent:
+    run_id: str
+    seq: int
+    type: str
+    timestamp: float
+    data: dict
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Channel:
+    events: deque
+    subscribers: list[queue.Queue] = field(default_factory=list)
+    next_seq: int = 0
+    closed_at: float | None = None
+    last_activity: float = field(default_factory=time.monotonic)
+
+
+class RunEventBroker:
+    def __init__(
+        self,
+        max_events_per_run: int = 2000,
+        retention_seconds: float = 300.0,
+        jsonl_path: str | None = None,
+    ) -> None:
+        self.max_events_per_run = max_events_per_run
+        self.retention_seconds = retention_seconds
+        self.jsonl_path = jsonl_path
+        self._channels: dict[str, _Channel] = {}
+        self._lock = threading.Lock()
+        self._sink_lock = threading.Lock()
+
+    def publish(self, run_id: str | None, event_type: str, data: dict) -> RunEvent | None:
+        """Record an event for ``run_id`` and hand it to every live subscriber."""
+        if not run_id:
+            return None
+        with self._lock:
+            self._purge_expired()
+            channel = self._channel(run_id)
+            if channel.closed_at is not None:
+                return None
+            event = RunEvent(run_id=run_id, seq=channel.next_seq, type=event_type, timestamp=time.time(), data=data)
+            channel.next_seq += 1
+            channel.events.append(event)
+            channel.last_activity = time.monotonic()
+            if event_type in TERMINAL_EVENTS:
+                channel.closed_at = channel.last_activity
+            subscribers = list(channel.subscribers)
+        for subscriber in subscribers:
+            subscriber.put(event)
+        self._write_sink(event)
+        return event
+
+    def events(self, run_id: str, types: set[str] | None = None) -> list[RunEvent]:
+        """Return the buffered events of ``run_id``, optionally only those of the given types."""
+        with self._lock:
+            channel = self._channels.get(run_id)
+            if channel is None:
+                return []
+            return [event for event in channel.events if types is None or event.type in types]
+
+    def workflow(self, run_id: str) -> list[str]:
+        """The run's step and tool-result log lines, in the order they happened."""
+        return [event.data.get("entry", "") for event in self.events(run_id, WORKFLOW_EVENTS)]
+
+    def subscribe(self, run_id: str, heartbeat_seconds: float = 15.0) -> Iterator[RunEvent | None]:
+        """
+        Yield the run's events in order, replaying buffered history first, until a terminal
+        event. Yields None whenever ``heartbeat_seconds`` pass without an event, so the caller
+        can keep the connection alive.
+        """
+        inbox: queue.Queue = queue.Queue()
+        with self._lock:
+            self._purge_expired()
+            channel = self._channel(run_id)
+            backlog = list(channel.events)
+            channel.subscribers.append(inbox)
+        try:
+            for event in backlog:
+                yield event
+                if event.type in TERMINAL_EVENTS:
+                    return
+            while True:
+                try:
+                    event = inbox.get(timeout=heartbeat_seconds)
+                except queue.Empty:
+                    yield None
+                    continue
+                yield event
+                if event.type in TERMINAL_EVENTS:
+                    return
+        finally:
+            with self._lock:
+                if inbox in channel.subscribers:
+                    channel.subscribers.remove(inbox)
+                channel.last_activity = time.monotonic()
+
+    def _channel(self, run_id: str) -> _Channel:
+        # Caller holds the lock.
+        channel = self._channels.get(run_id)
+        if channel is None:
+            channel = _Channel(events=deque(maxlen=self.max_events_per_run))
+            self._channels[run_id] = channel
+        return channel
+
+    def _purge_expired(self) -> None:
+        # Caller holds the lock. Closed or not, a run nobody has published to or watched for a while is gone.
+        now = time.monotonic()
+        expired = [
+            run_id
+            for run_id, channel in self._channels.items()
+            if not channel.subscribers and now - channel.last_activity > self.retention_seconds
+        ]
+        for run_id in expired:
+            del self._channels[run_id]
+
+    def _write_sink(self, event: RunEvent) -> None:
+        if not self.jsonl_path:
+            return
+        line = json.dumps(event.to_dict(), default=str)
+        try:
+            with self._sink_lock, open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"[RunEventBroker] Could not write event to {self.jsonl_path}: {e}")
+
+
+# Process-wide broker shared by the crew, the tools and the views.
+run_event_broker = RunEventBroker(
+    max_events_per_run=int(os.getenv("RUN_EVENTS_MAX_PER_RUN", "2000")),
+    retention_seconds=float(os.getenv("RUN_EVENTS_RETENTION_SECONDS", "300")),
+    jsonl_path=os.getenv("RUN_EVENTS_JSONL_PATH") or None,
+)
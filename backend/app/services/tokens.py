@@ -0,0 +1,49 @@
+"""
+Token counting for budgeting embedding batches and LLM context.
+
+Uses tiktoken's ``cl100k_base`` encoding (shared by gpt-4o-era chat and the
+text-embedding-3 models) when it is installed, and otherwise falls back to the
+usual ~4 characters per token estimate.
+"""
+
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken ships with crewai/litellm
+    tiktoken = None
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The encoding file is downloaded on first use; stay usable offline.
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return max(1, len(text) // 4) if text else 0
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_by_tokens(text: str, max_tokens: int, overlap_tokens: int = 0) -> list[str]:
+    """Cut ``text`` into windows of at most ``max_tokens`` tokens, each overlapping the previous one."""
+    if not text:
+        return []
+    step = max(1, max_tokens - overlap_tokens)
+    encoding = _encoding()
+    if encoding is None:
+        # Same ~4 characters per token estimate as count_tokens.
+        size, stride = max_tokens * 4, step * 4
+        return [text[start : start + size] for start in range(0, max(len(text) - (size - stride), 1), stride)]
+    tokens = encoding.encode(text, disallowed_special=())
+    return [
+        encoding.decode(tokens[start : start + max_tokens])
+        for start in range(0, max(len(tokens) - (max_tokens - step), 1), step)
+    ]
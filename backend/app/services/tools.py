@@ -10,7 +10,7 @@ import random
 from crewai.tools import BaseTool
 from pydantic import BaseModel, ConfigDict, Field
 
-from .vector_store import ChromaVectorStore
+from .vector_store import get_vector_store
 
 # --------------------------------------------------------------------------
 # 1) StoreTextTool
@@ -37,7 +37,7 @@ class StoreTextTool(BaseTool):
     )
 
     def _run(self, text: str) -> str:
-        vs = ChromaVectorStore(persist_directory=".chroma-local")
+        vs = get_vector_store()
         vs.store_text(text)
         return f"Stored text: {text[:50]}..."
 
@@ -65,8 +65,8 @@ class RetrieveTextTool(BaseTool):
     )
 
     def _run(self, query: str) -> str:
-        vs = ChromaVectorStore(persist_directory=".chroma-local")
-        results = vs.search_similar(query, n_results=3)
+        vs = get_vector_store()
+        results = vs.search_similar(query, n_results=3, mode="auto")
         docs = results["documents"][0] if results and "documents" in results else []
         if not docs:
             return "No similar text found."
@@ -0,0 +1,120 @@
+"""
+URL canonicalization for search results.
+
+Search engines return the same article under several URLs: with tracking parameters
+(``utm_*``, ``fbclid``, ...), as an AMP or mobile variant, or through an AMP cache
+mirror (``*.cdn.ampproject.org``, ``google.com/amp/s/...``). ``canonicalize_url``
+maps all of these to one URL, and ``collapse_duplicates`` keeps the first (best
+ranked) result per canonical URL so each article is fetched once.
+
+The canonical form is only a grouping key, never fetched: rewriting a URL this way
+can break it (an AMP page's ``.html`` twin may not exist, a mobile site may serve
+different paths, re-encoding or re-sorting a signed query invalidates it).
+"""
+
+import re
+import urllib.parse
+
+TRACKING_PARAMS = frozenset(
+    {
+        "fbclid",
+        "gclid",
+        "dclid",
+        "msclkid",
+        "yclid",
+        "igshid",
+        "mc_cid",
+        "mc_eid",
+        "_ga",
+        "_gl",
+        "ref_src",
+        "ref_url",
+        "cmpid",
+        "ocid",
+        "smid",
+        "spm",
+        "share",
+        "amp",
+        "outputtype",
+        "output",
+    }
+)
+TRACKING_PREFIXES = ("utm_", "at_", "pk_", "hsa_")
+# Only dropped with these values, since on other sites the same names carry content.
+TRACKING_VALUES = {"output": {"amp"}, "outputtype": {"amp"}, "amp": {"", "1", "true"}, "share": {"", "1", "true"}}
+HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+AMP_PATH = re.compile(r"/amp/?$|\.amp(?=(\.html?)?$)")
+AMP_CACHE_HOST = re.compile(r"\.cdn\.ampproject\.org$")
+
+
+def _unmirror(parts: urllib.parse.SplitResult) -> urllib.parse.SplitResult:
+    """The original URL behind an AMP cache link, or ``parts`` unchanged."""
+    host = parts.hostname or ""
+    path = parts.path
+    if AMP_CACHE_HOST.search(host):
+        # https://<host>.cdn.ampproject.org/c/s/<host>/<path>; "/s/" marks an https origin.
+        match = re.match(r"^/[a-z]/(s/)?(.+)$", path)
+    elif re.match(r"^(www\.)?google\.[a-z.]+$", host) and path.startswith("/amp/"):
+        match = re.match(r"^/amp/(s/)?(.+)$", path)
+    else:
+        return parts
+    if not match:
+        return parts
+    scheme = "https" if match.group(1) else "http"
+    original = urllib.parse.urlsplit(f"{scheme}://{match.group(2)}")
+    return original._replace(query=parts.query or original.query)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Lowercased scheme and host without ``www.``/mobile/AMP prefixes or default port, no
+    fragment, tracking parameters removed and the rest sorted, AMP path suffixes and
+    trailing slashes (other than the root) dropped.
+    """
+    try:
+        parts = _unmirror(urllib.parse.urlsplit(url.strip()))
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower().rstrip(".")
+    if not host:
+        return url
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix) :]
+            break
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+
+    path = AMP_PATH.sub("", parts.path or "/")
+    path = re.sub(r"/{2,}", "/", path)
+    if len(path) > 1:
+        path = path.rstrip("/")
+    path = path or "/"
+
+    query = []
+    for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True):
+        lowered = name.lower()
+        if lowered.startswith(TRACKING_PREFIXES):
+            continue
+        if lowered in TRACKING_PARAMS and value.lower() in TRACKING_VALUES.get(lowered, {value.lower()}):
+            continue
+        query.append((name, value))
+    return urllib.parse.urlunsplit((scheme, netloc, path, urllib.parse.urlencode(sorted(query)), ""))
+
+
+def collapse_duplicates(results: list[dict]) -> tuple[list[dict], int]:
+    """
+    The first (best ranked) search result per canonical URL, in the original order, with its
+    ``url`` unchanged and the canonical form under ``canonical_url``. The URLs of the results
+    collapsed into it are listed under ``aliases``. Returns the results and how many were collapsed.
+    """
+    kept: dict[str, dict] = {}
+    for result in results:
+        canonical = canonicalize_url(result["url"])
+        if canonical in kept:
+            kept[canonical].setdefault("aliases", []).append(result["url"])
+            continue
+        kept[canonical] = {**result, "canonical_url": canonical}
+    return list(kept.values()), len(results) - len(kept)
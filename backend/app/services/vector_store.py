@@ -1,10 +1,17 @@
+import hashlib
 import os
-import uuid
+import threading
+from functools import lru_cache
+from pathlib import Path
 
 from dotenv import load_dotenv
 from langchain_chroma import Chroma  # Updated package
 from langchain_openai import AzureOpenAIEmbeddings
 
+from app.services.chunking import sliding_window_chunks
+from app.services.lexical_index import BM25Index, reciprocal_rank_fusion
+from app.services.metrics import CHROMA_CHUNKS, CHROMA_QUERY_SECONDS, CHROMA_WRITE_SECONDS, timed
+
 # Load environment variables
 load_dotenv()
 # Remove any legacy variable to avoid conflicts.
@@ -15,29 +22,155 @@ endpoint = os.getenv("AZURE_API_BASE", "")
 azure_endpoint = endpoint.rstrip("/") if endpoint else None
 
 
+SEARCH_MODES = ("hybrid", "lexical", "vector", "auto")
+# backend/.chroma-local by default, wherever the process is started from.
+DEFAULT_PERSIST_DIRECTORY = os.getenv(
+    "CHROMA_PERSIST_DIRECTORY", str(Path(__file__).resolve().parent.parent.parent / ".chroma-local")
+)
+DEFAULT_COLLECTION = "crew-ai"
+# Long texts are stored as overlapping chunks of about this many tokens.
+STORE_CHUNK_TOKENS = int(os.getenv("VECTOR_STORE_CHUNK_TOKENS", "400"))
+STORE_CHUNK_OVERLAP_TOKENS = int(os.getenv("VECTOR_STORE_CHUNK_OVERLAP_TOKENS", "50"))
+# Chunks embedded and written per Chroma call.
+STORE_BATCH_SIZE = int(os.getenv("VECTOR_STORE_BATCH_SIZE", "256"))
+
+
+@lru_cache(maxsize=1)
+def _shared_embeddings() -> AzureOpenAIEmbeddings:
+    # One embeddings client (and HTTP pool) for every store in the process.
+    return AzureOpenAIEmbeddings(
+        azure_endpoint=azure_endpoint,
+        api_key=os.getenv("AZURE_API_KEY", ""),
+        api_version=os.getenv("AZURE_API_VERSION", "2024-06-01"),
+    )
+
+
 class ChromaVectorStore:
-    def __init__(self, persist_directory: str = "") -> None:
-        self.embeddings = AzureOpenAIEmbeddings(
-            azure_endpoint=endpoint.rstrip("/") if endpoint else None,
-            api_key=os.getenv("AZURE_API_KEY", ""),
-            api_version=os.getenv("AZURE_API_VERSION", "2024-06-01"),
-        )
+    def __init__(self, persist_directory: str = "", collection_name: str = DEFAULT_COLLECTION) -> None:
+        self.embeddings = _shared_embeddings()
         self.persist_directory = persist_directory or None
-        # Persistence is automatic with the new Chroma
-        self.db = Chroma(collection_name="crew-ai", embedding_function=self.embeddings)
+        # With a directory Chroma opens a persistent client there; without one the collection is in memory.
+        self.db = Chroma(
+            collection_name=collection_name,
+            embedding_function=self.embeddings,
+            persist_directory=self.persist_directory,
+        )
+        # Keyword index over the same documents, rebuilt from the collection when their sizes differ.
+        self.lexical = BM25Index()
+        self._lexical_lock = threading.Lock()
 
     def store_text(self, text: str) -> None:
-        doc_id = str(uuid.uuid4())
         try:
-            self.db.add_texts(texts=[text], metadatas=[{"id": doc_id}])
+            self.store_texts([text])
         except Exception as e:
             print("Error during store_text:", e)
 
-    def search_similar(self, query_text: str, n_results: int = 3) -> dict:
-        try:
-            docs = self.db.similarity_search(query_text, k=n_results)
-            doc_texts = [doc.page_content for doc in docs]
-            return {"documents": [doc_texts]}
-        except Exception as e:
-            print("Error during search_similar:", e)
-            return {"documents": []}
+    def store_texts(self, texts: list[str], metadatas: list[dict] | None = None) -> dict:
+        """
+        Chunk, embed and upsert ``texts``. Chunk ids are the SHA-256 of the chunk text, so storing
+        the same content again is a no-op. Returns ``{"written": n, "skipped": n, "ids": [...]}``
+        where ``ids`` lists each distinct chunk id in input order.
+        """
+        chunks: dict[str, tuple[str, dict]] = {}
+        for index, text in enumerate(texts):
+            if not text.strip():
+                continue
+            source = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            pieces = sliding_window_chunks(text, STORE_CHUNK_TOKENS, STORE_CHUNK_OVERLAP_TOKENS) or [text]
+            for position, piece in enumerate(pieces):
+                doc_id = hashlib.sha256(piece.encode("utf-8")).hexdigest()
+                metadata = {
+                    **(metadatas[index] if metadatas else {}),
+                    "id": doc_id,
+                    "source": source,
+                    "chunk": position,
+                }
+                chunks.setdefault(doc_id, (piece, metadata))
+
+        ids = list(chunks)
+        with timed(CHROMA_WRITE_SECONDS, "chroma_write", detail={"chunks": len(ids)}):
+            existing = set(self.db.get(ids=ids, include=[])["ids"]) if ids else set()
+            new_ids = [doc_id for doc_id in ids if doc_id not in existing]
+            for start in range(0, len(new_ids), STORE_BATCH_SIZE):
+                batch = new_ids[start : start + STORE_BATCH_SIZE]
+                self.db.add_texts(
+                    texts=[chunks[doc_id][0] for doc_id in batch],
+                    metadatas=[chunks[doc_id][1] for doc_id in batch],
+                    ids=batch,
+                )
+                for doc_id in batch:
+                    self.lexical.add(doc_id, chunks[doc_id][0])
+        CHROMA_CHUNKS.inc(len(new_ids), result="written")
+        CHROMA_CHUNKS.inc(len(ids) - len(new_ids), result="skipped")
+        return {"written": len(new_ids), "skipped": len(ids) - len(new_ids), "ids": ids}
+
+    def search_similar(self, query_text: str, n_results: int = 3, mode: str = "vector") -> dict:
+        """
+        Find the documents closest to ``query_text``.
+
+        ``mode`` is one of:
+        - "vector": embedding similarity only (the default).
+        - "hybrid": BM25 and embedding rankings merged with reciprocal rank fusion.
+        - "lexical": BM25 only; no embedding call.
+        - "auto": BM25 when it finds ``n_results`` keyword hits, hybrid otherwise.
+
+        The BM25 index lives in this process. Chunks other workers write to a persisted
+        collection are picked up when the collection's size no longer matches the index, so an
+        update that replaces a chunk with a same-sized set shows up only after a restart.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {mode!r}; expected one of {SEARCH_MODES}")
+        with timed(CHROMA_QUERY_SECONDS, "chroma_query", mode=mode) as labels:
+            try:
+                lexical_ids = (
+                    [] if mode == "vector" else [doc_id for doc_id, _ in self._lexical_search(query_text, n_results)]
+                )
+                if mode == "lexical" or (mode == "auto" and len(lexical_ids) >= n_results):
+                    return {"documents": [[self.lexical.text(doc_id) for doc_id in lexical_ids]]}
+
+                docs = self.db.similarity_search(query_text, k=n_results)
+                if mode == "vector":
+                    return {"documents": [[doc.page_content for doc in docs]]}
+                texts = {doc_id: self.lexical.text(doc_id) for doc_id in lexical_ids}
+                texts.update({doc.id or doc.page_content: doc.page_content for doc in docs})
+                fused = reciprocal_rank_fusion([lexical_ids, [doc.id or doc.page_content for doc in docs]])
+                return {"documents": [[texts[doc_id] for doc_id in fused[:n_results]]]}
+            except Exception as e:
+                print("Error during search_similar:", e)
+                labels["outcome"] = "error"
+                return {"documents": []}
+
+    def _lexical_search(self, query_text: str, n_results: int) -> list[tuple[str, float]]:
+        # A count is one cheap query; langchain's Chroma only exposes it through the collection.
+        if self.db._collection.count() != len(self.lexical):
+            with self._lexical_lock:
+                stored = self.db.get(include=["documents"])
+                if len(stored["ids"]) != len(self.lexical):
+                    lexical = BM25Index()
+                    for doc_id, text in zip(stored["ids"], stored["documents"]):
+                        lexical.add(doc_id, text)
+                    self.lexical = lexical
+        return self.lexical.search(query_text, n_results)
+
+
+_stores: dict[tuple[str | None, str], ChromaVectorStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_vector_store(
+    persist_directory: str | None = DEFAULT_PERSIST_DIRECTORY, collection_name: str = DEFAULT_COLLECTION
+) -> ChromaVectorStore:
+    """
+    The process-wide store for ``(persist_directory, collection_name)``, opened on first use.
+    Tools should call this instead of constructing a ``ChromaVectorStore`` per call.
+    """
+    key = (os.path.abspath(persist_directory) if persist_directory else None, collection_name)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = _stores[key] = ChromaVectorStore(
+                    persist_directory=key[0] or "", collection_name=collection_name
+                )
+    return store
@@ -1,17 +1,47 @@
+import asyncio
 import concurrent.futures
+import contextvars
+import logging
 import os
 import re
+import time
 import urllib.parse
 
 import numpy as np
-import requests
 from crewai.tools import BaseTool
-from openai import AzureOpenAI
 from pydantic import BaseModel, ConfigDict, Field
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from app.services.cache import TieredCache
+from app.services.chunking import mmr_select, sliding_window_chunks, spread_sample
+from app.services.clients import (
+    async_client_scope,
+    get_async_azure_openai_client,
+    get_async_fetch_semaphore,
+    get_async_http_client,
+    get_azure_openai_client,
+    get_fetch_executor,
+    get_http_session,
+)
+from app.services.embedding_cache import EmbeddingCache
+from app.services.fetch_scheduler import host_scheduler, interleave_by_host
+from app.services.metrics import (
+    EMBEDDING_BATCH_INPUTS,
+    EMBEDDING_REQUEST_SECONDS,
+    READER_FETCH_RETRIES,
+    READER_FETCH_SECONDS,
+    SEARCH_DUPLICATE_LINKS,
+    SERPER_SEARCH_SECONDS,
+    timed,
+)
+from app.services.page_cache import PageCache
+from app.services.run_events import run_event_broker
+from app.services.tokens import count_tokens, split_by_tokens
+from app.services.urls import collapse_duplicates
 from app.tools.current_date_tool import CurrentDateTool
 
+logger = logging.getLogger(__name__)
+
 
 # Input model now includes a dynamic max_links field.
 class AISearchInput(BaseModel):
@@ -19,16 +49,79 @@ class AISearchInput(BaseModel):
     max_links: int = Field(3, description="Maximum number of links to retrieve from search")
 
 
+# Serper results keyed by normalized query. The query already carries the current date,
+# so a cached answer never outlives the day it was fetched for.
+serper_cache = TieredCache(
+    "serper",
+    ttl_seconds=float(os.getenv("SERPER_CACHE_TTL_SECONDS", "3600")),
+    memory_entries=int(os.getenv("SERPER_CACHE_MEMORY_ENTRIES", "256")),
+    disk_entries=int(os.getenv("SERPER_CACHE_DISK_ENTRIES", "10000")),
+)
+SERPER_CACHE_ENABLED = os.getenv("SERPER_CACHE_ENABLED", "true").lower() in ["true", "1", "yes"]
+# Overridable so tests and benchmarks can point the tool at local stand-ins.
+SERPER_API_URL = os.getenv("SERPER_API_URL", "https://google.serper.dev/search")
+JINA_READER_URL = os.getenv("JINA_READER_URL", "https://r.jina.ai/")
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
 def serper_search(query: str) -> list[dict]:
+    with timed(SERPER_SEARCH_SECONDS, "serper_search", source="api") as labels:
+        if not SERPER_CACHE_ENABLED:
+            return _serper_search(query)
+        key = normalize_query(query)
+        results = serper_cache.get(key)
+        if results is None:
+            results = _serper_search(query)
+            if results:
+                serper_cache.set(key, results)
+        else:
+            labels["source"] = "cache"
+        return results
+
+
+async def aserper_search(query: str) -> list[dict]:
+    with timed(SERPER_SEARCH_SECONDS, "serper_search", source="api") as labels:
+        if not SERPER_CACHE_ENABLED:
+            return await _aserper_search(query)
+        key = normalize_query(query)
+        results = await asyncio.to_thread(serper_cache.get, key)
+        if results is None:
+            results = await _aserper_search(query)
+            if results:
+                await asyncio.to_thread(serper_cache.set, key, results)
+        else:
+            labels["source"] = "cache"
+        return results
+
+
+def _serper_request(query: str) -> dict:
     api_key = os.getenv("SERPER_API_KEY")
     if not api_key:
         raise ValueError("SERPER_API_KEY not set in environment.")
-    url = "https://google.serper.dev/search"
-    headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
-    payload = {"q": query}
-    response = requests.post(url, headers=headers, json=payload, timeout=10)
+    return {
+        "url": SERPER_API_URL,
+        "headers": {"X-API-KEY": api_key, "Content-Type": "application/json"},
+        "json": {"q": query},
+        "timeout": 10,
+    }
+
+
+def _serper_search(query: str) -> list[dict]:
+    response = get_http_session().post(**_serper_request(query))
+    response.raise_for_status()
+    return _parse_serper_results(response.json())
+
+
+async def _aserper_search(query: str) -> list[dict]:
+    response = await get_async_http_client().post(**_serper_request(query))
     response.raise_for_status()
-    data = response.json()
+    return _parse_serper_results(response.json())
+
+
+def _parse_serper_results(data: dict) -> list[dict]:
     organic_results = data.get("organic", [])
     results = []
     for result in organic_results:
@@ -44,54 +137,291 @@ def serper_search(query: str) -> list[dict]:
     return results
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=6))
+# Reader output keyed by URL. Stale pages with validators are revalidated instead of refetched.
+reader_cache = PageCache(
+    fresh_seconds=float(os.getenv("READER_CACHE_TTL_SECONDS", "21600")),
+    max_age_seconds=float(os.getenv("READER_CACHE_MAX_AGE_SECONDS", "604800")),
+    max_bytes=int(os.getenv("READER_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+)
+READER_CACHE_ENABLED = os.getenv("READER_CACHE_ENABLED", "true").lower() in ["true", "1", "yes"]
+
+# Embeddings keyed by (model, dimensions, sha256(text)), stored as float32 blobs.
+embedding_cache = EmbeddingCache(
+    max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000")),
+    memory_entries=int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "4096")),
+)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ["true", "1", "yes"]
+EMBEDDING_DIMENSIONS = int(os.getenv("AZURE_OPENAI_EMBEDDING_DIMENSIONS", "0")) or None
+# Upper bounds for a single embeddings request.
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "60000"))
+EMBEDDING_BATCH_MAX_INPUTS = int(os.getenv("EMBEDDING_BATCH_MAX_INPUTS", "2048"))
+
+
+def _count_reader_retry(retry_state) -> None:
+    READER_FETCH_RETRIES.inc()
+
+
+# Each attempt is timed separately, so retries show up as extra reader_fetch_seconds observations.
+# Network requests wait for a slot on the page's host (see fetch_scheduler); cache hits do not.
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=6),
+    before_sleep=_count_reader_retry,
+)
 def fetch_reader_content(link: str) -> str:
-    reader_url = f"https://r.jina.ai/{urllib.parse.quote(link, safe='')}"
+    with timed(READER_FETCH_SECONDS, "fetch_reader_content", detail={"url": link}, source="network") as labels:
+        cached = reader_cache.get(link) if READER_CACHE_ENABLED else None
+        if cached is not None and cached.is_fresh(reader_cache.fresh_seconds):
+            reader_cache.stats.incr("hits")
+            labels["source"] = "cache"
+            return cached.text
+
+        try:
+            with host_scheduler.slot(link):
+                response = get_http_session().get(**_reader_request(link, cached))
+            if response.status_code == 304:
+                labels["source"] = "revalidated"
+            return _reader_response(link, cached, response)
+        except Exception as e:
+            if cached is None:
+                raise
+            labels["source"] = "stale"
+            return _stale_reader_content(cached, e)
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=6),
+    before_sleep=_count_reader_retry,
+)
+async def afetch_reader_content(link: str) -> str:
+    with timed(READER_FETCH_SECONDS, "fetch_reader_content", detail={"url": link}, source="network") as labels:
+        # The SQLite tiers block, so cache reads and writes run in a worker thread.
+        cached = await asyncio.to_thread(reader_cache.get, link) if READER_CACHE_ENABLED else None
+        if cached is not None and cached.is_fresh(reader_cache.fresh_seconds):
+            reader_cache.stats.incr("hits")
+            labels["source"] = "cache"
+            return cached.text
+
+        try:
+            async with host_scheduler.aslot(link):
+                response = await get_async_http_client().get(**_reader_request(link, cached))
+            if response.status_code == 304:
+                labels["source"] = "revalidated"
+            return await asyncio.to_thread(_reader_response, link, cached, response)
+        except Exception as e:
+            if cached is None:
+                raise
+            labels["source"] = "stale"
+            return _stale_reader_content(cached, e)
+
+
+async def _afetch_limited(link: str) -> str:
+    # Async fetches share the loop's semaphore, the counterpart of the thread pool's size limit.
+    async with get_async_fetch_semaphore():
+        return await afetch_reader_content(link)
+
+
+def _reader_request(link: str, cached) -> dict:
+    reader_url = f"{JINA_READER_URL}{urllib.parse.quote(link, safe='')}"
     headers = {"User-Agent": "Mozilla/5.0"}
-    response = requests.get(reader_url, headers=headers, timeout=10)
+    if cached is not None:
+        headers.update(cached.conditional_headers())
+    return {"url": reader_url, "headers": headers, "timeout": 10}
+
+
+def _reader_response(link: str, cached, response) -> str:
+    if response.status_code == 304 and cached is not None:
+        reader_cache.stats.incr("hits_revalidated")
+        reader_cache.mark_revalidated(cached)
+        return cached.text
     response.raise_for_status()
+
+    if READER_CACHE_ENABLED:
+        reader_cache.stats.incr("misses")
+        reader_cache.put(link, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
     return response.text
 
 
-def filter_relevant_chunks(content: str, query: str, threshold: float = 0.75, max_paragraphs: int = 20) -> str:
+def _stale_reader_content(cached, error: Exception) -> str:
+    # Revalidation failed: a stale copy beats retrying a site that is down, so serve it, marked stale.
+    reader_cache.stats.incr("hits_stale")
+    print(f"[AISearchTool] Revalidating {cached.url} failed ({error}); serving the stale cached copy")
+    return f"[Stale cached copy from {time.strftime('%Y-%m-%d', time.gmtime(cached.fetched_at))}]\n{cached.text}"
+
+
+# Relevance filtering: pages are cut into overlapping token windows and each source keeps its
+# most relevant, least redundant chunks up to SOURCE_TOKEN_BUDGET tokens.
+CHUNK_TOKENS = int(os.getenv("AISEARCH_CHUNK_TOKENS", "200"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("AISEARCH_CHUNK_OVERLAP_TOKENS", "40"))
+MAX_CHUNKS_PER_SOURCE = int(os.getenv("AISEARCH_MAX_CHUNKS_PER_SOURCE", "128"))
+SOURCE_TOKEN_BUDGET = int(os.getenv("AISEARCH_SOURCE_TOKEN_BUDGET", "800"))
+MMR_DIVERSITY = float(os.getenv("AISEARCH_MMR_DIVERSITY", "0.3"))
+
+
+def filter_relevant_chunks(content: str, query: str, token_budget: int | None = None) -> str:
+    return rank_relevant_chunks([content], query, token_budget)[0]
+
+
+async def afilter_relevant_chunks(content: str, query: str, token_budget: int | None = None) -> str:
+    return (await arank_relevant_chunks([content], query, token_budget))[0]
+
+
+def rank_relevant_chunks(documents: list[str], query: str, token_budget: int | None = None) -> list[str]:
+    """
+    The most relevant chunks of each document, one string of at most ``token_budget`` tokens per
+    document. The query is embedded once and the chunks of all documents share embedding batches.
+    """
+    chunks, owners = _collect_chunks(documents)
+    vectors = embed_texts([query, *chunks]) if chunks else []
+    return _select_relevant(len(documents), chunks, owners, vectors, token_budget or SOURCE_TOKEN_BUDGET)
+
+
+async def arank_relevant_chunks(documents: list[str], query: str, token_budget: int | None = None) -> list[str]:
+    chunks, owners = _collect_chunks(documents)
+    vectors = await aembed_texts([query, *chunks]) if chunks else []
+    return _select_relevant(len(documents), chunks, owners, vectors, token_budget or SOURCE_TOKEN_BUDGET)
+
+
+# Markdown image, with no cap on the target so long data: URIs go too. Alt text may hold one level of
+# brackets ("![fig [1]](...)") and the URL one level of parentheses (Wikipedia's "File:A_(b).png").
+# Anything deeper ends the scan, so an "![" that never closes is scanned only up to the next couple of
+# brackets instead of to the end of the line, which keeps matching linear on minified pages.
+MARKDOWN_IMAGE = re.compile(r"!\[(?:[^\[\]\n]|\[[^\[\]\n]*\])*\]\((?:[^()\n]|\([^()\n]*\))*\)")
+
+
+def _clean_reader_text(content: str) -> str:
     # Remove markdown images and extraneous lines (e.g., "URL Source:" and "Image <number>")
-    content = re.sub(r"!\[.*?\]\(.*?\)", "", content)
+    content = MARKDOWN_IMAGE.sub("", content)
     content = re.sub(r"URL Source:\s*https?:\/\/\S+", "", content)
     content = re.sub(r"Image\s+\d+.*", "", content)
+    return content
+
 
-    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", content) if p.strip()]
-    if len(paragraphs) > max_paragraphs:
-        paragraphs = paragraphs[:max_paragraphs]
+def _collect_chunks(documents: list[str]) -> tuple[list[str], list[int]]:
+    # Flatten every document's chunks, remembering which document each one came from.
+    chunks, owners = [], []
+    for index, document in enumerate(documents):
+        document_chunks = sliding_window_chunks(_clean_reader_text(document), CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS)
+        # Long pages are sampled across their whole length, not cut after the first chunks.
+        document_chunks = spread_sample(document_chunks, MAX_CHUNKS_PER_SOURCE)
+        chunks.extend(document_chunks)
+        owners.extend([index] * len(document_chunks))
+    return chunks, owners
 
-    query_emb = get_embedding(query)
-    para_embs = get_embedding(paragraphs)
-    relevant_chunks = []
-    for para, emb in zip(paragraphs, para_embs):
-        similarity = cosine_similarity(query_emb, emb)
-        if similarity >= threshold:
-            relevant_chunks.append(para)
-    return "\n\n".join(relevant_chunks) if relevant_chunks else content[:1000]
+
+def _select_relevant(
+    document_count: int, chunks: list[str], owners: list[int], vectors: list[np.ndarray], token_budget: int
+) -> list[str]:
+    if not chunks:
+        return [""] * document_count
+    query_vector, matrix = vectors[0], np.vstack(vectors[1:])
+    sizes = [count_tokens(chunk) for chunk in chunks]
+    owners = np.asarray(owners)
+    selected = []
+    for document in range(document_count):
+        indices = np.flatnonzero(owners == document)
+        picked = mmr_select(query_vector, matrix[indices], [sizes[i] for i in indices], token_budget, MMR_DIVERSITY)
+        if not picked and len(indices):
+            # Every chunk is larger than the budget: keep the start of the most relevant one.
+            best = indices[int(np.argmax(matrix[indices] @ query_vector))]
+            print(f"[AISearchTool] No chunk of source {document} fits {token_budget} tokens; truncating the best one")
+            selected.append(split_by_tokens(chunks[best], token_budget)[0])
+            continue
+        # Keep the picked chunks in document order so the excerpt reads naturally.
+        selected.append("\n\n".join(chunks[indices[i]] for i in sorted(picked)))
+    return selected
 
 
 def get_embedding(text: str | list[str]) -> list[float] | list[list[float]]:
-    client = AzureOpenAI(
-        api_key=os.getenv("AZURE_API_KEY"),
-        api_version=os.getenv("AZURE_API_VERSION", "2024-06-01"),
-        azure_endpoint=os.getenv("AZURE_API_BASE"),
-    )
-    embedding_model = os.getenv("AZURE_OPENAI_EMBEDDING_MODEL", "text-embedding-3-large")
     if isinstance(text, list):
-        response = client.embeddings.create(input=text, model=embedding_model)
-        return [item.embedding for item in response.data]
+        return [vector.tolist() for vector in embed_texts(text)]
+    return embed_texts([text])[0].tolist()
+
+
+def embed_texts(texts: list[str]) -> list[np.ndarray]:
+    """Embed ``texts`` as float32 vectors, sending only the texts missing from the cache to Azure."""
+    model, vectors, misses = _cached_embeddings(texts)
+    if misses:
+        client = get_azure_openai_client()
+        fetched = []
+        for batch in embedding_batches(misses):
+            with _timed_embedding_request(batch):
+                response = client.embeddings.create(input=batch, **_embedding_params(model))
+            fetched.extend(item.embedding for item in response.data)
+        vectors = _merge_embeddings(model, texts, vectors, misses, fetched)
+    return vectors
+
+
+async def aembed_texts(texts: list[str]) -> list[np.ndarray]:
+    """Async variant of ``embed_texts``; batches are sent concurrently, cache lookups run in a thread."""
+    model, vectors, misses = await asyncio.to_thread(_cached_embeddings, texts)
+    if misses:
+        client = get_async_azure_openai_client()
+        responses = await asyncio.gather(
+            *(_acreate_embeddings(client, batch, model) for batch in embedding_batches(misses))
+        )
+        fetched = [item.embedding for response in responses for item in response.data]
+        vectors = await asyncio.to_thread(_merge_embeddings, model, texts, vectors, misses, fetched)
+    return vectors
+
+
+async def _acreate_embeddings(client, batch: list[str], model: str):
+    with _timed_embedding_request(batch):
+        return await client.embeddings.create(input=batch, **_embedding_params(model))
+
+
+def _timed_embedding_request(batch: list[str]):
+    EMBEDDING_BATCH_INPUTS.observe(len(batch))
+    return timed(EMBEDDING_REQUEST_SECONDS, "get_embedding", detail={"inputs": len(batch)})
+
+
+def embedding_batches(texts: list[str]) -> list[list[str]]:
+    """Split ``texts`` into request-sized batches bounded by total tokens and input count."""
+    batches: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if current and (
+            current_tokens + tokens > EMBEDDING_BATCH_MAX_TOKENS or len(current) >= EMBEDDING_BATCH_MAX_INPUTS
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _cached_embeddings(texts: list[str]) -> tuple[str, list, list[str]]:
+    model = os.getenv("AZURE_OPENAI_EMBEDDING_MODEL", "text-embedding-3-large")
+    if EMBEDDING_CACHE_ENABLED:
+        vectors = embedding_cache.get_many(model, EMBEDDING_DIMENSIONS, texts)
     else:
-        response = client.embeddings.create(input=[text], model=embedding_model)
-        return response.data[0].embedding
+        vectors = [None] * len(texts)
+    misses = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+    return model, vectors, misses
+
+
+def _embedding_params(model: str) -> dict:
+    return {"model": model, "dimensions": EMBEDDING_DIMENSIONS} if EMBEDDING_DIMENSIONS else {"model": model}
+
+
+def _merge_embeddings(
+    model: str, texts: list[str], vectors: list, misses: list[str], fetched_vectors: list
+) -> list[np.ndarray]:
+    fetched = {text: np.asarray(vector, dtype=np.float32) for text, vector in zip(misses, fetched_vectors)}
+    if EMBEDDING_CACHE_ENABLED:
+        embedding_cache.put_many(model, EMBEDDING_DIMENSIONS, misses, [fetched[text] for text in misses])
+    return [vector if vector is not None else fetched[text] for text, vector in zip(texts, vectors)]
 
 
-def cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
-    a = np.array(vec1)
-    b = np.array(vec2)
-    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+# Streaming mode: when either budget is set, pages are filtered as they arrive and the
+# remaining fetches are cancelled once this much relevant content has been collected.
+CONTENT_BUDGET_TOKENS = int(os.getenv("AISEARCH_CONTENT_BUDGET_TOKENS", "0")) or None
+CONTENT_BUDGET_CHARS = int(os.getenv("AISEARCH_CONTENT_BUDGET_CHARS", "0")) or None
 
 
 class AISearchTool(BaseTool):
@@ -107,44 +437,210 @@ class AISearchTool(BaseTool):
     args_schema: type[BaseModel] = AISearchInput
     model_config = ConfigDict(check_fields=False, extra="allow", arbitrary_types_allowed=True)
     result_as_answer: bool = True
+    run_id: str | None = None  # Set by the crew so progress can be streamed to the client
+    content_budget_tokens: int | None = CONTENT_BUDGET_TOKENS
+    content_budget_chars: int | None = CONTENT_BUDGET_CHARS
 
     def _run(self, query: str, max_links: int = 3) -> str:
-        print(f"[AISearchTool] Received query: '{query}' with max_links={max_links}")
-        current_date = CurrentDateTool()._run().strip()
-        query = f"{query} {current_date}"
-        print(f"[AISearchTool] Final query after appending current date: '{query}'")
-
+        query = self._dated_query(query, max_links)
         try:
             results = serper_search(query)
             if not results:
                 return "No search results found from Serper AI."
         except Exception as e:
             return f"Error fetching search links from Serper AI: {e}"
+        results = self._limit_results(results, max_links)
 
-        # Limit results based on the provided max_links value.
-        results = results[:max_links]
-        print(f"[AISearchTool] Retrieved {len(results)} links from Serper AI.")
+        if self._streaming():
+            combined_contents = self._stream_sources(query, results)
+        else:
+            combined_contents = self._collect_sources(query, results)
+        return self._final_result(results, combined_contents)
 
+    async def _arun(self, query: str, max_links: int = 3) -> str:
+        query = self._dated_query(query, max_links)
+        async with async_client_scope():
+            try:
+                results = await aserper_search(query)
+                if not results:
+                    return "No search results found from Serper AI."
+            except Exception as e:
+                return f"Error fetching search links from Serper AI: {e}"
+            results = self._limit_results(results, max_links)
+
+            if self._streaming():
+                combined_contents = await self._astream_sources(query, results)
+            else:
+                combined_contents = await self._acollect_sources(query, results)
+        return self._final_result(results, combined_contents)
+
+    def _collect_sources(self, query: str, results: list[dict]) -> list[str]:
+        # Fetch every page first, then score all of their paragraphs in one relevance pass.
+        pages, combined_contents = [], []
+        future_to_result = self._submit_fetches(results)
+        for future in concurrent.futures.as_completed(future_to_result):
+            res = future_to_result[future]
+            try:
+                pages.append((res, future.result()))
+            except Exception as e:
+                combined_contents.append(self._error_block(res, e))
+        try:
+            relevant = rank_relevant_chunks([content for _, content in pages], query)
+            combined_contents.extend(self._source_block(res, content) for (res, _), content in zip(pages, relevant))
+        except Exception as e:
+            combined_contents.extend(self._error_block(res, e) for res, _ in pages)
+        return combined_contents
+
+    async def _acollect_sources(self, query: str, results: list[dict]) -> list[str]:
+        results = interleave_by_host(results, url=lambda res: res["url"])
+        fetched = await asyncio.gather(*(_afetch_limited(res["url"]) for res in results), return_exceptions=True)
+        pages = [(res, content) for res, content in zip(results, fetched) if not isinstance(content, BaseException)]
+        combined_contents = [
+            self._error_block(res, content)
+            for res, content in zip(results, fetched)
+            if isinstance(content, BaseException)
+        ]
+        try:
+            relevant = await arank_relevant_chunks([content for _, content in pages], query)
+            combined_contents.extend(self._source_block(res, content) for (res, _), content in zip(pages, relevant))
+        except Exception as e:
+            combined_contents.extend(self._error_block(res, e) for res, _ in pages)
+        return combined_contents
+
+    def _stream_sources(self, query: str, results: list[dict]) -> list[str]:
+        # Filter pages as they land, all pages that arrived together in one relevance pass (one
+        # embedding request), and stop waiting once the budget is met.
+        combined_contents = []
+        used = {"tokens": 0, "chars": 0}
+        future_to_result = self._submit_fetches(results)
+        pending = set(future_to_result)
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            pages = self._arrived_pages(results, future_to_result, done, combined_contents)
+            try:
+                relevant = rank_relevant_chunks([content for _, content in pages], query) if pages else []
+            except Exception as e:
+                combined_contents.extend(self._error_block(res, e) for res, _ in pages)
+                continue
+            if self._add_within_budget(combined_contents, used, pages, relevant):
+                break
+        # Fetches already running finish in the background; their results are ignored.
+        for future in pending:
+            future.cancel()
+        self._report_budget(used, [future_to_result[future] for future in pending])
+        return combined_contents
+
+    async def _astream_sources(self, query: str, results: list[dict]) -> list[str]:
         combined_contents = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=len(results)) as executor:
-            future_to_result = {executor.submit(fetch_reader_content, res["url"]): res for res in results}
-            for future in concurrent.futures.as_completed(future_to_result):
-                res = future_to_result[future]
+        used = {"tokens": 0, "chars": 0}
+        task_to_result = {
+            asyncio.ensure_future(_afetch_limited(res["url"])): res
+            for res in interleave_by_host(results, url=lambda res: res["url"])
+        }
+        pending = set(task_to_result)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pages = self._arrived_pages(results, task_to_result, done, combined_contents)
                 try:
-                    full_content = future.result()
-                    relevant_content = filter_relevant_chunks(full_content, query, max_paragraphs=20)
-                    combined_contents.append(
-                        f"URL: {res['url']} | Title: {res['title']} | Snippet: {res['snippet']}\nContent:\n{relevant_content}\n{'-'*40}\n"
-                    )
+                    relevant = await arank_relevant_chunks([content for _, content in pages], query) if pages else []
                 except Exception as e:
-                    combined_contents.append(f"URL: {res['url']}\nError fetching content: {e}\n{'-'*40}\n")
+                    combined_contents.extend(self._error_block(res, e) for res, _ in pages)
+                    continue
+                if self._add_within_budget(combined_contents, used, pages, relevant):
+                    return combined_contents
+            return combined_contents
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self._report_budget(used, [task_to_result[task] for task in pending if task.cancelled()])
+
+    def _arrived_pages(self, results: list[dict], future_to_result: dict, done: set, combined_contents: list) -> list:
+        """``(result, content)`` for each finished fetch in search order; failed fetches become error blocks."""
+        pages = []
+        for future in sorted(done, key=lambda future: results.index(future_to_result[future])):
+            res = future_to_result[future]
+            try:
+                pages.append((res, future.result()))
+            except Exception as e:
+                combined_contents.append(self._error_block(res, e))
+        return pages
+
+    def _add_within_budget(self, combined_contents: list, used: dict, pages: list, relevant: list[str]) -> bool:
+        """Append source blocks until the budget is met; pages that arrived alongside are then dropped."""
+        for (res, _), relevant_content in zip(pages, relevant):
+            combined_contents.append(self._source_block(res, relevant_content))
+            if self._spend_budget(used, relevant_content):
+                return True
+        return False
+
+    def _submit_fetches(self, results: list[dict]) -> dict:
+        # Each fetch runs in a copy of this context so it lands on the calling run's timeline.
+        # Hosts are interleaved so pool workers are not all parked waiting on one host's limit.
+        executor = get_fetch_executor()
+        return {
+            executor.submit(contextvars.copy_context().run, fetch_reader_content, res["url"]): res
+            for res in interleave_by_host(results, url=lambda res: res["url"])
+        }
+
+    def _streaming(self) -> bool:
+        return bool(self.content_budget_tokens or self.content_budget_chars)
+
+    def _spend_budget(self, used: dict, relevant_content: str) -> bool:
+        """Charge ``relevant_content`` against the budget; True once either limit is reached."""
+        used["tokens"] += count_tokens(relevant_content)
+        used["chars"] += len(relevant_content)
+        return bool(
+            (self.content_budget_tokens and used["tokens"] >= self.content_budget_tokens)
+            or (self.content_budget_chars and used["chars"] >= self.content_budget_chars)
+        )
+
+    def _report_budget(self, used: dict, skipped: list[dict]) -> None:
+        if not skipped:
+            return
+        print(
+            f"[AISearchTool] Content budget reached ({used['tokens']} tokens, {used['chars']} chars); "
+            f"cancelled {len(skipped)} remaining fetches."
+        )
+        run_event_broker.publish(self.run_id, "budget_reached", {**used, "skipped": [res["url"] for res in skipped]})
+
+    def _dated_query(self, query: str, max_links: int) -> str:
+        print(f"[AISearchTool] Received query: '{query}' with max_links={max_links}")
+        current_date = CurrentDateTool()._run().strip()
+        query = f"{query} {current_date}"
+        print(f"[AISearchTool] Final query after appending current date: '{query}'")
+        return query
+
+    def _limit_results(self, results: list[dict], max_links: int) -> list[dict]:
+        # Collapse tracking-parameter, AMP/mobile and mirror variants first, so max_links counts distinct pages.
+        results, collapsed = collapse_duplicates(results)
+        if collapsed:
+            SEARCH_DUPLICATE_LINKS.inc(collapsed)
+            print(f"[AISearchTool] Collapsed {collapsed} duplicate links.")
+        results = results[:max_links]
+        print(f"[AISearchTool] Retrieved {len(results)} links from Serper AI.")
+        run_event_broker.publish(self.run_id, "search_links", {"links": results})
+        return results
+
+    def _source_block(self, res: dict, relevant_content: str) -> str:
+        run_event_broker.publish(self.run_id, "source", {"url": res["url"], "content": relevant_content})
+        return f"URL: {res['url']} | Title: {res['title']} | Snippet: {res['snippet']}\nContent:\n{relevant_content}\n{'-'*40}\n"
+
+    def _error_block(self, res: dict, error: Exception) -> str:
+        run_event_broker.publish(self.run_id, "source", {"url": res["url"], "error": str(error)})
+        return f"URL: {res['url']}\nError fetching content: {error}\n{'-'*40}\n"
+
+    def _final_result(self, results: list[dict], combined_contents: list[str]) -> str:
         # Prepend a header with all search link information so it is present in the output.
         header = "\n".join(
             [f"URL: {res['url']} | Title: {res['title']} | Snippet: {res['snippet']}" for res in results]
         )
         self.search_links = results
-        final_result = header + "\n" + "\n".join(combined_contents)
-        return final_result
-
-    async def _arun(self, query: str, max_links: int = 3) -> str:
-        return self._run(query, max_links)
+        logger.debug(
+            "Cache stats: serper=%s reader=%s embeddings=%s",
+            serper_cache.stats.as_dict(),
+            reader_cache.stats.as_dict(),
+            embedding_cache.stats.as_dict(),
+        )
+        return header + "\n" + "\n".join(combined_contents)
@@ -1,7 +1,7 @@
 from crewai.tools import BaseTool, tool
 from pydantic import BaseModel, ConfigDict, Field
 
-from app.services.vector_store import ChromaVectorStore
+from app.services.vector_store import get_vector_store
 
 
 # Define input schema for storing text.
@@ -18,9 +18,11 @@ class StoreTextTool(BaseTool):
 
     def _run(self, text: str) -> str:
         try:
-            store = ChromaVectorStore(persist_directory=".chroma-local")
-            store.store_text(text)
-            return "Text stored successfully"
+            store = get_vector_store()
+            report = store.store_texts([text])
+            return (
+                f"Text stored successfully ({report['written']} chunk(s) written, {report['skipped']} already stored)"
+            )
         except Exception as e:
             return f"Storage error: {str(e)}"
 
@@ -50,8 +52,8 @@ class RetrieveTextTool(BaseTool):
 
     def _run(self, query: str) -> str:
         try:
-            store = ChromaVectorStore(persist_directory=".chroma-local")
-            results = store.search_similar(query)
+            store = get_vector_store()
+            results = store.search_similar(query, mode="auto")
             if results["documents"] and results["documents"][0]:
                 return "\n".join(results["documents"][0][:3])
             return "No similar text found."
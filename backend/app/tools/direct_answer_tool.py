@@ -2,11 +2,20 @@ import logging
 import os
 
 from crewai.tools import BaseTool
-from openai import APIError, AzureOpenAI
+from openai import APIError
 from pydantic import BaseModel, Field
 
+from app.services.clients import get_azure_openai_client
+
 logger = logging.getLogger(__name__)
 
+# What _run returns when it could not get an answer from Azure.
+ERROR_ANSWERS = (
+    "Final Answer: Error processing API response format",
+    "Final Answer: Service temporarily unavailable",
+    "Final Answer: Could not process your request",
+)
+
 
 class DirectAnswerInput(BaseModel):
     query: str = Field(..., description="The user query to answer directly.")
@@ -19,13 +28,8 @@ class DirectAnswerTool(BaseTool):
 
     def _run(self, query: str) -> str:
         try:
-            logger.debug("Initializing Azure OpenAI client")
-            client = AzureOpenAI(
-                api_key=os.getenv("AZURE_API_KEY"),
-                api_version=os.getenv("AZURE_API_VERSION", "2024-06-01"),
-                azure_endpoint=os.getenv("AZURE_API_BASE"),
-                max_retries=3,
-            )
+            # Shared client; with_options keeps its connection pool.
+            client = get_azure_openai_client().with_options(max_retries=3)
 
             logger.debug(f"Sending query to Azure: {query}")
             response = client.chat.completions.create(
@@ -52,10 +56,10 @@ class DirectAnswerTool(BaseTool):
 
         except IndexError as ie:
             logger.error(f"Azure response format error: {ie}")
-            return "Final Answer: Error processing API response format"
+            return ERROR_ANSWERS[0]
         except APIError as ae:
             logger.error(f"Azure API error: {ae}")
-            return "Final Answer: Service temporarily unavailable"
+            return ERROR_ANSWERS[1]
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
-            return "Final Answer: Could not process your request"
+            return ERROR_ANSWERS[2]
@@ -1,24 +1,39 @@
 # backend/app/tools/summarize_tool.py
 
+import os
 
 from crewai.tools import BaseTool
 from pydantic import BaseModel, ConfigDict, Field
 
+from app.services.compaction import compact_context
+from app.services.metrics import CONTEXT_TOKENS
+
+# Tokens the research output may take up once compacted, before it is handed to the aggregator.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+# SimHash bits two paragraphs may differ by and still count as the same text.
+CONTEXT_DUPLICATE_DISTANCE = int(os.getenv("CONTEXT_DUPLICATE_DISTANCE", "6"))
+
 
 class SummarizeInput(BaseModel):
     text: str = Field(..., description="Text to summarize")
+    max_tokens: int | None = Field(None, description="Token budget for the summary; defaults to CONTEXT_TOKEN_BUDGET")
 
 
 class SummarizeTool(BaseTool):
     name: str = "summarize_tool"
-    description: str = "Summarize provided text into a concise overview"
+    description: str = (
+        "Summarize provided text extractively: drop near-duplicate paragraphs and keep its most "
+        "informative sentences, in their original order, within a token budget"
+    )
     args_schema: type[BaseModel] = SummarizeInput
     model_config = ConfigDict(check_fields=False, extra="allow", arbitrary_types_allowed=True)
 
-    def _run(self, text: str) -> str:
-        # For demonstration, we simulate summarization by truncating the text.
-        summary = text[:150] + "..." if len(text) > 150 else text
-        return f"Summary: {summary}"
+    def _run(self, text: str, max_tokens: int | None = None) -> str:
+        compacted = compact_context(text, max_tokens or CONTEXT_TOKEN_BUDGET, CONTEXT_DUPLICATE_DISTANCE)
+        CONTEXT_TOKENS.observe(compacted.tokens_before, side="input")
+        CONTEXT_TOKENS.observe(compacted.tokens_after, side="output")
+        print(f"[SummarizeTool] Compacted context: {compacted.report()}")
+        return compacted.text
 
-    async def _arun(self, text: str) -> str:
-        return self._run(text)
+    async def _arun(self, text: str, max_tokens: int | None = None) -> str:
+        return self._run(text, max_tokens)
@@ -0,0 +1,5 @@
+"""
+Offline benchmarks. Run from the backend directory, e.g.::
+
+    python -m benchmarks.vector_store_registry
+"""
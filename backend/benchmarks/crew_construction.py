@@ -0,0 +1,66 @@
+"""
+Cost of building a ``LatestAIResearchCrew`` and its ``Crew`` for one run.
+
+Reports wall time per construction, the allocations made while building (tracemalloc
+peak), and how much memory is still held after the crews are dropped and garbage
+collected, which shows whether finished runs are being retained.
+
+    python -m benchmarks.crew_construction --iterations 20
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+os.environ.setdefault("AZURE_API_KEY", "benchmark")
+os.environ.setdefault("AZURE_API_BASE", "http://localhost")
+
+from crewai_config.crew import LatestAIResearchCrew  # noqa: E402
+
+
+def build(i: int):
+    crew_instance = LatestAIResearchCrew(inputs={"query": f"latest ai news {i}", "max_links": 3})
+    return crew_instance.crew()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    build(-1)  # Warm up imports and lazily created clients.
+    gc.collect()
+
+    timings = []
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for i in range(args.iterations):
+        start = time.perf_counter()
+        build(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    results = {
+        "iterations": args.iterations,
+        "mean_ms": round(statistics.mean(timings), 2),
+        "p50_ms": round(statistics.median(timings), 2),
+        "peak_alloc_kb": round((peak - baseline) / 1024, 1),
+        "retained_kb_per_run": round((retained - baseline) / 1024 / args.iterations, 1),
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Local stand-ins for the external APIs a research run calls: Serper search, the Jina
+reader, and Azure OpenAI chat completions and embeddings.
+
+Each fake is a threaded HTTP server on 127.0.0.1 with its own ``FakeServiceConfig``:
+a fixed latency per request, the share of requests answered with a 503, and a payload
+size (search results per query, KB of page text, words per chat answer, embedding
+dimensions). ``FakeServices.environment()`` returns the environment variables that
+point the backend at them; set them before the app modules are imported.
+
+The fake chat model speaks just enough of crewai's ReAct format to drive the crew:
+when the prompt offers ``aisearch_tool`` and it has not called it yet, it asks for
+that tool; otherwise it returns a Markdown final answer.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from benchmarks.text import WORDS, paragraph
+
+
+@dataclass
+class FakeServiceConfig:
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    size: int = 0  # Meaning depends on the service; see FakeServices.
+
+
+@dataclass
+class FakeServices:
+    serper: FakeServiceConfig = field(default_factory=lambda: FakeServiceConfig(latency_ms=300, size=10))
+    reader: FakeServiceConfig = field(default_factory=lambda: FakeServiceConfig(latency_ms=800, size=20))
+    chat: FakeServiceConfig = field(default_factory=lambda: FakeServiceConfig(latency_ms=1500, size=300))
+    embeddings: FakeServiceConfig = field(default_factory=lambda: FakeServiceConfig(latency_ms=150, size=256))
+    seed: int = 0
+    _servers: dict = field(default_factory=dict, repr=False)
+
+    def start(self) -> "FakeServices":
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+        handlers = {"serper": self._serper, "reader": self._reader, "azure": self._azure}
+        for name, handler in handlers.items():
+            server = ThreadingHTTPServer(("127.0.0.1", 0), _handler_class(handler))
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name=f"fake-{name}", daemon=True).start()
+            self._servers[name] = server
+        return self
+
+    def stop(self) -> None:
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+
+    def __enter__(self) -> "FakeServices":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def url(self, name: str) -> str:
+        host, port = self._servers[name].server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self) -> dict[str, str]:
+        return {
+            "SERPER_API_URL": f"{self.url('serper')}/search",
+            "SERPER_API_KEY": "fake",
+            "JINA_READER_URL": f"{self.url('reader')}/",
+            "AZURE_API_BASE": self.url("azure"),
+            "AZURE_API_KEY": "fake",
+        }
+
+    def _delay(self, config: FakeServiceConfig) -> bool:
+        """Sleep for the configured latency; True when this request should fail."""
+        if config.latency_ms:
+            time.sleep(config.latency_ms / 1000)
+        with self._rng_lock:
+            return self._rng.random() < config.error_rate
+
+    def _serper(self, method: str, path: str, body: dict) -> tuple[int, dict | str]:
+        if self._delay(self.serper):
+            return 503, {"error": "fake outage"}
+        digest = hashlib.sha256(json.dumps(body).encode("utf-8")).hexdigest()[:8]
+        organic = [
+            {
+                "link": f"https://news{i}.example.com/{digest}/article-{i}",
+                "title": f"Article {i} for {body.get('q', '')}",
+                "snippet": f"Snippet {i} about {' '.join(WORDS[i % len(WORDS) : i % len(WORDS) + 4])}.",
+            }
+            for i in range(self.serper.size)
+        ]
+        return 200, {"organic": organic}
+
+    def _reader(self, method: str, path: str, body: dict) -> tuple[int, dict | str]:
+        if self._delay(self.reader):
+            return 503, "fake outage"
+        rng = random.Random(path)
+        paragraphs, size = [], 0
+        while size < self.reader.size * 1024:
+            paragraphs.append(paragraph(rng))
+            size += len(paragraphs[-1]) + 2
+        return 200, "\n\n".join(paragraphs)
+
+    def _azure(self, method: str, path: str, body: dict) -> tuple[int, dict | str]:
+        if path.endswith("/embeddings"):
+            if self._delay(self.embeddings):
+                return 503, {"error": {"message": "fake outage"}}
+            inputs = body.get("input", [])
+            inputs = inputs if isinstance(inputs, list) else [inputs]
+            data = [
+                {"object": "embedding", "index": i, "embedding": _vector(item, self.embeddings.size)}
+                for i, item in enumerate(inputs)
+            ]
+            usage = {"prompt_tokens": len(inputs), "total_tokens": len(inputs)}
+            return 200, {"object": "list", "data": data, "model": body.get("model", "fake"), "usage": usage}
+        if path.endswith("/chat/completions"):
+            if self._delay(self.chat):
+                return 503, {"error": {"message": "fake outage"}}
+            return 200, _chat_completion(body.get("messages", []), self.chat.size)
+        return 404, {"error": {"message": f"unknown path {path}"}}
+
+
+def _vector(item, dimensions: int) -> list[float]:
+    seed = int(hashlib.sha256(json.dumps(item).encode("utf-8")).hexdigest()[:8], 16)
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).round(6).tolist()
+
+
+def _chat_completion(messages: list[dict], words: int) -> dict:
+    prompt = "\n".join(str(message.get("content", "")) for message in messages)
+    searched = any(
+        "Action: aisearch_tool" in str(message.get("content", ""))
+        for message in messages
+        if message.get("role") == "assistant"
+    )
+    if "Tool Name: aisearch_tool" in prompt and not searched:
+        content = (
+            "Thought: I should search the web first.\n"
+            "Action: aisearch_tool\n"
+            'Action Input: {"query": "latest research news", "max_links": 3}'
+        )
+    else:
+        body = " ".join(WORDS[i % len(WORDS)] for i in range(words))
+        content = f"Thought: I now know the final answer\nFinal Answer: ## Summary\n\n{body}"
+    prompt_tokens = len(prompt) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "gpt-4o",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _handler_class(respond):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self._reply(respond("GET", self.path.split("?")[0], {}))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                body = {}
+            self._reply(respond("POST", self.path.split("?")[0], body))
+
+        def _reply(self, result: tuple[int, dict | str]) -> None:
+            status, payload = result
+            if isinstance(payload, str):
+                data, content_type = payload.encode("utf-8"), "text/plain; charset=utf-8"
+            else:
+                data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):  # noqa: A002 - signature defined by BaseHTTPRequestHandler
+            pass
+
+    return Handler
@@ -0,0 +1,325 @@
+"""
+Microbenchmarks for the CPU-side code that runs on every research request.
+
+Each case runs over a range of input sizes and reports, per size, the median wall time
+and the peak memory allocated during one call (tracemalloc), plus a growth exponent
+fitted between the smallest and largest size: about 1 means linear, about 2 quadratic.
+Cases growing faster than ``--max-growth`` are flagged, which is how regex
+backtracking or accidental quadratic loops show up.
+
+Cases:
+- reader_cleanup / reader_cleanup_single_line / reader_cleanup_unclosed_images: the image
+  and boilerplate regexes applied to Jina reader pages of 100 KB to 2 MB, with normal line
+  breaks, as one long line, and as one long line of image links that never close.
+- chunking: token-aware sliding windows over the cleaned page.
+- relevance_filter: ``filter_relevant_chunks`` end to end, with embeddings replaced by
+  deterministic local vectors so only the CPU work is measured.
+- extract_search_links: the link regex over research outputs with 100 to 10,000 sources.
+- context_compaction: SimHash deduplication and extractive trimming to a 6,000-token budget
+  of research outputs with 10 to 1,000 sources, every other one a syndicated copy.
+- config_binding_legacy / config_binding: per-run agent and task configs, the way the crew
+  used to build them (deepcopy of the YAML plus ``format_config``) and through the
+  compiled ``CrewTemplate``, for templates of 4 to 400 entries.
+- workflow_log_legacy / workflow_events: the old ``output_log.txt`` split-and-dedup loop
+  over logs of 1 to 10,000 runs, and reading one run's workflow from ``RunEventBroker``
+  with the same number of runs buffered.
+
+    python -m benchmarks.hot_paths --only reader_cleanup,extract_search_links
+"""
+
+import argparse
+import copy
+import gc
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import statistics
+import time
+import tracemalloc
+
+os.environ.setdefault("AZURE_API_KEY", "benchmark")
+os.environ.setdefault("AZURE_API_BASE", "http://localhost")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+import numpy as np  # noqa: E402
+
+from app.services.chunking import sliding_window_chunks  # noqa: E402
+from app.services.compaction import compact_context  # noqa: E402
+from app.services.run_events import RunEventBroker  # noqa: E402
+from app.tools import aisearch_tool  # noqa: E402
+from benchmarks.text import WORDS, paragraph  # noqa: E402
+from crewai_config.crew import extract_search_links, loaded_agents_config, loaded_tasks_config  # noqa: E402
+from crewai_config.template import CrewTemplate  # noqa: E402
+
+INPUTS = {"query": "latest battery research", "current_date": "2025-01-01", "max_links": 3}
+
+
+def reader_page(size: int, single_line: bool = False) -> str:
+    """Reader-style Markdown: paragraphs, image links, "URL Source:" and "Image N" lines."""
+    parts, total, i = [], 0, 0
+    while total < size:
+        parts.append(" ".join(WORDS[(i + j) % len(WORDS)] for j in range(80)) + ".")
+        parts.append(f"![figure {i}](https://example.com/images/{i}.png)")
+        if i % 5 == 0:
+            parts.append(f"URL Source: https://example.com/page/{i}")
+            parts.append(f"Image {i}: caption text for figure {i}")
+        total += sum(len(part) for part in parts[-4:])
+        i += 1
+    return (" " if single_line else "\n\n").join(parts)[:size]
+
+
+def unclosed_images_page(size: int) -> str:
+    """One long line full of "![" that never close: the input that makes lazy image regexes quadratic."""
+    fragment = "![unclosed alt text " + " ".join(WORDS[:6]) + " "
+    return (fragment * (size // len(fragment) + 1))[:size]
+
+
+def research_output(sources: int) -> str:
+    blocks = []
+    for i in range(sources):
+        blocks.append(f"URL: https://example.com/{i} | Title: Source {i} | Snippet: {' '.join(WORDS[:12])}")
+        blocks.append(f"Content:\n{' '.join(WORDS) * 3}\n{'-' * 40}")
+    return "\n".join(blocks)
+
+
+def syndicated_research_output(sources: int) -> str:
+    """AISearchTool-style output where every odd source republishes the previous one with a new lede."""
+    blocks = []
+    for i in range(sources):
+        original = i - i % 2
+        rng = random.Random(original)
+        paragraphs = [paragraph(rng) for _ in range(8)]
+        if i % 2:
+            paragraphs[0] = f"Republished from source {original}. " + paragraphs[0]
+        blocks.append(f"URL: https://example.com/{i} | Title: Source {i} | Snippet: {' '.join(WORDS[:12])}")
+        blocks.append("Content:\n" + "\n\n".join(paragraphs) + f"\n{'-' * 40}")
+    return "\n".join(blocks)
+
+
+def fake_embeddings(texts: list[str]) -> list[np.ndarray]:
+    vectors = []
+    for text in texts:
+        seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+        vector = np.random.default_rng(seed).standard_normal(256).astype(np.float32)
+        vectors.append(vector / np.linalg.norm(vector))
+    return vectors
+
+
+def format_config(cfg, inputs):
+    # The per-run formatting the crew did before the template was compiled once per process.
+    if isinstance(cfg, dict):
+        formatted = {}
+        for key, value in cfg.items():
+            if isinstance(value, str):
+                try:
+                    formatted[key] = value.format(**inputs)
+                except Exception:
+                    formatted[key] = value
+            elif isinstance(value, dict):
+                formatted[key] = format_config(value, inputs)
+            else:
+                formatted[key] = value
+        return formatted
+    return cfg
+
+
+def scaled_configs(entries: int) -> tuple[dict, dict]:
+    """The real agents.yaml/tasks.yaml, repeated until there are ``entries`` tasks."""
+    agents, tasks = {}, {}
+    for copy_index in range(max(1, entries // len(loaded_tasks_config))):
+        suffix = f"_{copy_index}" if copy_index else ""
+        for name, cfg in loaded_agents_config.items():
+            agents[f"{name}{suffix}"] = cfg
+        for name, cfg in loaded_tasks_config.items():
+            task = dict(cfg)
+            task["agent"] = f"{cfg['agent']}{suffix}"
+            if "context" in cfg:
+                task["context"] = [f"{dependency}{suffix}" for dependency in cfg["context"]]
+            tasks[f"{name}{suffix}"] = task
+    return agents, tasks
+
+
+def bind_legacy(agents: dict, tasks: dict) -> list[dict]:
+    agents, tasks = copy.deepcopy(agents), copy.deepcopy(tasks)
+    return [format_config(cfg, INPUTS) for cfg in agents.values()] + [
+        format_config(cfg, INPUTS) for cfg in tasks.values()
+    ]
+
+
+def bind_template(template: CrewTemplate) -> list[dict]:
+    return [template.agent_config(name, INPUTS) for name in template.agents] + [
+        template.task_config(name, INPUTS) for name in template.task_order
+    ]
+
+
+def crew_log(runs: int) -> str:
+    """An ``output_log.txt`` as crewai appended it, with ``runs`` runs of step entries."""
+    entries = []
+    for run in range(runs):
+        for task in ("research_task", "aggregate_task", "store_task", "synthesize_task"):
+            for status in ("started", "completed"):
+                entries.append(
+                    f'2025-01-01 12:{run % 60:02d}:{run % 60:02d}: task_name="{task}", '
+                    f'task="Run {run} {task} for latest battery research", status="{status}"\n'
+                    f"{' '.join(WORDS)}\n{' '.join(WORDS)}"
+                )
+    return "\n".join(entries)
+
+
+def split_and_dedup(log_data: str) -> list[str]:
+    # The loop ResearchAnalysisView.post ran over output_log.txt before runs had their own event log.
+    raw_entries = re.split(r"(?=^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}:)", log_data, flags=re.MULTILINE)
+    raw_entries = [entry.strip() for entry in raw_entries if entry.strip()]
+    seen = set()
+    agent_workflow = []
+    for entry in raw_entries:
+        match = re.search(r'task_name="([^"]+)"', entry)
+        content_match = re.search(r'task="([^"]+)"', entry)
+        if match and content_match:
+            key = (match.group(1), content_match.group(1))
+            if key not in seen:
+                seen.add(key)
+                agent_workflow.append(entry)
+        else:
+            agent_workflow.append(entry)
+    return agent_workflow
+
+
+def event_broker(runs: int) -> RunEventBroker:
+    broker = RunEventBroker(max_events_per_run=2000, retention_seconds=3600)
+    for run in range(runs):
+        for task in ("research_task", "aggregate_task", "store_task", "synthesize_task"):
+            for status in ("started", "completed"):
+                entry = f'2025-01-01 12:00:00: task_name="{task}", task="Run {run} {task}", status="{status}"'
+                broker.publish(f"run-{run}", "step", {"entry": entry, "task_name": task, "status": status})
+    return broker
+
+
+KB = 1024
+CASES = {
+    "reader_cleanup": {
+        "sizes": [100 * KB, 500 * KB, 2048 * KB],
+        "setup": lambda size: (reader_page(size),),
+        "run": aisearch_tool._clean_reader_text,
+    },
+    "reader_cleanup_single_line": {
+        "sizes": [100 * KB, 500 * KB, 2048 * KB],
+        "setup": lambda size: (reader_page(size, single_line=True),),
+        "run": aisearch_tool._clean_reader_text,
+    },
+    "reader_cleanup_unclosed_images": {
+        "sizes": [100 * KB, 500 * KB, 2048 * KB],
+        "setup": lambda size: (unclosed_images_page(size),),
+        "run": aisearch_tool._clean_reader_text,
+    },
+    "chunking": {
+        "sizes": [100 * KB, 500 * KB, 2048 * KB],
+        "setup": lambda size: (aisearch_tool._clean_reader_text(reader_page(size)),),
+        "run": lambda text: sliding_window_chunks(text, aisearch_tool.CHUNK_TOKENS, aisearch_tool.CHUNK_OVERLAP_TOKENS),
+    },
+    "relevance_filter": {
+        "sizes": [100 * KB, 500 * KB, 2048 * KB],
+        "setup": lambda size: (reader_page(size), "battery market analysis"),
+        "run": aisearch_tool.filter_relevant_chunks,
+    },
+    "extract_search_links": {
+        "sizes": [100, 1000, 10000],
+        "setup": lambda sources: (research_output(sources),),
+        "run": extract_search_links,
+    },
+    "context_compaction": {
+        "sizes": [10, 100, 1000],
+        "setup": lambda sources: (syndicated_research_output(sources),),
+        "run": lambda text: compact_context(text, 6000),
+    },
+    "config_binding_legacy": {
+        "sizes": [4, 40, 400],
+        "setup": lambda entries: scaled_configs(entries),
+        "run": bind_legacy,
+    },
+    "config_binding": {
+        "sizes": [4, 40, 400],
+        "setup": lambda entries: (CrewTemplate(*scaled_configs(entries)),),
+        "run": bind_template,
+    },
+    "workflow_log_legacy": {
+        "sizes": [1, 100, 1000, 10000],
+        "setup": lambda runs: (crew_log(runs),),
+        "run": split_and_dedup,
+    },
+    "workflow_events": {
+        "sizes": [1, 100, 1000, 10000],
+        "setup": lambda runs: (event_broker(runs), f"run-{runs - 1}"),
+        "run": lambda broker, run_id: broker.workflow(run_id),
+    },
+}
+
+
+def measure(run, args: tuple, min_seconds: float) -> dict:
+    timings = []
+    while not timings or (sum(timings) < min_seconds and len(timings) < 50):
+        start = time.perf_counter()
+        run(*args)
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    run(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "repeats": len(timings),
+        "peak_kb": round((peak - baseline) / 1024, 1),
+    }
+
+
+def growth(results: list[dict]) -> float | None:
+    first, last = results[0], results[-1]
+    if first["size"] == last["size"] or first["median_ms"] <= 0:
+        return None
+    return round(math.log(last["median_ms"] / first["median_ms"]) / math.log(last["size"] / first["size"]), 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help="Comma-separated case names to run.")
+    parser.add_argument("--min-seconds", type=float, default=0.3, help="Minimum time spent timing each size.")
+    parser.add_argument("--max-growth", type=float, default=1.5, help="Flag cases growing faster than this.")
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    selected = args.only.split(",") if args.only else list(CASES)
+    unknown = set(selected) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    # Relevance filtering should measure chunking and selection, not the embeddings API.
+    aisearch_tool.embed_texts = fake_embeddings
+
+    results = {}
+    for name in selected:
+        case = CASES[name]
+        rows = []
+        for size in case["sizes"]:
+            row = {"size": size, **measure(case["run"], case["setup"](size), args.min_seconds)}
+            rows.append(row)
+            print(f"{name:>28} size={size:<8} {row['median_ms']:>10.3f} ms  peak {row['peak_kb']:>10.1f} KB")
+        exponent = growth(rows)
+        flagged = exponent is not None and exponent > args.max_growth
+        results[name] = {"sizes": rows, "growth": exponent, "flagged": flagged}
+        print(f"{name:>28} growth {exponent}{'  <-- faster than linear' if flagged else ''}")
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
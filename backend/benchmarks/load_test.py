@@ -0,0 +1,214 @@
+"""
+Offline load test of ``/api/analysis/`` and ``/api/chat/`` against local fakes of Serper,
+the Jina reader and Azure OpenAI (see ``benchmarks.fake_services``).
+
+Requests go through ``ResearchAnalysisView`` and ``ResearchView`` in-process, at each
+concurrency level in turn. For every endpoint and level it reports requests per second,
+p50/p95/p99 latency, the error count, and a per-stage breakdown built from the
+``timings`` block of each response. Caches are turned off so every request does the
+full amount of work.
+
+Results are written to ``--results-dir`` (default ``benchmarks/results``) as
+``load-<timestamp>-<commit>.json``, and compared with the newest earlier result
+there, so a regression between commits shows up as a positive delta.
+
+    python -m benchmarks.load_test --concurrency 1,2,4 --requests 8 --chat-latency-ms 500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+
+from benchmarks.fake_services import FakeServiceConfig, FakeServices
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SERVICES = {
+    "serper": "search results per query",
+    "reader": "KB of text per page",
+    "chat": "words per chat answer",
+    "embeddings": "embedding dimensions",
+}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def configure_environment(services: FakeServices, workdir: str) -> None:
+    os.environ.update(services.environment())
+    os.environ.update(
+        {
+            "CACHE_DIR": os.path.join(workdir, "cache"),
+            "CHROMA_PERSIST_DIRECTORY": os.path.join(workdir, "chroma"),
+            "SERPER_CACHE_ENABLED": "false",
+            "READER_CACHE_ENABLED": "false",
+            "EMBEDDING_CACHE_ENABLED": "false",
+            "ANSWER_CACHE_ENABLED": "false",
+            "LLM_CACHE_ENABLED": "false",
+            "OTEL_SDK_DISABLED": "true",
+            "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+            "DJANGO_SETTINGS_MODULE": os.getenv("DJANGO_SETTINGS_MODULE", "crewai_backend.settings"),
+        }
+    )
+
+
+def request_senders() -> dict:
+    # Imported only after the environment points at the fakes.
+    import django
+
+    django.setup()
+    from rest_framework.test import APIRequestFactory
+
+    from app.routers.crewai_router import ResearchView
+    from app.routers.research_analysis_router import ResearchAnalysisView
+
+    factory = APIRequestFactory()
+    analysis_view, chat_view = ResearchAnalysisView.as_view(), ResearchView.as_view()
+
+    def analysis(i: int):
+        body = {"query": f"load test question {i}", "max_links": 3}
+        return analysis_view(factory.post("/api/analysis/", body, format="json"))
+
+    def chat(i: int):
+        body = {"message": f"load test question {i}", "route": "research"}
+        return chat_view(factory.post("/api/chat/", body, format="json"))
+
+    return {"analysis": analysis, "chat": chat}
+
+
+def run_level(send, concurrency: int, requests: int, offset: int) -> dict:
+    latencies, stages, errors = [], {}, 0
+
+    def one(i: int):
+        start = time.perf_counter()
+        response = send(offset + i)
+        return time.perf_counter() - start, response
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    for elapsed, response in outcomes:
+        if response.status_code != 200:
+            errors += 1
+            continue
+        latencies.append(elapsed * 1000)
+        for stage in (response.data.get("timings") or {}).get("stages", []):
+            stages.setdefault(stage["stage"], []).append(stage["duration_ms"])
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / wall, 3),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "stages": {
+            name: {
+                "calls_per_request": round(len(durations) / max(len(latencies), 1), 2),
+                "mean_ms": round(statistics.mean(durations), 1),
+                "p95_ms": round(percentile(durations, 95), 1),
+            }
+            for name, durations in sorted(stages.items())
+        },
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(previous: dict, current: dict) -> list[str]:
+    lines = [f"Compared with {previous.get('commit')} ({previous.get('timestamp')}):"]
+    for endpoint, levels in current["endpoints"].items():
+        before = {level["concurrency"]: level for level in previous.get("endpoints", {}).get(endpoint, [])}
+        for level in levels:
+            old = before.get(level["concurrency"])
+            if old is None:
+                continue
+            deltas = ", ".join(f"{key} {level[key] - old[key]:+.1f}" for key in ("rps", "p50_ms", "p95_ms", "p99_ms"))
+            lines.append(f"  {endpoint} x{level['concurrency']}: {deltas}")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels.")
+    parser.add_argument("--requests", type=int, default=16, help="Requests per endpoint and level.")
+    parser.add_argument("--endpoints", default="analysis,chat", help="Comma-separated: analysis, chat.")
+    defaults = FakeServices()
+    for name, size_help in SERVICES.items():
+        config = getattr(defaults, name)
+        parser.add_argument(f"--{name}-latency-ms", type=float, default=config.latency_ms)
+        parser.add_argument(f"--{name}-error-rate", type=float, default=config.error_rate)
+        parser.add_argument(f"--{name}-size", type=int, default=config.size, help=size_help)
+    parser.add_argument("--results-dir", default=str(RESULTS_DIR))
+    parser.add_argument("--no-save", action="store_true", help="Print the results without writing them.")
+    args = parser.parse_args()
+
+    configs = {
+        name: FakeServiceConfig(
+            latency_ms=getattr(args, f"{name}_latency_ms"),
+            error_rate=getattr(args, f"{name}_error_rate"),
+            size=getattr(args, f"{name}_size"),
+        )
+        for name in SERVICES
+    }
+    levels = [int(level) for level in args.concurrency.split(",")]
+    endpoints = [endpoint.strip() for endpoint in args.endpoints.split(",")]
+
+    with FakeServices(**configs) as services, tempfile.TemporaryDirectory() as workdir:
+        configure_environment(services, workdir)
+        senders = request_senders()
+        senders[endpoints[0]](-1)  # Warm up imports, clients and the crew template.
+        results = {
+            "commit": git_commit(),
+            "timestamp": datetime.now(UTC).strftime("%Y%m%dT%H%M%SZ"),
+            "services": {name: vars(config) for name, config in configs.items()},
+            "endpoints": {},
+        }
+        offset = 0
+        for endpoint in endpoints:
+            results["endpoints"][endpoint] = []
+            for concurrency in levels:
+                level = run_level(senders[endpoint], concurrency, args.requests, offset)
+                offset += args.requests
+                results["endpoints"][endpoint].append(level)
+                print(
+                    f"{endpoint:>8} x{concurrency:<3} {level['rps']:>7.2f} req/s  p50 {level['p50_ms']:>8.1f} ms  "
+                    f"p95 {level['p95_ms']:>8.1f} ms  p99 {level['p99_ms']:>8.1f} ms  errors {level['errors']}"
+                )
+
+    print(json.dumps(results, indent=2))
+    if args.no_save:
+        return
+    results_dir = Path(args.results_dir)
+    previous_files = sorted(results_dir.glob("load-*.json"))
+    if previous_files:
+        print("\n".join(compare(json.loads(previous_files[-1].read_text()), results)))
+    results_dir.mkdir(parents=True, exist_ok=True)
+    path = results_dir / f"load-{results['timestamp']}-{results['commit']}.json"
+    path.write_text(json.dumps(results, indent=2))
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
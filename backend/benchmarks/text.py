@@ -0,0 +1,16 @@
+"""
+Synthetic prose shared by the benchmarks, the fake services and the tests.
+"""
+
+import random
+
+WORDS = (
+    "research model agent vector search latency throughput retrieval embedding source battery quantum market "
+    "policy energy chip release benchmark dataset training inference cluster network analysis report"
+).split()
+
+
+def paragraph(seed: int | str | random.Random, words: int = 60) -> str:
+    """A sentence of ``words`` random ``WORDS``; the same seed gives the same text, a shared ``Random`` a new one."""
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
@@ -0,0 +1,79 @@
+"""
+Per-call ``ChromaVectorStore`` construction versus the pooled ``get_vector_store`` registry.
+
+Each iteration does what ``RetrieveTextTool._run`` does: get a store, then run a keyword
+(``auto``) search. Embedding calls are replaced by a constant vector so the benchmark runs
+offline and only measures client and collection setup.
+
+    python -m benchmarks.vector_store_registry --iterations 50
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("AZURE_API_KEY", "benchmark")
+os.environ.setdefault("AZURE_API_BASE", "http://localhost")
+
+from langchain_openai import AzureOpenAIEmbeddings  # noqa: E402
+
+from app.services import vector_store  # noqa: E402
+
+AzureOpenAIEmbeddings.embed_query = lambda self, text: [0.0, 0.1, 0.2]
+AzureOpenAIEmbeddings.embed_documents = lambda self, texts: [[0.0, 0.1, 0.2] for _ in texts]
+
+
+def per_call(persist_directory: str):
+    # The old behaviour: a fresh embeddings client and collection handle on every call.
+    vector_store._shared_embeddings.cache_clear()
+    return vector_store.ChromaVectorStore(persist_directory=persist_directory)
+
+
+def pooled(persist_directory: str):
+    return vector_store.get_vector_store(persist_directory)
+
+
+def measure(factory, persist_directory: str, iterations: int) -> dict:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        factory(persist_directory).search_similar("quantum computing", mode="auto")
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as persist_directory:
+        seed = vector_store.get_vector_store(persist_directory)
+        for i in range(args.documents):
+            seed.store_text(f"Document {i} about quantum computing, batteries and market news number {i}.")
+
+        results = {
+            "iterations": args.iterations,
+            "documents": args.documents,
+            "per_call": measure(per_call, persist_directory, args.iterations),
+            "pooled": measure(pooled, persist_directory, args.iterations),
+        }
+    results["speedup_p50"] = round(results["per_call"]["p50_ms"] / max(results["pooled"]["p50_ms"], 1e-6), 1)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
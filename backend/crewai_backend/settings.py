@@ -129,6 +129,14 @@ SIMPLE_JWT = {
 #     CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
 #     CELERY_TASK_ALWAYS_EAGER = False
 
+# Background research jobs (see app/services/job_queue.py).
+# Web processes run RESEARCH_JOB_WORKERS local worker threads; set it to 0 on nodes that
+# should only enqueue and run `python manage.py run_research_workers` elsewhere.
+RESEARCH_JOB_WORKERS = int(os.getenv("RESEARCH_JOB_WORKERS", "2"))
+RESEARCH_JOB_POLL_SECONDS = float(os.getenv("RESEARCH_JOB_POLL_SECONDS", "2"))
+RESEARCH_JOB_LEASE_SECONDS = int(os.getenv("RESEARCH_JOB_LEASE_SECONDS", "300"))
+RESEARCH_JOB_MAX_ATTEMPTS = int(os.getenv("RESEARCH_JOB_MAX_ATTEMPTS", "2"))
+
 # Azure OpenAI settings (using documented variable names)
 # Azure OpenAI settings using the standardized names
 AZURE_API_KEY = os.getenv("AZURE_API_KEY", "")
@@ -8,6 +8,7 @@ urlpatterns = [
     path("api/chat/", include("app.routers.crewai_router")),
     path("api/analysis/", include("app.routers.research_analysis_router")),  # Analysis endpoints now active
     path("api/tasks/", include("app.routers.task_status_router")),
+    path("api/metrics/", include("app.routers.metrics_router")),  # Prometheus scrape target
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="docs"),
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
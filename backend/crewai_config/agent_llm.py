@@ -0,0 +1,87 @@
+"""
+The crew's LLM, one instance per agent so every call can be attributed to its agent.
+
+``AgentLLM`` behaves exactly like crewai's ``LLM`` and additionally records each
+call's latency in ``llm_call_seconds{agent=...}`` and on the run's timeline, and
+the usage reported by each completion in ``llm_tokens_total{agent=...}``.
+
+With ``LLM_CACHE_ENABLED`` text completions are served from ``llm_cache``, scoped by
+agent; calls that execute functions (``available_functions``) always go to the model.
+"""
+
+from crewai import LLM
+from litellm.integrations.custom_logger import CustomLogger
+
+from app.services.llm_cache import LLM_CACHE_ENABLED, llm_cache
+from app.services.metrics import LLM_CALL_SECONDS, LLM_TOKENS, timed
+
+# LLM attributes that change the completion for the same messages, and so belong in the cache key.
+SAMPLING_PARAMETERS = (
+    "temperature",
+    "top_p",
+    "n",
+    "stop",
+    "max_completion_tokens",
+    "max_tokens",
+    "presence_penalty",
+    "frequency_penalty",
+    "logit_bias",
+    "response_format",
+    "seed",
+    "logprobs",
+    "top_logprobs",
+    "reasoning_effort",
+    "additional_params",
+)
+
+
+class TokenMeter(CustomLogger):
+    """
+    Counts a completion's usage for one agent. ``LLM.call`` hands every callback the response's
+    usage as ``{"usage": ...}``; litellm's own logging passes the response object, which is skipped
+    so nothing is counted twice.
+    """
+
+    def __init__(self, agent_name: str) -> None:
+        super().__init__()
+        self.agent_name = agent_name
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time) -> None:
+        if not isinstance(response_obj, dict) or not response_obj.get("usage"):
+            return
+        usage = response_obj["usage"]
+        details = getattr(usage, "prompt_tokens_details", None)
+        LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, agent=self.agent_name, kind="prompt")
+        LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, agent=self.agent_name, kind="completion")
+        LLM_TOKENS.inc(getattr(details, "cached_tokens", 0) or 0, agent=self.agent_name, kind="cached_prompt")
+
+
+class AgentLLM(LLM):
+    def __init__(self, agent_name: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        # Set after LLM.__init__, which forwards unknown keyword arguments to litellm.
+        self.agent_name = agent_name
+
+    def cache_request(self, messages, tools=None) -> dict:
+        """Everything the cache key is built from."""
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        request = {"model": self.model, "messages": messages, "tools": tools}
+        request.update({name: getattr(self, name, None) for name in SAMPLING_PARAMETERS})
+        return request
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        callbacks = [*(callbacks or []), TokenMeter(self.agent_name)]
+        with timed(LLM_CALL_SECONDS, "llm_call", agent=self.agent_name, cache="off") as labels:
+            if not LLM_CACHE_ENABLED or available_functions:
+                return super().call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions)
+            request = self.cache_request(messages, tools)
+            response = llm_cache.get(self.agent_name, request)
+            if response is not None:
+                labels["cache"] = "hit"
+                return response
+            labels["cache"] = "miss"
+            response = super().call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions)
+            if isinstance(response, str) and response.strip():
+                llm_cache.put(self.agent_name, request, response)
+            return response
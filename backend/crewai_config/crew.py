@@ -1,19 +1,27 @@
 # backend/crewai_config/crew.py
 
-import copy
 import os
 import re
+import uuid
+from functools import cache, wraps
 from pathlib import Path
 
 import yaml
-from crewai import LLM, Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai import Agent, Crew, Process, Task
 from dotenv import load_dotenv
 
+from app.services.run_artifacts import run_artifacts
+from app.services.run_events import run_event_broker
+
 # Tools
-from app.tools.aisearch_tool import AISearchTool
+from app.tools.aisearch_tool import MARKDOWN_IMAGE, AISearchTool
 from app.tools.crewai_tools import store_text_tool
 from app.tools.current_date_tool import CurrentDateTool
+from app.tools.summarize_tool import SummarizeTool
+from crewai_config.agent_llm import AgentLLM
+from crewai_config.scheduler import DagCrew
+from crewai_config.template import CrewTemplate
+from crewai_config.tool_task import ToolTask
 
 env_path = Path(__file__).resolve().parent.parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
@@ -27,29 +35,29 @@ with open(CONFIG_DIR / "agents.yaml", encoding="utf-8") as f:
 with open(CONFIG_DIR / "tasks.yaml", encoding="utf-8") as f:
     loaded_tasks_config = yaml.safe_load(f)
 
-llm = LLM(
-    model="azure/gpt-4o",  # Adjust as needed
-    api_key=os.getenv("AZURE_API_KEY"),
-    base_url=os.getenv("AZURE_API_BASE"),
-    api_version=os.getenv("AZURE_API_VERSION", "2024-06-01"),
-)
-
-
-def format_config(cfg, inputs):
-    if isinstance(cfg, dict):
-        formatted = {}
-        for key, value in cfg.items():
-            if isinstance(value, str):
-                try:
-                    formatted[key] = value.format(**inputs)
-                except Exception:
-                    formatted[key] = value
-            elif isinstance(value, dict):
-                formatted[key] = format_config(value, inputs)
-            else:
-                formatted[key] = value
-        return formatted
-    return cfg
+# "dag" runs tasks as soon as the tasks in their `context` are done; "sequential" runs them in list order.
+CREW_EXECUTION_MODE = os.getenv("CREW_EXECUTION_MODE", "dag").lower()
+
+# Parsed and compiled once per process; each run only binds its own inputs.
+crew_template = CrewTemplate(loaded_agents_config, loaded_tasks_config)
+
+# Tools that tasks.yaml may call directly with `tool: <name>`.
+DIRECT_TOOLS = {"store_text_tool": store_text_tool, "summarize_tool": SummarizeTool()}
+for _task_name, _tool_name in crew_template.task_tool.items():
+    if _tool_name and _tool_name not in DIRECT_TOOLS:
+        raise ValueError(f"Task '{_task_name}' uses unknown tool '{_tool_name}'")
+
+
+@cache
+def agent_llm(agent_name: str) -> AgentLLM:
+    """The LLM used by ``agent_name``; one per agent and process so calls are attributed per agent."""
+    return AgentLLM(
+        agent_name,
+        model="azure/gpt-4o",  # Adjust as needed
+        api_key=os.getenv("AZURE_API_KEY"),
+        base_url=os.getenv("AZURE_API_BASE"),
+        api_version=os.getenv("AZURE_API_VERSION", "2024-06-01"),
+    )
 
 
 def extract_search_links(text: str) -> list[dict]:
@@ -66,27 +74,43 @@ def extract_search_links(text: str) -> list[dict]:
     return links
 
 
-@CrewBase
+def per_run(method):
+    """
+    Build an agent or task once per crew instance. crewai's ``@agent``/``@task`` memoize into a
+    module-level dict keyed by ``self``, which keeps every finished run alive; this cache lives
+    on the instance and goes away with it.
+    """
+
+    @wraps(method)
+    def wrapper(self):
+        built = self.__dict__.setdefault("_built", {})
+        if method.__name__ not in built:
+            result = method(self)
+            if isinstance(result, Task) and not result.name:
+                result.name = method.__name__  # As crewai's @task does
+            built[method.__name__] = result
+        return built[method.__name__]
+
+    return wrapper
+
+
 class LatestAIResearchCrew:
     """
     Crew for research agents.
     1. Web researcher fetches data.
-    2. Aggregator consolidates in Markdown, removing images.
-    3. Store task saves summary.
-    4. Synthesizer produces final Markdown answer.
+    2. Compact task drops duplicate paragraphs and trims the findings to a token budget (no LLM).
+    3. Aggregator consolidates in Markdown, removing images.
+    4. Store task saves summary.
+    5. Synthesizer produces final Markdown answer.
     """
 
-    def __init__(self, inputs=None):
+    def __init__(self, inputs=None, run_id=None):
         self.inputs = inputs or {}
+        self.run_id = run_id or uuid.uuid4().hex  # Key for events published during this run
         if "current_date" not in self.inputs:
             self.inputs["current_date"] = CurrentDateTool()._run().strip()
         print(f"[DEBUG][Crew __init__] Received inputs: {self.inputs}")
 
-        self.agents_config = copy.deepcopy(loaded_agents_config)
-        self.tasks_config = copy.deepcopy(loaded_tasks_config)
-        print(f"[DEBUG][Crew __init__] Loaded agent keys: {list(self.agents_config.keys())}")
-        print(f"[DEBUG][Crew __init__] Loaded task keys: {list(self.tasks_config.keys())}")
-
         self.collected_steps = []  # Logs in Markdown
         self.final_answer = ""  # Final answer in Markdown
         self.aggregator_links = []  # Will hold extracted search links
@@ -94,6 +118,7 @@ class LatestAIResearchCrew:
     def my_step_callback(self, step):
         if hasattr(step, "result"):
             log_entry = f"Tool Result: {step.result}"
+            run_event_broker.publish(self.run_id, "tool_result", {"entry": log_entry, "result": str(step.result)})
         else:
             timestamp = getattr(step, "timestamp", "Unknown Time")
             task_name = getattr(step, "task_name", "unknown")
@@ -104,55 +129,64 @@ class LatestAIResearchCrew:
                 log_entry = f'{timestamp}: task_name="{task_name}", task="{truncated}...", status="{status}"'
             else:
                 log_entry = f'{timestamp}: task_name="{task_name}", task="{text}", status="{status}"'
+            run_event_broker.publish(
+                self.run_id,
+                "step",
+                {"entry": log_entry, "task_name": task_name, "status": status, "text": text},
+            )
         self.collected_steps.append(log_entry)
 
-    @agent
+    @per_run
     def manager(self) -> Agent:
-        cfg = self.agents_config.get("manager")
-        if cfg is None:
-            raise ValueError("Missing 'manager' in agents.yaml")
-        cfg = format_config(cfg, self.inputs)
-        return Agent(config=cfg, verbose=True, llm=llm)
+        cfg = crew_template.agent_config("manager", self.inputs)
+        return Agent(config=cfg, verbose=True, llm=agent_llm("manager"))
 
-    @agent
+    @per_run
     def web_researcher(self) -> Agent:
-        cfg = self.agents_config.get("web_researcher")
-        if cfg is None:
-            raise ValueError("Missing 'web_researcher' in agents.yaml")
-        cfg = format_config(cfg, self.inputs)
-        return Agent(config=cfg, verbose=True, llm=llm, memory=True, tools=[AISearchTool()])
+        cfg = crew_template.agent_config("web_researcher", self.inputs)
+        return Agent(
+            config=cfg,
+            verbose=True,
+            llm=agent_llm("web_researcher"),
+            memory=True,
+            tools=[AISearchTool(run_id=self.run_id)],
+        )
 
-    @agent
+    @per_run
     def aggregator(self) -> Agent:
-        cfg = self.agents_config.get("aggregator")
-        if cfg is None:
-            raise ValueError("Missing 'aggregator' in agents.yaml")
-        cfg = format_config(cfg, self.inputs)
-        return Agent(config=cfg, verbose=True, llm=llm, memory=True)
+        cfg = crew_template.agent_config("aggregator", self.inputs)
+        return Agent(config=cfg, verbose=True, llm=agent_llm("aggregator"), memory=True)
 
-    @agent
+    @per_run
     def synthesizer(self) -> Agent:
-        cfg = self.agents_config.get("synthesizer")
-        if cfg is None:
-            raise ValueError("Missing 'synthesizer' in agents.yaml")
-        cfg = format_config(cfg, self.inputs)
-        return Agent(config=cfg, verbose=True, llm=llm, memory=True)
+        cfg = crew_template.agent_config("synthesizer", self.inputs)
+        return Agent(config=cfg, verbose=True, llm=agent_llm("synthesizer"), memory=True)
+
+    def research_callback(self, task_output):
+        run_artifacts.put(self.run_id, "research_task", task_output.raw)
+        return task_output.raw
+
+    def compact_callback(self, task_output):
+        run_artifacts.put(self.run_id, "compact_task", task_output.raw)
+        return task_output.raw
 
     def aggregate_callback(self, task_output):
         raw_text = task_output.raw
         # Remove image markdown and extraneous image lines.
-        text_no_images = re.sub(r"!\[.*?\]\(.*?\)", "", raw_text)
+        text_no_images = MARKDOWN_IMAGE.sub("", raw_text)
         text_no_images = re.sub(r"Image\s+\d+.*", "", text_no_images)
-        # Always read from research_output.txt to force extraction.
-        try:
-            with open("research_output.txt", encoding="utf-8", errors="ignore") as f:
-                research_text = f.read()
-            aggregator_links = extract_search_links(research_text)
-        except Exception:
-            aggregator_links = []
+        run_artifacts.put(self.run_id, "aggregate_task", raw_text)
+        # Extract links from this run's research output.
+        research_text = run_artifacts.get(self.run_id, "research_task", "")
+        aggregator_links = extract_search_links(research_text)
         self.aggregator_links = aggregator_links
+        run_artifacts.put(self.run_id, "search_links", aggregator_links)
         return text_no_images
 
+    def store_callback(self, task_output):
+        run_artifacts.put(self.run_id, "store_task", task_output.raw)
+        return task_output.raw
+
     def synthesize_callback(self, task_output):
         final_markdown = task_output.raw
         if final_markdown.startswith("```") and final_markdown.endswith("```"):
@@ -160,84 +194,88 @@ class LatestAIResearchCrew:
             final_markdown = final_markdown.rsplit("\n", 1)[0]
         print("[DEBUG][synthesize_callback] Final synthesized answer:", final_markdown)
         self.final_answer = final_markdown
+        run_artifacts.put(self.run_id, "synthesize_task", final_markdown)
+        run_event_broker.publish(self.run_id, "final_answer", {"markdown": final_markdown})
         return final_markdown
 
-    @task
+    @per_run
     def research_task(self) -> Task:
-        cfg = self.tasks_config.get("research_task")
-        if cfg is None:
-            raise ValueError("Missing 'research_task' in tasks.yaml")
         query_input = self.inputs.get("query", "")
         max_links = self.inputs.get("max_links", 3)
         print(f"[DEBUG][research_task] Using query: '{query_input}', max_links: {max_links}")
-        return Task(
-            config=cfg,
+        return self._build_task(
+            "research_task",
             agent=self.web_researcher(),
             inputs={"query": query_input, "max_links": max_links},
-            async_execution=False,
-            output_file="research_output.txt",
+            callback=self.research_callback,
         )
 
-    @task
+    @per_run
+    def compact_task(self) -> Task:
+        return self._build_task("compact_task", agent=self.aggregator(), callback=self.compact_callback)
+
+    @per_run
     def aggregate_task(self) -> Task:
-        cfg = self.tasks_config.get("aggregate_task")
-        if cfg is None:
-            raise ValueError("Missing 'aggregate_task' in tasks.yaml")
-        return Task(
-            config=cfg,
-            agent=self.aggregator(),
-            context=[self.research_task()],
-            async_execution=False,
-            output_file="aggregate_output.txt",
-            callback=self.aggregate_callback,
-        )
+        return self._build_task("aggregate_task", agent=self.aggregator(), callback=self.aggregate_callback)
 
-    @task
+    @per_run
     def store_task(self) -> Task:
-        cfg = self.tasks_config.get("store_task")
-        if cfg is None:
-            raise ValueError("Missing 'store_task' in tasks.yaml")
-        return Task(
-            config=cfg,
-            agent=self.aggregator(),
-            context=[self.aggregate_task()],
-            async_execution=False,
-            output_file="stored_output.txt",
-            tools=[store_text_tool],
+        return self._build_task(
+            "store_task", agent=self.aggregator(), tools=[store_text_tool], callback=self.store_callback
         )
 
-    @task
+    @per_run
     def synthesize_task(self) -> Task:
-        cfg = self.tasks_config.get("synthesize_task")
-        if cfg is None:
-            raise ValueError("Missing 'synthesizer' in tasks.yaml")
-        return Task(
-            config=cfg,
-            agent=self.synthesizer(),
-            context=[self.aggregate_task()],
-            async_execution=False,
-            output_file="synthesize_output.txt",
-            callback=self.synthesize_callback,
-        )
+        return self._build_task("synthesize_task", agent=self.synthesizer(), callback=self.synthesize_callback)
+
+    def _build_task(self, task_name: str, **kwargs) -> Task:
+        cfg = crew_template.task_config(task_name, self.inputs)
+        context = self._context(task_name)
+        if context:
+            kwargs["context"] = context
+        tool_name = crew_template.task_tool[task_name]
+        if tool_name:
+            return ToolTask(
+                config=cfg,
+                direct_tool=DIRECT_TOOLS[tool_name],
+                step_callback=self.my_step_callback,
+                async_execution=False,
+                **kwargs,
+            )
+        return Task(config=cfg, async_execution=False, **kwargs)
+
+    def _context(self, task_name: str) -> list[Task]:
+        # Dependencies come from the task's `context` list in tasks.yaml.
+        return [getattr(self, dependency)() for dependency in crew_template.task_context[task_name]]
+
+    def schedule_callback(self, result):
+        report = getattr(self._crew, "schedule_report", None)
+        if report:
+            print(
+                f"[DEBUG][schedule] wall {report['wall_ms']} ms, critical path {report['critical_path_ms']} ms "
+                f"({' -> '.join(report['critical_path'])}), sequential {report['sequential_ms']} ms"
+            )
+            run_artifacts.put(self.run_id, "schedule", report)
+            run_event_broker.publish(self.run_id, "schedule", report)
+        return result
 
-    @crew
     def crew(self) -> Crew:
-        return Crew(
+        if CREW_EXECUTION_MODE == "dag":
+            # The answer does not depend on the vector-store write, so kickoff returns without waiting for it.
+            crew_class, scheduling = DagCrew, {"background_tasks": ["store_task"]}
+        else:
+            crew_class, scheduling = Crew, {}
+        self._crew = crew_class(
             agents=[
                 self.manager(),
                 self.web_researcher(),
                 self.aggregator(),
                 self.synthesizer(),
             ],
-            tasks=[
-                self.research_task(),
-                self.aggregate_task(),
-                self.store_task(),
-                self.synthesize_task(),
-            ],
+            tasks=[getattr(self, name)() for name in crew_template.task_order],
             process=Process.sequential,
             verbose=True,
-            manager_llm=llm,
+            manager_llm=agent_llm("manager"),
             embedder={
                 "provider": "azure",
                 "config": {
@@ -249,6 +287,9 @@ class LatestAIResearchCrew:
             },
             memory=False,
             full_output=True,
-            output_log_file="output_log.txt",
+            output_log_file=run_artifacts.debug_path(self.run_id, "output_log.txt"),
             step_callback=self.my_step_callback,
+            after_kickoff_callbacks=[self.schedule_callback],
+            **scheduling,
         )
+        return self._crew
@@ -0,0 +1,173 @@
+"""
+Dependency-graph execution for the research crew.
+
+``DagCrew`` is a drop-in ``Crew`` whose sequential process runs tasks as a graph:
+each task waits only for the tasks in its ``context`` list (a task without
+``context`` waits for the one listed before it, as in a sequential crew), and
+every task whose dependencies are done starts right away on a worker thread.
+With the research graph this lets ``store_task`` and ``synthesize_task`` run side
+by side once ``aggregate_task`` finishes.
+
+Tasks named in ``background_tasks`` (leaves no other task depends on, such as
+``store_task``) are not waited for: kickoff returns as soon as every other task is
+done, and a background task still running finishes on its worker thread; a failure
+there is logged instead of failing the run.
+
+After each kickoff ``schedule_report`` holds per-task start/end offsets, the
+wall time, the time a purely sequential run would have taken, and the critical
+path (the chain of dependent tasks that bounds the run).
+
+``DagCrew`` reuses ``Crew``'s private helpers for a single task (agent lookup, tool
+preparation, context, result processing); ``tests_crew_scheduler`` checks that they
+still exist with the signatures used here, and ``requirements.txt`` pins crewai.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from crewai import Crew, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from pydantic import Field
+
+from app.services.metrics import CREW_TASK_SECONDS, timed
+
+logger = logging.getLogger(__name__)
+
+
+def task_dependencies(tasks: list[Task]) -> list[set[int]]:
+    """For each task, the indices of the tasks it waits for."""
+    index = {id(task): i for i, task in enumerate(tasks)}
+    dependencies = []
+    for i, task in enumerate(tasks):
+        if task.context:
+            dependencies.append({index[id(other)] for other in task.context if id(other) in index})
+        else:
+            dependencies.append({i - 1} if i else set())
+    return dependencies
+
+
+def critical_path(dependencies: list[set[int]], durations: list[float]) -> tuple[float, list[int]]:
+    """Length and task indices of the longest chain through the graph. Tasks must be in dependency order."""
+    finish: list[float] = []
+    previous: list[int | None] = []
+    for i, deps in enumerate(dependencies):
+        before = max(deps, key=lambda d: finish[d], default=None)
+        finish.append(durations[i] + (finish[before] if before is not None else 0.0))
+        previous.append(before)
+    if not finish:
+        return 0.0, []
+    node: int | None = max(range(len(finish)), key=finish.__getitem__)
+    length = finish[node]
+    path = []
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return length, path[::-1]
+
+
+class DagCrew(Crew):
+    max_parallel_tasks: int = Field(default=4, description="Upper bound on tasks running at the same time.")
+    schedule_report: dict = Field(default_factory=dict, description="Timings of the last kickoff.")
+    background_tasks: list[str] = Field(
+        default_factory=list, description="Leaf tasks kickoff does not wait for; they finish in the background."
+    )
+
+    def _run_sequential_process(self) -> CrewOutput:
+        return self._execute_dag(self.tasks)
+
+    def _execute_dag(self, tasks: list[Task]) -> CrewOutput:
+        dependencies = task_dependencies(tasks)
+        for i, deps in enumerate(dependencies):
+            if any(d >= i for d in deps):
+                raise ValueError(f"Task '{tasks[i].name}' depends on a task listed after it")
+        background = {i for i, task in enumerate(tasks) if task.name in self.background_tasks}
+        for i, deps in enumerate(dependencies):
+            if deps & background:
+                raise ValueError(f"Task '{tasks[i].name}' depends on a background task")
+
+        # Tasks that share an agent never run at the same time; an agent's executor is not thread-safe.
+        agent_locks = {id(task.agent): threading.Lock() for task in tasks}
+        outputs: dict[int, TaskOutput] = {}
+        spans: dict[int, tuple[float, float]] = {}
+        started = time.perf_counter()
+
+        def run(i: int) -> TaskOutput:
+            task = tasks[i]
+            agent = self._get_agent_to_use(task)
+            if agent is None:
+                raise ValueError(f"No agent available for task: {task.description}")
+            tools = self._prepare_tools(agent, task, task.tools or agent.tools or [])
+            with agent_locks[id(task.agent)], timed(CREW_TASK_SECONDS, "task", task=task.name):
+                begin = time.perf_counter()
+                self._log_task_start(task, agent.role)
+                context = self._get_context(task, [outputs[d] for d in sorted(dependencies[i])])
+                output = task.execute_sync(agent=agent, context=context, tools=tools)
+                spans[i] = (begin - started, time.perf_counter() - started)
+            return output
+
+        def finish(i: int, output: TaskOutput) -> None:
+            outputs[i] = output
+            self._process_task_result(tasks[i], output)
+            self._store_execution_log(tasks[i], output, i)
+
+        def finish_in_background(i: int, future) -> None:
+            try:
+                finish(i, future.result())
+            except Exception:
+                logger.exception("Background task '%s' failed", tasks[i].name)
+
+        pending = list(range(len(tasks)))
+        foreground = [i for i in pending if i not in background]
+        running = {}
+        pool = ThreadPoolExecutor(max_workers=self.max_parallel_tasks, thread_name_prefix="crew-task")
+        try:
+            while True:
+                for i in [i for i in pending if dependencies[i] <= outputs.keys()]:
+                    pending.remove(i)
+                    # A copy of the kickoff context keeps the task on the run's timeline.
+                    running[pool.submit(contextvars.copy_context().run, run, i)] = i
+                if all(i in outputs for i in foreground):
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    if i in background:
+                        finish_in_background(i, future)
+                        continue
+                    try:
+                        output = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        raise
+                    finish(i, output)
+        finally:
+            # Background tasks still running keep their worker threads; the pool winds down after them.
+            pool.shutdown(wait=False)
+        for future, i in running.items():
+            future.add_done_callback(lambda future, i=i: finish_in_background(i, future))
+
+        self.schedule_report = self._schedule_report(tasks, dependencies, spans, time.perf_counter() - started)
+        return self._create_crew_output([outputs[i] for i in foreground])
+
+    @staticmethod
+    def _schedule_report(tasks: list[Task], dependencies: list[set[int]], spans: dict, wall: float) -> dict:
+        spans = dict(spans)
+        # Background tasks still running when kickoff returns count with no duration.
+        durations = [spans[i][1] - spans[i][0] if i in spans else 0.0 for i in range(len(tasks))]
+        length, path = critical_path(dependencies, durations)
+        return {
+            "wall_ms": round(wall * 1000, 1),
+            "sequential_ms": round(sum(durations) * 1000, 1),
+            "critical_path_ms": round(length * 1000, 1),
+            "critical_path": [tasks[i].name for i in path],
+            "background": [tasks[i].name for i in range(len(tasks)) if i not in spans],
+            "tasks": {
+                tasks[i].name: {"start_ms": round(start * 1000, 1), "end_ms": round(end * 1000, 1)}
+                for i, (start, end) in sorted(spans.items())
+            },
+        }
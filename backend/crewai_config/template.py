@@ -0,0 +1,78 @@
+"""
+Agent and task configuration compiled once per process.
+
+``CrewTemplate`` reads the parsed ``agents.yaml`` / ``tasks.yaml`` once, records
+which string fields contain ``{placeholders}``, and resolves each task's agent and
+``context`` dependencies by name. Building a crew for a run then only formats the
+templated fields with that run's inputs (``query``, ``current_date``,
+``max_links``), instead of deep-copying and walking every config.
+
+A task with ``tool: <name>`` is a direct tool call on its context output rather than
+an agent prompt; see ``crewai_config/tool_task.py``.
+"""
+
+
+class CompiledConfig:
+    """One agent or task section, split into fields that never change and fields that need formatting."""
+
+    def __init__(self, cfg: dict) -> None:
+        self.static = {}
+        self.templates = {}
+        self.nested = {}
+        for key, value in cfg.items():
+            # Formatting a string without braces is a no-op, so only braced strings are kept as templates.
+            if isinstance(value, str) and ("{" in value or "}" in value):
+                self.templates[key] = value
+            elif isinstance(value, dict):
+                self.nested[key] = CompiledConfig(value)
+            else:
+                self.static[key] = value
+
+    def bind(self, inputs: dict) -> dict:
+        bound = dict(self.static)
+        for key, value in self.templates.items():
+            try:
+                bound[key] = value.format(**inputs)
+            except Exception:
+                # Leave the field as written when an input is missing.
+                bound[key] = value
+        for key, value in self.nested.items():
+            bound[key] = value.bind(inputs)
+        return bound
+
+
+class CrewTemplate:
+    # Task keys that describe the graph rather than the task itself; the crew wires them up.
+    STRUCTURAL_TASK_KEYS = ("agent", "context", "tool")
+
+    def __init__(self, agents_config: dict, tasks_config: dict) -> None:
+        self.agents = {name: CompiledConfig(cfg) for name, cfg in agents_config.items()}
+        self.tasks = {}
+        self.task_agent = {}
+        self.task_context = {}
+        self.task_tool = {}
+        for name, cfg in tasks_config.items():
+            agent_name = cfg.get("agent")
+            if agent_name is not None and agent_name not in self.agents:
+                raise ValueError(f"Task '{name}' uses unknown agent '{agent_name}'")
+            context = tuple(cfg.get("context") or ())
+            for dependency in context:
+                if dependency not in self.tasks:
+                    raise ValueError(f"Task '{name}' depends on '{dependency}', which is not defined before it")
+            self.tasks[name] = CompiledConfig(
+                {key: value for key, value in cfg.items() if key not in self.STRUCTURAL_TASK_KEYS}
+            )
+            self.task_agent[name] = agent_name
+            self.task_context[name] = context
+            self.task_tool[name] = cfg.get("tool")
+        self.task_order = tuple(self.tasks)
+
+    def agent_config(self, name: str, inputs: dict) -> dict:
+        if name not in self.agents:
+            raise ValueError(f"Missing '{name}' in agents.yaml")
+        return self.agents[name].bind(inputs)
+
+    def task_config(self, name: str, inputs: dict) -> dict:
+        if name not in self.tasks:
+            raise ValueError(f"Missing '{name}' in tasks.yaml")
+        return self.tasks[name].bind(inputs)
@@ -0,0 +1,62 @@
+"""
+Tasks that call a tool directly instead of asking an agent to.
+
+A task declared in ``tasks.yaml`` with ``tool: <name>`` runs that tool in-process
+on the raw output of its ``context`` tasks: no prompt, no LLM call. It still
+produces a normal ``TaskOutput``, runs its callback, and reports a completed step
+through ``step_callback`` so it shows up in the run's step log.
+"""
+
+import datetime
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.tools import BaseTool
+from pydantic import Field
+
+
+@dataclass
+class ToolStep:
+    """The step record passed to ``step_callback``, shaped like the agent steps crewai reports."""
+
+    task_name: str
+    text: str
+    status: str
+    timestamp: str
+
+
+class ToolTask(Task):
+    direct_tool: BaseTool = Field(..., description="Tool called with the context output as its only argument.")
+    step_callback: Callable | None = Field(default=None, description="Receives a ToolStep once the tool returns.")
+
+    def _execute_core(self, agent: Any, context: str | None, tools: list | None) -> TaskOutput:
+        self.start_time = datetime.datetime.now()
+        self.prompt_context = context
+        argument = next(iter(self.direct_tool.args_schema.model_fields))
+        result = str(self.direct_tool.run(**{argument: context or ""}))
+
+        self.output = TaskOutput(
+            name=self.name,
+            description=self.description,
+            expected_output=self.expected_output,
+            raw=result,
+            agent=(agent or self.agent).role if (agent or self.agent) else self.direct_tool.name,
+            output_format=self._get_output_format(),
+        )
+        self.end_time = datetime.datetime.now()
+
+        if self.step_callback:
+            self.step_callback(
+                ToolStep(
+                    task_name=self.name or "",
+                    text=f"{self.direct_tool.name} (direct call, no LLM): {result}",
+                    status="completed",
+                    timestamp=self.end_time.isoformat(timespec="seconds"),
+                )
+            )
+        if self.callback:
+            self.callback(self.output)
+        return self.output
@@ -1,11 +1,13 @@
 #!/usr/bin/env python
+import gc
 import os
 import sys
+import weakref
 from pathlib import Path
 
 import pytest
 
-from crewai_config.crew import LatestAIResearchCrew
+from crewai_config.crew import LatestAIResearchCrew, crew_template
 
 # Set up the project root and update sys.path.
 project_root = Path(__file__).resolve().parent.parent.parent
@@ -37,5 +39,26 @@ def test_agent_configs():
         assert isinstance(agent.goal, str) and agent.goal, f"{agent_name} goal should be a non-empty string"
 
 
+def test_crew_template_binds_inputs_and_wires_context_once():
+    """
+    Test that the compiled template fills per-run placeholders, that task context comes from
+    tasks.yaml and reuses the same task objects, and that a finished crew is not kept alive.
+    """
+    cfg = crew_template.agent_config("web_researcher", {"query": "fusion energy", "current_date": "2025-01-01"})
+    assert "fusion energy" in cfg["goal"] and "2025-01-01" in cfg["goal"]
+    assert "{query}" in crew_template.agents["web_researcher"].templates["goal"]
+
+    crew_instance = LatestAIResearchCrew(inputs={"query": "fusion energy"})
+    crew = crew_instance.crew()
+    assert [task.name for task in crew.tasks] == list(crew_template.task_order)
+    assert crew_instance.store_task().context == [crew_instance.aggregate_task()]
+    assert crew_instance.synthesize_task().context[0] is crew_instance.aggregate_task()
+
+    ref = weakref.ref(crew_instance)
+    del crew_instance, crew
+    gc.collect()
+    assert ref() is None
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+import asyncio
+import concurrent.futures
+import threading
+
+import numpy as np
+import pytest
+
+from app.services import clients
+from app.tools import aisearch_tool
+from app.tools.aisearch_tool import AISearchTool
+
+RESULTS = [
+    {"url": "https://a.example/news", "title": "A", "snippet": "Snippet A"},
+    {"url": "https://b.example/news", "title": "B", "snippet": "Snippet B"},
+]
+
+
+def test_arun_fetches_and_embeds_sources_concurrently(monkeypatch):
+    """
+    Test that the async path starts every page fetch before any finishes, embeds without
+    blocking, and returns the same URL | Title | Snippet layout as the sync path.
+    """
+    in_flight = []
+    peak = []
+
+    async def fake_search(query):
+        return RESULTS
+
+    async def fake_fetch(link):
+        in_flight.append(link)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.05)
+        in_flight.remove(link)
+        return f"Relevant paragraph about {link}"
+
+    async def fake_embed(texts):
+        return [np.ones(3, dtype=np.float32) for _ in texts]
+
+    monkeypatch.setattr(aisearch_tool, "aserper_search", fake_search)
+    monkeypatch.setattr(aisearch_tool, "afetch_reader_content", fake_fetch)
+    monkeypatch.setattr(aisearch_tool, "aembed_texts", fake_embed)
+
+    output = asyncio.run(AISearchTool()._arun("latest ai news", max_links=2))
+
+    assert max(peak) == 2
+    assert output.startswith("URL: https://a.example/news | Title: A | Snippet: Snippet A\n")
+    assert "Content:\nRelevant paragraph about https://b.example/news" in output
+
+
+def test_arun_bounds_fetches_with_semaphore_and_closes_loop_clients(monkeypatch):
+    """
+    Test that async page fetches never exceed FETCH_MAX_WORKERS at once and that the loop's
+    httpx client is closed when the run ends.
+    """
+    in_flight, peak, opened = [], [], []
+
+    async def fake_search(query):
+        return RESULTS
+
+    async def fake_fetch(link):
+        opened.append(clients.get_async_http_client())
+        in_flight.append(link)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(link)
+        return f"Relevant paragraph about {link}"
+
+    async def fake_embed(texts):
+        return [np.ones(3, dtype=np.float32) for _ in texts]
+
+    monkeypatch.setattr(clients, "FETCH_MAX_WORKERS", 1)
+    monkeypatch.setattr(aisearch_tool, "aserper_search", fake_search)
+    monkeypatch.setattr(aisearch_tool, "afetch_reader_content", fake_fetch)
+    monkeypatch.setattr(aisearch_tool, "aembed_texts", fake_embed)
+
+    asyncio.run(AISearchTool()._arun("latest ai news", max_links=2))
+
+    assert max(peak) == 1
+    assert opened[0] is opened[1] and opened[0].is_closed
+
+
+def test_rank_relevant_chunks_embeds_query_once_across_documents(monkeypatch):
+    """
+    Test that the query and the chunks of every document go through a single embedding call
+    and that each document keeps its most relevant chunk within the per-source token budget.
+    """
+    calls = []
+    vectors = {"query": [1.0, 0.0], "on topic": [0.9, 0.1], "off topic": [0.0, 1.0], "also on topic": [1.0, 0.2]}
+
+    def fake_embed(texts):
+        calls.append(list(texts))
+        return [np.asarray(vectors[text], dtype=np.float32) for text in texts]
+
+    monkeypatch.setattr(aisearch_tool, "embed_texts", fake_embed)
+    monkeypatch.setattr(aisearch_tool, "CHUNK_TOKENS", 3)
+    monkeypatch.setattr(aisearch_tool, "CHUNK_OVERLAP_TOKENS", 0)
+
+    ranked = aisearch_tool.rank_relevant_chunks(
+        ["on topic\n\noff topic", "off topic", "also on topic"], "query", token_budget=3
+    )
+
+    assert calls == [["query", "on topic", "off topic", "off topic", "also on topic"]]
+    assert ranked == ["on topic", "off topic", "also on topic"]
+
+
+def test_rank_relevant_chunks_truncates_when_no_chunk_fits_the_budget(monkeypatch):
+    """
+    Test that a source whose chunks are all larger than the token budget yields the start of its
+    most relevant chunk instead of an empty string.
+    """
+    page = " ".join(f"word{i}" for i in range(100))
+    monkeypatch.setattr(aisearch_tool, "embed_texts", lambda texts: [np.ones(2, dtype=np.float32) for _ in texts])
+
+    (excerpt,) = aisearch_tool.rank_relevant_chunks([page], "query", token_budget=5)
+
+    assert excerpt and page.startswith(excerpt)
+    assert aisearch_tool.count_tokens(excerpt) <= 5
+
+
+def test_embedding_batches_respect_token_and_input_limits(monkeypatch):
+    """
+    Test that batches never exceed the token budget or the input count, and keep order.
+    """
+    monkeypatch.setattr(aisearch_tool, "EMBEDDING_BATCH_MAX_TOKENS", 10)
+    monkeypatch.setattr(aisearch_tool, "EMBEDDING_BATCH_MAX_INPUTS", 3)
+    monkeypatch.setattr(aisearch_tool, "count_tokens", len)
+
+    batches = aisearch_tool.embedding_batches(["aaaa", "bbbb", "cc", "d", "e", "ffffffffffff"])
+
+    assert batches == [["aaaa", "bbbb", "cc"], ["d", "e"], ["ffffffffffff"]]
+
+
+@pytest.fixture
+def fetch_executor():
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        yield executor
+
+
+def test_streaming_mode_stops_once_content_budget_is_met(monkeypatch, fetch_executor):
+    """
+    Test that with a character budget the sync path emits the first page that lands and
+    cancels the fetches that are still queued instead of waiting for them.
+    """
+    results = [{"url": f"https://site{i}.example/", "title": f"T{i}", "snippet": f"S{i}"} for i in range(3)]
+    release = threading.Event()
+    fetched = []
+
+    def fake_fetch(link):
+        if link != results[0]["url"]:
+            release.wait(timeout=5)
+        fetched.append(link)
+        return f"Long relevant text from {link}"
+
+    monkeypatch.setattr(aisearch_tool, "serper_search", lambda query: results)
+    monkeypatch.setattr(aisearch_tool, "fetch_reader_content", fake_fetch)
+    monkeypatch.setattr(aisearch_tool, "rank_relevant_chunks", lambda documents, query, **kwargs: documents)
+    monkeypatch.setattr(aisearch_tool, "get_fetch_executor", lambda: fetch_executor)
+
+    try:
+        output = AISearchTool(content_budget_chars=10)._run("latest ai news", max_links=3)
+    finally:
+        release.set()
+
+    assert "Content:\nLong relevant text from https://site0.example/" in output
+    assert "Content:\nLong relevant text from https://site1.example/" not in output
+    assert "URL: https://site2.example/ | Title: T2 | Snippet: S2" in output.splitlines()[2]
+    assert "https://site2.example/" not in fetched
+
+
+def test_async_streaming_mode_cancels_slow_fetches(monkeypatch):
+    """
+    Test that the async streaming path cancels in-flight fetches once the token budget is met.
+    """
+    cancelled = []
+
+    async def fake_search(query):
+        return RESULTS
+
+    async def fake_fetch(link):
+        if link == RESULTS[1]["url"]:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(link)
+                raise
+        return "Relevant paragraph " * 20
+
+    async def fake_rank(documents, query, **kwargs):
+        return documents
+
+    monkeypatch.setattr(aisearch_tool, "aserper_search", fake_search)
+    monkeypatch.setattr(aisearch_tool, "afetch_reader_content", fake_fetch)
+    monkeypatch.setattr(aisearch_tool, "arank_relevant_chunks", fake_rank)
+
+    output = asyncio.run(AISearchTool(content_budget_tokens=5)._arun("latest ai news", max_links=2))
+
+    assert cancelled == [RESULTS[1]["url"]]
+    assert output.count("Content:") == 1
+
+
+def test_async_streaming_mode_ranks_pages_that_arrive_together_in_one_pass(monkeypatch):
+    """
+    Test that pages finishing in the same wait are filtered with a single relevance pass, so
+    their chunks share one embedding request, and are emitted in search order.
+    """
+    calls = []
+
+    async def fake_search(query):
+        return RESULTS
+
+    async def fake_fetch(link):
+        return f"Relevant paragraph about {link}"
+
+    async def fake_rank(documents, query, **kwargs):
+        calls.append(list(documents))
+        return documents
+
+    monkeypatch.setattr(aisearch_tool, "aserper_search", fake_search)
+    monkeypatch.setattr(aisearch_tool, "afetch_reader_content", fake_fetch)
+    monkeypatch.setattr(aisearch_tool, "arank_relevant_chunks", fake_rank)
+
+    output = asyncio.run(AISearchTool(content_budget_tokens=10_000)._arun("latest ai news", max_links=2))
+
+    assert calls == [[f"Relevant paragraph about {res['url']}" for res in RESULTS]]
+    assert output.index("about https://a.example/news") < output.index("about https://b.example/news")
+
+
+def test_clean_reader_text_strips_images_and_handles_unclosed_brackets():
+    """
+    Test that Markdown images are removed, including alt text with brackets, URLs with parentheses
+    and inline data: URIs longer than 2048 characters, and that a long line of "![" that never close
+    is left intact instead of being rescanned for every bracket.
+    """
+    page = "Intro ![fig](https://x.test/a.png) text ![](data:image/png;base64," + "A" * 5000 + ") end"
+    assert aisearch_tool._clean_reader_text(page) == "Intro  text  end"
+    page = "A ![alt [1]](https://x.test/b.png) B ![chart](https://en.wikipedia.org/wiki/File:A_(b).png) C"
+    assert aisearch_tool._clean_reader_text(page) == "A  B  C"
+
+    unclosed = "![unclosed alt text " * 10_000
+    assert aisearch_tool._clean_reader_text(unclosed) == unclosed
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import research_runner
+from app.services.answer_cache import AnswerCache
+
+
+def test_answer_cache_matches_similar_queries_within_date_scope(tmp_path):
+    """
+    Test that a similar query on the same date and kind is a hit, while a dissimilar query,
+    another date or another kind is a miss.
+    """
+    cache = AnswerCache(threshold=0.9, path=tmp_path / "answers.sqlite3")
+    cache.put("analysis", "2025-01-01", "latest ai news", np.array([1.0, 0.0]), {"summary": "cached"})
+
+    hit = cache.lookup("analysis", "2025-01-01", np.array([0.98, 0.1]))
+    assert hit["payload"] == {"summary": "cached"} and hit["query"] == "latest ai news"
+    assert cache.lookup("analysis", "2025-01-01", np.array([0.0, 1.0])) is None
+    assert cache.lookup("analysis", "2025-01-02", np.array([1.0, 0.0])) is None
+    assert cache.lookup("chat", "2025-01-01", np.array([1.0, 0.0])) is None
+    assert cache.stats.as_dict()["hits"] == 1
+
+
+def test_run_analysis_serves_cached_answer_unless_fresh(tmp_path, monkeypatch):
+    """
+    Test that a second, near-identical analysis query skips the crew and returns the stored
+    answer with cache metadata, and that fresh=True or another max_links runs the crew again.
+    """
+    runs = []
+
+    class FakeCrew:
+        def __init__(self, inputs, run_id=None):
+            self.run_id = run_id or f"run-{len(runs)}"
+            self.final_answer = f"answer for {inputs['query']}"
+
+        def crew(self):
+            runs.append(self.run_id)
+            return SimpleNamespace(kickoff=lambda: SimpleNamespace(confidence=0.9))
+
+    vectors = {"latest ai news": [1.0, 0.0], "ai news today": [0.97, 0.05]}
+    monkeypatch.setattr(research_runner, "LatestAIResearchCrew", FakeCrew)
+    monkeypatch.setattr(research_runner, "embed_texts", lambda texts: [np.array(vectors[t]) for t in texts])
+    monkeypatch.setattr(research_runner, "answer_cache", AnswerCache(path=tmp_path / "answers.sqlite3"))
+    monkeypatch.setattr(research_runner, "ANSWER_CACHE_ENABLED", True)
+
+    first = research_runner.run_analysis("latest ai news")
+    second = research_runner.run_analysis("ai news today")
+    third = research_runner.run_analysis("ai news today", fresh=True)
+    more_links = research_runner.run_analysis("latest ai news", max_links=5)
+
+    assert len(runs) == 3
+    assert "cache" not in more_links
+    assert second["finalAnalysis"] == first["finalAnalysis"]
+    assert second["cache"]["hit"] is True and second["cache"]["matched_query"] == "latest ai news"
+    assert third["finalAnalysis"]["summary"] == ["answer for ai news today"]
+    assert "cache" not in third
+
+
+if __name__ == "__main__":
+    pytest.main()
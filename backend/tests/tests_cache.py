@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import cache as cache_module
+from app.services.cache import SQLiteCache, TieredCache
+from app.services.embedding_cache import EmbeddingCache
+from app.services.metrics import CACHE_EVENTS
+from app.services.page_cache import PageCache
+from app.tools import aisearch_tool
+
+
+def test_tiered_cache_shares_disk_tier_between_instances(tmp_path):
+    """
+    Test that a value written by one cache instance (e.g. another worker process) is served
+    from the shared SQLite tier by a second instance, and that hits and misses are counted, also
+    in cache_events_total.
+    """
+    path = tmp_path / "shared.sqlite3"
+    misses_before = CACHE_EVENTS.value(cache="shared", event="misses")
+    writer = TieredCache("shared", ttl_seconds=60, disk_path=path)
+    reader = TieredCache("shared", ttl_seconds=60, disk_path=path)
+
+    assert reader.get("latest ai news") is None
+    writer.set("latest ai news", [{"url": "https://example.com"}])
+
+    assert reader.get("latest ai news") == [{"url": "https://example.com"}]
+    assert reader.get("latest ai news") == [{"url": "https://example.com"}]
+    stats = reader.stats.as_dict()
+    assert (stats["misses"], stats["hits_disk"], stats["hits_memory"]) == (1, 1, 1)
+    assert CACHE_EVENTS.value(cache="shared", event="misses") == misses_before + 1
+
+
+def test_tiered_cache_promotes_disk_hits_for_their_remaining_ttl(tmp_path, monkeypatch):
+    """
+    Test that a value read from the disk tier late in its life expires from the memory tier when
+    the disk entry does, instead of living for a fresh TTL in memory.
+    """
+    clock = [1_000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+    path = tmp_path / "shared.sqlite3"
+    TieredCache("ttl", ttl_seconds=60, disk_path=path).set("query", ["result"])
+
+    reader = TieredCache("ttl", ttl_seconds=60, disk_path=path)
+    clock[0] += 50
+    assert reader.get("query") == ["result"]
+    clock[0] += 5
+    assert reader.get("query") == ["result"]
+    clock[0] += 10
+    assert reader.get("query") is None
+    stats = reader.stats.as_dict()
+    assert (stats["hits_disk"], stats["hits_memory"], stats["misses"]) == (1, 1, 1)
+
+
+def test_sqlite_cache_expires_and_evicts(tmp_path):
+    """
+    Test TTL expiry and that eviction keeps only the newest rows within the entry and byte limits.
+    """
+    cache = SQLiteCache(tmp_path / "c.sqlite3", ttl_seconds=60, max_entries=3, max_bytes=25)
+    cache.set("expired", b"x", ttl_seconds=-1)
+    assert cache.get("expired") is None
+
+    for i in range(5):
+        cache.set(f"k{i}", b"0123456789")
+    cache.evict()
+
+    assert cache.get_many([f"k{i}" for i in range(5)]) == {"k3": b"0123456789", "k4": b"0123456789"}
+    assert cache.stats() == {"entries": 2, "bytes": 20}
+
+
+def test_serper_search_uses_cache_for_normalized_queries(tmp_path, monkeypatch):
+    """
+    Test that serper_search only calls the Serper API once for queries that differ in case or spacing.
+    """
+    calls = []
+
+    def fake_serper(query):
+        calls.append(query)
+        return [{"url": "https://example.com", "title": "Example", "snippet": "Snippet"}]
+
+    monkeypatch.setattr(aisearch_tool, "_serper_search", fake_serper)
+    monkeypatch.setattr(aisearch_tool, "serper_cache", TieredCache("serper", 60, disk_path=tmp_path / "s.sqlite3"))
+
+    first = aisearch_tool.serper_search("Latest AI news 2025-01-01")
+    second = aisearch_tool.serper_search("  latest   ai NEWS 2025-01-01 ")
+
+    assert first == second
+    assert calls == ["Latest AI news 2025-01-01"]
+
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+def test_reader_fetch_revalidates_stale_pages_with_etag(tmp_path, monkeypatch):
+    """
+    Test that a fresh page is served from the cache, and a stale one is revalidated with
+    If-None-Match so that a 304 answer returns the cached text without a download.
+    """
+    sent_headers = []
+
+    def fake_get(url, headers, timeout):
+        sent_headers.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, "# Page body", {"ETag": '"v1"'})
+
+    cache = PageCache(fresh_seconds=60, max_age_seconds=3600, max_bytes=1024 * 1024, path=tmp_path / "p.sqlite3")
+    monkeypatch.setattr(aisearch_tool, "reader_cache", cache)
+    monkeypatch.setattr(aisearch_tool, "get_http_session", lambda: SimpleNamespace(get=fake_get))
+
+    assert aisearch_tool.fetch_reader_content("https://example.com/a") == "# Page body"
+    assert aisearch_tool.fetch_reader_content("https://example.com/a") == "# Page body"
+    assert len(sent_headers) == 1
+
+    cache.fresh_seconds = 0
+    assert aisearch_tool.fetch_reader_content("https://example.com/a") == "# Page body"
+    assert sent_headers[-1]["If-None-Match"] == '"v1"'
+    stats = cache.stats.as_dict()
+    assert (stats["misses"], stats["hits"], stats["hits_revalidated"]) == (1, 1, 1)
+
+
+def test_reader_fetch_serves_stale_copy_when_revalidation_fails(tmp_path, monkeypatch):
+    """
+    Test that a stale page whose revalidation fails is served from the cache, marked stale, on the
+    first attempt instead of being retried; and that a disabled cache counts no misses.
+    """
+    responses = [FakeResponse(200, "# Page body", {"ETag": '"v1"'}), FakeResponse(503)]
+    calls = []
+
+    def fake_get(url, headers, timeout):
+        calls.append(url)
+        return responses.pop(0)
+
+    cache = PageCache(fresh_seconds=0, max_age_seconds=3600, max_bytes=1024 * 1024, path=tmp_path / "p.sqlite3")
+    monkeypatch.setattr(aisearch_tool, "reader_cache", cache)
+    monkeypatch.setattr(aisearch_tool, "get_http_session", lambda: SimpleNamespace(get=fake_get))
+
+    assert aisearch_tool.fetch_reader_content("https://example.com/a") == "# Page body"
+    stale = aisearch_tool.fetch_reader_content("https://example.com/a")
+    assert stale.startswith("[Stale cached copy from ") and stale.endswith("# Page body")
+    assert len(calls) == 2
+    assert cache.stats.as_dict()["hits_stale"] == 1
+
+    monkeypatch.setattr(aisearch_tool, "READER_CACHE_ENABLED", False)
+    responses.append(FakeResponse(200, "# Other page"))
+    assert aisearch_tool.fetch_reader_content("https://example.com/b") == "# Other page"
+    assert cache.stats.as_dict()["misses"] == 1
+
+
+def test_embed_texts_only_sends_cache_misses(tmp_path, monkeypatch):
+    """
+    Test that repeated texts are served from the float32 embedding cache and only new texts
+    are sent to Azure, once each.
+    """
+    requested = []
+
+    class FakeEmbeddings:
+        def create(self, model, **kwargs):
+            texts = kwargs["input"]
+            requested.append(list(texts))
+            return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text)), 1.0]) for text in texts])
+
+    monkeypatch.setattr(aisearch_tool, "get_azure_openai_client", lambda: SimpleNamespace(embeddings=FakeEmbeddings()))
+    monkeypatch.setattr(aisearch_tool, "embedding_cache", EmbeddingCache(path=tmp_path / "e.sqlite3"))
+
+    first = aisearch_tool.get_embedding(["alpha", "beta", "alpha"])
+    second = aisearch_tool.get_embedding(["beta", "gamma!"])
+
+    assert requested == [["alpha", "beta"], ["gamma!"]]
+    assert first == [[5.0, 1.0], [4.0, 1.0], [5.0, 1.0]]
+    assert second == [[4.0, 1.0], [6.0, 1.0]]
+    assert aisearch_tool.get_embedding("alpha") == [5.0, 1.0]
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -1,15 +1,19 @@
 #!/usr/bin/env python
+import uuid
+
 import pytest
+from langchain_openai.embeddings.azure import AzureOpenAIEmbeddings
 
-from app.services.vector_store import ChromaVectorStore
+from app.services.lexical_index import BM25Index, reciprocal_rank_fusion
+from app.services.vector_store import ChromaVectorStore, get_vector_store
 
 
-def test_local_chroma_store():
+def test_local_chroma_store(tmp_path):
     """
     Test that the local Chroma vector store returns a dictionary with a key "documents"
     that contains a list of documents.
     """
-    store = ChromaVectorStore(persist_directory=".chroma-local")
+    store = ChromaVectorStore(persist_directory=str(tmp_path))
     result = store.search_similar("latest research")
 
     # Assert that the result is a dictionary.
@@ -23,5 +27,110 @@ def test_local_chroma_store():
     assert isinstance(documents, list), "Expected 'documents' to be a list"
 
 
+def test_bm25_index_ranks_keyword_matches_and_rrf_merges_rankings():
+    """
+    Test that BM25 ranks documents by keyword relevance, drops non-matching ones, and that
+    reciprocal rank fusion rewards ids ranked well by both lists.
+    """
+    index = BM25Index()
+    index.add("a", "Quantum computing breakthrough announced")
+    index.add("b", "Weather report for the weekend")
+    index.add("c", "Quantum sensors and quantum computing roadmap")
+
+    assert [doc_id for doc_id, _ in index.search("quantum computing", k=3)] == ["c", "a"]
+    index.remove("c")
+    assert [doc_id for doc_id, _ in index.search("quantum", k=3)] == ["a"]
+
+    assert reciprocal_rank_fusion([["x", "y", "z"], ["y", "z", "x"]])[0] == "y"
+
+
+def test_search_similar_lexical_mode_skips_embeddings(monkeypatch):
+    """
+    Test that lexical and auto searches are answered from the keyword index without an
+    embedding call, while hybrid search still merges in the dense results.
+    """
+    monkeypatch.setattr(AzureOpenAIEmbeddings, "embed_documents", lambda self, texts: [[0.0, 0.1, 0.2] for _ in texts])
+    store = ChromaVectorStore(collection_name=f"test-{uuid.uuid4().hex}")
+    store.store_text("Quantum computing breakthrough announced")
+    store.store_text("Weather report for the weekend")
+
+    def no_embedding(self, text):
+        raise AssertionError("lexical search must not embed the query")
+
+    monkeypatch.setattr(AzureOpenAIEmbeddings, "embed_query", no_embedding)
+    assert store.search_similar("quantum", n_results=1, mode="lexical") == {
+        "documents": [["Quantum computing breakthrough announced"]]
+    }
+    assert store.search_similar("weekend weather", n_results=1, mode="auto") == {
+        "documents": [["Weather report for the weekend"]]
+    }
+
+    monkeypatch.setattr(AzureOpenAIEmbeddings, "embed_query", lambda self, text: [0.0, 0.1, 0.2])
+    hybrid = store.search_similar("quantum", n_results=2, mode="hybrid")
+    assert hybrid["documents"][0][0] == "Quantum computing breakthrough announced"
+    assert len(hybrid["documents"][0]) == 2
+
+
+def test_lexical_index_picks_up_chunks_written_by_another_store(tmp_path, monkeypatch):
+    """
+    Test that a keyword search sees chunks another process (here a second store on the same
+    directory) wrote after this store's BM25 index was built.
+    """
+    monkeypatch.setattr(AzureOpenAIEmbeddings, "embed_documents", lambda self, texts: [[0.0, 0.1, 0.2] for _ in texts])
+    collection = f"test-{uuid.uuid4().hex}"
+    reader = ChromaVectorStore(persist_directory=str(tmp_path), collection_name=collection)
+    writer = ChromaVectorStore(persist_directory=str(tmp_path), collection_name=collection)
+    reader.store_text("Quantum computing breakthrough announced")
+    assert reader.search_similar("batteries", n_results=1, mode="lexical") == {"documents": [[]]}
+
+    writer.store_text("Solid-state batteries reach the market")
+
+    assert reader.search_similar("batteries", n_results=1, mode="lexical") == {
+        "documents": [["Solid-state batteries reach the market"]]
+    }
+
+
+def test_get_vector_store_pools_stores_and_persists_to_directory(tmp_path, monkeypatch):
+    """
+    Test that the registry hands out one store per (directory, collection) and that the
+    collection is written under the given persist directory.
+    """
+    monkeypatch.setattr(AzureOpenAIEmbeddings, "embed_documents", lambda self, texts: [[0.0, 0.1, 0.2] for _ in texts])
+    store = get_vector_store(str(tmp_path))
+
+    assert get_vector_store(str(tmp_path)) is store
+    assert get_vector_store(str(tmp_path), collection_name="other") is not store
+
+    store.store_text("Persisted note about solid-state batteries")
+    assert any(tmp_path.iterdir())
+    assert store.search_similar("batteries", n_results=1, mode="lexical")["documents"][0] == [
+        "Persisted note about solid-state batteries"
+    ]
+
+
+def test_store_texts_chunks_long_texts_and_skips_duplicates(monkeypatch):
+    """
+    Test that a long text is split into several chunks embedded in one batch, and that
+    storing it again writes nothing because chunk ids are content hashes.
+    """
+    embedded = []
+
+    def fake_embed_documents(self, texts):
+        embedded.append(len(texts))
+        return [[0.0, 0.1, 0.2] for _ in texts]
+
+    monkeypatch.setattr(AzureOpenAIEmbeddings, "embed_documents", fake_embed_documents)
+    store = ChromaVectorStore(collection_name=f"test-{uuid.uuid4().hex}")
+    summary = "\n\n".join(f"Paragraph {i} of the aggregated summary. " * 20 for i in range(20))
+
+    first = store.store_texts([summary, "A short note"])
+    second = store.store_texts([summary])
+
+    assert first["written"] > 2 and first["skipped"] == 0
+    assert embedded == [first["written"]]
+    assert second == {"written": 0, "skipped": first["written"] - 1, "ids": first["ids"][:-1]}
+    assert len(store.db.get()["ids"]) == first["written"]
+
+
 if __name__ == "__main__":
     pytest.main()
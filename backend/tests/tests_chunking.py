@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+import numpy as np
+import pytest
+
+from app.services import chunking
+from app.services.chunking import mmr_select, sliding_window_chunks, spread_sample
+
+
+def test_sliding_window_chunks_cover_whole_document_with_overlap(monkeypatch):
+    """
+    Test that every paragraph, including ones far past the old 20-paragraph cut, lands in a
+    chunk, that windows repeat the previous tail, and that oversized paragraphs are split.
+    """
+    monkeypatch.setattr(chunking, "count_tokens", lambda text: len(text.split()))
+    paragraphs = [f"para{i} word" for i in range(30)]
+
+    chunks = sliding_window_chunks("\n\n".join(paragraphs), chunk_tokens=6, overlap_tokens=2)
+
+    assert all(any(p in chunk for chunk in chunks) for p in paragraphs)
+    assert chunks[0] == "para0 word\n\npara1 word\n\npara2 word"
+    assert chunks[1].startswith("para2 word")
+    assert all(len(chunk.split()) <= 6 for chunk in chunks)
+
+    monkeypatch.undo()
+    huge = sliding_window_chunks(" ".join(f"word{i}" for i in range(200)), chunk_tokens=50, overlap_tokens=10)
+    assert len(huge) > 1
+
+
+def test_mmr_select_prefers_diverse_chunks_within_budget():
+    """
+    Test that MMR skips a near-duplicate of an already selected chunk and never exceeds the budget.
+    """
+    query = np.array([1.0, 0.0, 0.0])
+    chunks = np.array([[1.0, 0.1, 0.0], [1.0, 0.11, 0.0], [0.7, 0.0, 0.7], [0.0, 1.0, 0.0]])
+
+    picked = mmr_select(query, chunks, [10, 10, 10, 10], token_budget=20, diversity=0.5)
+
+    assert picked == [0, 2]
+    assert mmr_select(query, chunks, [30, 30, 30, 30], token_budget=20) == []
+
+
+def test_spread_sample_keeps_chunks_from_the_whole_document():
+    """
+    Test that thinning a long document keeps its first and last chunks and evenly spaced ones
+    in between, in order, and leaves short documents untouched.
+    """
+    chunks = [f"chunk{i}" for i in range(10)]
+
+    assert spread_sample(chunks, 4) == ["chunk0", "chunk3", "chunk6", "chunk9"]
+    assert spread_sample(chunks, 10) == chunks
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+import pytest
+
+from app.services.compaction import compact_context, simhash
+from app.services.tokens import count_tokens
+from app.tools.summarize_tool import SummarizeTool
+from benchmarks.text import paragraph
+
+
+def research_output(sources: list[list[str]]) -> str:
+    blocks = [
+        f"URL: https://example.com/{i} | Title: Source {i} | Snippet: snippet {i}\nContent:\n"
+        + "\n\n".join(paragraphs)
+        + f"\n{'-' * 40}"
+        for i, paragraphs in enumerate(sources)
+    ]
+    return "\n".join(blocks)
+
+
+def test_compaction_removes_near_duplicate_paragraphs_across_sources():
+    """
+    Test that a syndicated paragraph (one word changed) and repeated boilerplate appear once,
+    while distinct paragraphs and every source's URL line are kept.
+    """
+    original = paragraph(1)
+    syndicated = original.removesuffix(".") + " today."
+    assert (simhash(original) ^ simhash(syndicated)).bit_count() <= 6
+    assert (simhash(original) ^ simhash(paragraph(2))).bit_count() > 6
+    boilerplate = "Subscribe to our newsletter."
+    text = research_output([[original, paragraph(2), boilerplate], [syndicated, paragraph(3), boilerplate]])
+
+    compacted = compact_context(text, token_budget=10_000)
+
+    assert compacted.duplicates_removed == 2
+    assert compacted.text.count(boilerplate) == 1
+    assert syndicated not in compacted.text
+    for kept in (original, paragraph(2), paragraph(3), "URL: https://example.com/0", "URL: https://example.com/1"):
+        assert kept in compacted.text
+    assert compacted.tokens_after < compacted.tokens_before
+
+
+def test_summarize_tool_trims_to_token_budget_keeping_every_source():
+    """
+    Test that SummarizeTool keeps the output near its token budget, keeps every source's
+    URL line and leading sentence, and leaves the kept sentences in their original order.
+    """
+    sources = [[" ".join(paragraph(100 * s + k, 40) for k in range(4)), paragraph(100 * s + 9, 120)] for s in range(5)]
+    text = research_output(sources)
+    assert count_tokens(text) > 1000
+
+    summary = SummarizeTool()._run(text, max_tokens=400)
+
+    assert count_tokens(summary) <= 440
+    for s in range(5):
+        assert f"URL: https://example.com/{s}" in summary
+        assert paragraph(100 * s, 40) in summary
+    positions = [summary.index(f"URL: https://example.com/{s}") for s in range(5)]
+    assert positions == sorted(positions)
+
+
+def test_compaction_counts_source_lines_against_the_budget():
+    """
+    Test that URL and separator lines count against the token budget: with more sources than
+    the budget can name, the output stays within it and the sources that fit keep their URL line.
+    """
+    sources = [[paragraph(s, 30)] for s in range(200)]
+    text = research_output(sources).replace("| Snippet:", "| Title: " + "long title " * 20 + "| Snippet:")
+
+    compacted = compact_context(text, token_budget=300)
+
+    assert compacted.tokens_after <= 300
+    assert "URL: https://example.com/0" in compacted.text
+    assert "URL: https://example.com/199" not in compacted.text
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+import inspect
+import threading
+import time
+
+import pytest
+from crewai import LLM, Agent, Crew, Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.tools import tool
+
+from crewai_config.crew import LatestAIResearchCrew
+from crewai_config.scheduler import DagCrew, critical_path, task_dependencies
+from crewai_config.tool_task import ToolTask
+
+
+def make_agent(role):
+    return Agent(role=role, goal=f"{role} goal", backstory=f"{role} backstory", llm=LLM(model="azure/gpt-4o"))
+
+
+def test_dag_crew_runs_independent_tasks_concurrently(monkeypatch):
+    """
+    Test that two tasks that only depend on the same upstream task run at the same time,
+    receive its output as context, and that the report names the slower branch as critical.
+    """
+    researcher, writer, archivist = make_agent("Researcher"), make_agent("Writer"), make_agent("Archivist")
+    research = Task(name="research", description="research", expected_output="notes", agent=researcher)
+    store = Task(name="store", description="store", expected_output="ok", agent=archivist, context=[research])
+    answer = Task(name="answer", description="answer", expected_output="md", agent=writer, context=[research])
+    delays = {"research": 0.05, "store": 0.2, "answer": 0.1}
+    overlap = threading.Barrier(2, timeout=2)
+    contexts = {}
+
+    def fake_execute_sync(self, agent=None, context=None, tools=None):
+        contexts[self.name] = context
+        if self.name != "research":
+            overlap.wait()  # Fails unless store and answer are running together
+        time.sleep(delays[self.name])
+        self.output = TaskOutput(description=self.description, raw=f"{self.name} done", agent=agent.role)
+        return self.output
+
+    monkeypatch.setattr(Task, "execute_sync", fake_execute_sync)
+    crew = DagCrew(agents=[researcher, writer, archivist], tasks=[research, store, answer])
+
+    result = crew.kickoff()
+
+    report = crew.schedule_report
+    assert result.raw == "answer done"
+    assert contexts["store"] == contexts["answer"] == "research done"
+    assert report["critical_path"] == ["research", "store"]
+    assert report["wall_ms"] < report["sequential_ms"]
+    assert report["tasks"]["answer"]["start_ms"] < report["tasks"]["store"]["end_ms"]
+
+
+def test_dag_crew_returns_without_waiting_for_background_tasks(monkeypatch):
+    """
+    Test that kickoff returns the answer while a background leaf task is still running, and that
+    the background task's result is processed once it finishes.
+    """
+    researcher, writer, archivist = make_agent("Researcher"), make_agent("Writer"), make_agent("Archivist")
+    research = Task(name="research", description="research", expected_output="notes", agent=researcher)
+    store = Task(name="store", description="store", expected_output="ok", agent=archivist, context=[research])
+    answer = Task(name="answer", description="answer", expected_output="md", agent=writer, context=[research])
+    release, processed = threading.Event(), threading.Event()
+
+    def fake_execute_sync(self, agent=None, context=None, tools=None):
+        if self.name == "store":
+            release.wait(timeout=5)
+        self.output = TaskOutput(description=self.description, raw=f"{self.name} done", agent=agent.role)
+        return self.output
+
+    def fake_process_task_result(self, task, output):
+        if task.name == "store":
+            processed.set()
+
+    monkeypatch.setattr(Task, "execute_sync", fake_execute_sync)
+    monkeypatch.setattr(DagCrew, "_process_task_result", fake_process_task_result)
+    crew = DagCrew(agents=[researcher, writer, archivist], tasks=[research, store, answer], background_tasks=["store"])
+
+    try:
+        result = crew.kickoff()
+        assert result.raw == "answer done" and not processed.is_set()
+        assert crew.schedule_report["background"] == ["store"]
+    finally:
+        release.set()
+    assert processed.wait(timeout=5)
+
+
+def test_crew_internals_used_by_dag_crew_are_unchanged():
+    """
+    Test that the private Crew helpers DagCrew calls still exist with the parameters it passes,
+    so a crewai upgrade that changes them fails here instead of at run time.
+    """
+    expected = {
+        "_get_agent_to_use": ["self", "task"],
+        "_prepare_tools": ["self", "agent", "task", "tools"],
+        "_log_task_start": ["self", "task", "role"],
+        "_get_context": ["self", "task", "task_outputs"],
+        "_process_task_result": ["self", "task", "output"],
+        "_store_execution_log": ["self", "task", "output", "task_index", "was_replayed"],
+        "_create_crew_output": ["self", "task_outputs"],
+        "_run_sequential_process": ["self"],
+    }
+
+    for name, parameters in expected.items():
+        assert list(inspect.signature(getattr(Crew, name)).parameters) == parameters, name
+
+
+def test_critical_path_follows_longest_chain():
+    """
+    Test dependency inference (context, else the previous task) and the critical path length.
+    """
+    tasks = [
+        Task(name="a", description="a", expected_output="a"),
+        Task(name="b", description="b", expected_output="b"),
+    ]
+    tasks.append(Task(name="c", description="c", expected_output="c", context=[tasks[0]]))
+
+    dependencies = task_dependencies(tasks)
+
+    assert dependencies == [set(), {0}, {0}]
+    assert critical_path(dependencies, [1.0, 3.0, 2.0]) == (4.0, [0, 1])
+
+
+def test_tool_task_calls_tool_on_context_without_llm(monkeypatch):
+    """
+    Test that a tool-only stage passes its upstream output straight to the tool, never asks
+    the agent, and still reports a completed step and runs its callback.
+    """
+    stored, steps, callbacks = [], [], []
+
+    @tool("remember_tool")
+    def remember_tool(text: str) -> str:
+        """Remember the given text."""
+        stored.append(text)
+        return "Text stored successfully"
+
+    def no_llm(*args, **kwargs):
+        raise AssertionError("tool-only stages must not call the agent")
+
+    monkeypatch.setattr(Agent, "execute_task", no_llm)
+    writer = make_agent("Writer")
+    summary = Task(name="summary", description="summary", expected_output="md", agent=writer)
+    summary.output = TaskOutput(description="summary", raw="# Summary", agent="Writer")
+    store = ToolTask(
+        name="store",
+        description="store",
+        expected_output="ok",
+        agent=writer,
+        context=[summary],
+        direct_tool=remember_tool,
+        step_callback=steps.append,
+        callback=callbacks.append,
+    )
+
+    output = store.execute_sync(context="# Summary")
+
+    assert stored == ["# Summary"]
+    assert output.raw == "Text stored successfully"
+    assert steps[0].task_name == "store" and steps[0].status == "completed"
+    assert callbacks == [output]
+    assert isinstance(LatestAIResearchCrew().store_task(), ToolTask)
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -4,12 +4,12 @@ import pytest
 from app.services.vector_store import ChromaVectorStore
 
 
-def test_embed_sample_sentence():
+def test_embed_sample_sentence(tmp_path):
     """
     Test embedding generation for a sample sentence, ensuring the embedding is a non-empty list
     of floats.
     """
-    store = ChromaVectorStore(persist_directory=".chroma-local")
+    store = ChromaVectorStore(persist_directory=str(tmp_path))
     sample_sentence = "This is a test sentence for embedding generation."
     embedding = store.embeddings.embed_query(sample_sentence)
 
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.fetch_scheduler import HostScheduler, interleave_by_host
+from app.services.urls import canonicalize_url, collapse_duplicates
+from app.tools.aisearch_tool import AISearchTool
+
+
+def test_search_results_collapse_tracking_amp_and_mirror_variants():
+    """
+    Test that tracking parameters, AMP/mobile variants and AMP cache mirrors of one article
+    collapse into its first result, which keeps its original URL, while URLs that differ in
+    content parameters stay apart.
+    """
+    article = "https://example.com/news/story"
+    variants = [
+        "https://www.example.com/news/story/?utm_source=feed&utm_medium=rss#comments",
+        "https://m.example.com/news/story/amp",
+        "https://example-com.cdn.ampproject.org/c/s/example.com/news/story",
+        "https://www.google.com/amp/s/www.example.com/news/story.amp?fbclid=abc",
+    ]
+    assert {canonicalize_url(url) for url in variants} == {article}
+    assert canonicalize_url("https://github.com/org/repo?ref=main") == "https://github.com/org/repo?ref=main"
+
+    results = [{"url": url, "title": f"T{i}", "snippet": "S"} for i, url in enumerate(variants)]
+    results.append({"url": "https://example.com/news/story?page=2", "title": "Page 2", "snippet": "S"})
+    collapsed, removed = collapse_duplicates(results)
+    assert removed == 3
+    assert [result["url"] for result in collapsed] == [variants[0], "https://example.com/news/story?page=2"]
+    assert [result["canonical_url"] for result in collapsed] == [article, "https://example.com/news/story?page=2"]
+    assert collapsed[0]["title"] == "T0" and collapsed[0]["aliases"] == variants[1:]
+
+    signed = "https://cdn.example.com/report.pdf?X-Amz-Signature=a%20b&X-Amz-Date=1"
+    assert collapse_duplicates([{"url": signed, "title": "R", "snippet": "S"}])[0][0]["url"] == signed
+
+    # max_links counts distinct pages.
+    limited = AISearchTool()._limit_results(results, max_links=2)
+    assert [result["url"] for result in limited] == [variants[0], "https://example.com/news/story?page=2"]
+
+
+def test_host_scheduler_limits_concurrency_and_spaces_starts_per_host():
+    """
+    Test that fetches to one host never exceed the per-host limit and start at least the
+    politeness delay apart, while another host is not held up by them.
+    """
+    scheduler = HostScheduler(max_per_host=2, delay_seconds=0.05)
+    lock = threading.Lock()
+    active, peak, starts = {}, {}, {}
+
+    def fetch(url):
+        with scheduler.slot(url):
+            host = url.split("/")[2]
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+                starts.setdefault(host, []).append(time.monotonic())
+            time.sleep(0.1)
+            with lock:
+                active[host] -= 1
+
+    urls = [f"https://busy.example/{i}" for i in range(5)] + ["https://other.example/0"]
+    ordered = interleave_by_host(urls)
+    assert ordered[:2] == ["https://busy.example/0", "https://other.example/0"]
+    began = time.monotonic()
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(fetch, ordered))
+
+    assert peak["busy.example"] == 2
+    gaps = [b - a for a, b in zip(starts["busy.example"], starts["busy.example"][1:])]
+    assert min(gaps) >= 0.045
+    assert starts["other.example"][0] - began < 0.05
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+import os
+from datetime import timedelta
+
+import django
+import pytest
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "crewai_backend.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from app.models import ResearchJob  # noqa: E402
+from app.services import job_queue  # noqa: E402
+
+
+@pytest.fixture(scope="module", autouse=True)
+def test_database():
+    # pytest-django is not a dependency, so create and drop the (in-memory sqlite) test database here.
+    old_name = connection.creation.create_test_db(verbosity=0)
+    yield
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@pytest.fixture(autouse=True)
+def job_settings():
+    with override_settings(RESEARCH_JOB_WORKERS=0, RESEARCH_JOB_MAX_ATTEMPTS=2, RESEARCH_JOB_LEASE_SECONDS=300):
+        yield
+    ResearchJob.objects.all().delete()
+
+
+def expire_lease(job):
+    ResearchJob.objects.filter(pk=job.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+
+def test_claim_next_job_hands_out_oldest_pending_job_once():
+    """
+    Test that jobs are claimed oldest first, each by a single worker, with a lease and an
+    attempt recorded, and that nothing is returned once every job is running.
+    """
+    first = job_queue.submit_job(ResearchJob.Kind.ANALYSIS, {"query": "first"})
+    second = job_queue.submit_job(ResearchJob.Kind.ANALYSIS, {"query": "second"})
+
+    claimed = job_queue.claim_next_job("worker-a")
+    assert claimed.pk == first.pk
+    assert claimed.state == ResearchJob.State.STARTED and claimed.worker_id == "worker-a"
+    assert claimed.attempts == 1 and claimed.lease_expires_at > timezone.now()
+
+    assert job_queue.claim_next_job("worker-b").pk == second.pk
+    assert job_queue.claim_next_job("worker-c") is None
+
+
+def test_expired_lease_is_reclaimed_until_attempts_run_out():
+    """
+    Test that a job whose worker stopped renewing its lease is claimed by another worker, that
+    the original worker can no longer renew or complete it, and that it fails once
+    RESEARCH_JOB_MAX_ATTEMPTS leases have expired.
+    """
+    job = job_queue.submit_job(ResearchJob.Kind.ANALYSIS, {"query": "stuck"})
+    job = job_queue.claim_next_job("worker-a")
+    expire_lease(job)
+
+    reclaimed = job_queue.claim_next_job("worker-b")
+    assert reclaimed.pk == job.pk and reclaimed.worker_id == "worker-b" and reclaimed.attempts == 2
+    assert not job_queue.renew_lease(job, "worker-a")
+    job_queue.complete_job(job, "worker-a", {"summary": "late"})
+    assert ResearchJob.objects.get(pk=job.pk).state == ResearchJob.State.STARTED
+
+    expire_lease(reclaimed)
+    assert job_queue.claim_next_job("worker-c") is None
+    abandoned = ResearchJob.objects.get(pk=job.pk)
+    assert abandoned.state == ResearchJob.State.FAILURE
+    assert "lease expired" in abandoned.error and abandoned.finished_at is not None
+
+
+def test_execute_job_records_success_and_failure(monkeypatch):
+    """
+    Test that execute_job stores the handler's result on success, and the exception and
+    traceback on failure, clearing the lease either way.
+    """
+
+    def handler(inputs):
+        if inputs["query"] == "broken":
+            raise RuntimeError("crew exploded")
+        return {"summary": inputs["query"]}
+
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, ResearchJob.Kind.ANALYSIS, handler)
+    job_queue.submit_job(ResearchJob.Kind.ANALYSIS, {"query": "works"})
+    job_queue.submit_job(ResearchJob.Kind.ANALYSIS, {"query": "broken"})
+
+    job_queue.execute_job(job_queue.claim_next_job("worker-a"), "worker-a")
+    job_queue.execute_job(job_queue.claim_next_job("worker-a"), "worker-a")
+
+    succeeded = ResearchJob.objects.get(inputs__query="works")
+    assert succeeded.state == ResearchJob.State.SUCCESS and succeeded.result == {"summary": "works"}
+    failed = ResearchJob.objects.get(inputs__query="broken")
+    assert failed.state == ResearchJob.State.FAILURE
+    assert failed.error.startswith("crew exploded") and "Traceback" in failed.error
+    assert succeeded.lease_expires_at is None and failed.lease_expires_at is None
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+import pytest
+from crewai import LLM
+
+from app.services.llm_cache import LLMResponseCache
+from crewai_config import agent_llm
+from crewai_config.agent_llm import AgentLLM
+
+
+def test_agent_llm_replays_cached_completions_per_agent(tmp_path, monkeypatch):
+    """
+    Test that a repeated call is answered from the cache, while another agent, other sampling
+    parameters or a function-calling request still reach the model; hits count tokens saved.
+    """
+    calls = []
+
+    def fake_call(self, messages, tools=None, callbacks=None, available_functions=None):
+        calls.append(self.agent_name)
+        return f"Final Answer: reply {len(calls)}"
+
+    cache = LLMResponseCache(path=tmp_path / "llm.sqlite3")
+    monkeypatch.setattr(LLM, "call", fake_call)
+    monkeypatch.setattr(agent_llm, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(agent_llm, "llm_cache", cache)
+    messages = [{"role": "user", "content": "Summarize the latest AI news."}]
+    researcher = AgentLLM("web_researcher", model="azure/gpt-4o", temperature=0)
+
+    assert researcher.call(messages) == "Final Answer: reply 1"
+    assert researcher.call(messages) == "Final Answer: reply 1"
+    assert AgentLLM("aggregator", model="azure/gpt-4o", temperature=0).call(messages) == "Final Answer: reply 2"
+    assert AgentLLM("web_researcher", model="azure/gpt-4o", temperature=0.7).call(messages) == "Final Answer: reply 3"
+    researcher.call(messages, available_functions={"search": print})
+    assert len(calls) == 4
+
+    stats = cache.stats.as_dict()
+    assert stats["hits"] == 1 and stats["misses"] == 3
+    assert stats["prompt_tokens_saved"] > 0 and stats["completion_tokens_saved"] > 0
+
+
+if __name__ == "__main__":
+    pytest.main()
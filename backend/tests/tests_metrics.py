@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from crewai import LLM
+
+from app.services.metrics import LLM_TOKENS, MetricsRegistry, timed, track_run
+from crewai_config.agent_llm import AgentLLM
+
+
+def test_registry_renders_prometheus_text():
+    """
+    Test that counters and histograms render as Prometheus text, with cumulative buckets,
+    +Inf, _sum and _count per label set.
+    """
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("endpoint",))
+    latency = registry.histogram("latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+    requests.inc(endpoint="chat")
+    requests.inc(2, endpoint="chat")
+    latency.observe(0.05, endpoint="chat")
+    latency.observe(0.5, endpoint="chat")
+    latency.observe(5, endpoint="chat")
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{endpoint="chat"} 3' in text
+    assert 'latency_seconds_bucket{endpoint="chat",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{endpoint="chat",le="1"} 2' in text
+    assert 'latency_seconds_bucket{endpoint="chat",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{endpoint="chat"} 3' in text
+    assert registry.counter("requests_total", "Requests.", ("endpoint",)) is requests
+    with pytest.raises(ValueError):
+        requests.inc(route="direct")
+
+
+def test_timed_records_outcome_and_run_timeline():
+    """
+    Test that timed() labels failures as errors and that spans from a thread pool reach the
+    run's timeline when submitted with a copy of the context.
+    """
+    registry = MetricsRegistry()
+    calls = registry.histogram("calls_seconds", "Calls.", ("source", "outcome"))
+
+    def fetch(url):
+        with timed(calls, "fetch", detail={"url": url}, source="network") as labels:
+            labels["source"] = "cache"
+
+    with track_run() as timeline:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, fetch, url) for url in ["a", "b"]]
+            [future.result() for future in futures]
+        with pytest.raises(RuntimeError), timed(calls, "search", source="api"):
+            raise RuntimeError("boom")
+    with timed(calls, "untracked", source="api"):
+        pass
+
+    assert calls.count(source="cache", outcome="ok") == 2
+    assert calls.count(source="api", outcome="error") == 1
+    stages = timeline.as_dict()["stages"]
+    assert sorted((stage["stage"], stage.get("url")) for stage in stages) == [
+        ("fetch", "a"),
+        ("fetch", "b"),
+        ("search", None),
+    ]
+
+
+def test_agent_llm_counts_completion_usage_per_agent(monkeypatch):
+    """
+    Test that AgentLLM counts the usage crewai passes to its callbacks under the agent's name,
+    and ignores litellm's own success events so tokens are not counted twice.
+    """
+    usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30, prompt_tokens_details=None)
+
+    def fake_call(self, messages, tools=None, callbacks=None, available_functions=None):
+        for callback in callbacks:
+            callback.log_success_event(kwargs={}, response_obj={"usage": usage}, start_time=0, end_time=0)
+            callback.log_success_event(kwargs={}, response_obj=SimpleNamespace(usage=usage), start_time=0, end_time=0)
+        return "Final Answer: done"
+
+    monkeypatch.setattr(LLM, "call", fake_call)
+    before = LLM_TOKENS.value(agent="token_meter_test", kind="prompt")
+
+    AgentLLM("token_meter_test", model="azure/gpt-4o").call("Summarize.", callbacks=[])
+
+    assert LLM_TOKENS.value(agent="token_meter_test", kind="prompt") == before + 120
+    assert LLM_TOKENS.value(agent="token_meter_test", kind="completion") == 30
+
+
+if __name__ == "__main__":
+    pytest.main()
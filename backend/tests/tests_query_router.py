@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+import pytest
+
+from app.services import research_runner
+from app.services.query_router import classify_query
+
+
+@pytest.mark.parametrize(
+    "message,route",
+    [
+        ("what is 12 * 7?", "direct"),
+        ("12 x 7", "direct"),
+        ("x", "research"),
+        ("what is 2025?", "research"),
+        ("hello!", "direct"),
+        ("What does idempotent mean?", "direct"),
+        ("What is the capital of France?", "direct"),
+        ("What is Python?", "direct"),
+        ("Explain how TCP works", "direct"),
+        ("What is GPT-5?", "research"),
+        ("What's new in iOS 18?", "research"),
+        ("What is Gemini?", "research"),
+        ("What is the latest news on OpenAI?", "research"),
+        ("Summarise https://example.com/post", "research"),
+        ("Compare vector databases for a production RAG system serving millions of users", "research"),
+    ],
+)
+def test_classify_query(message, route):
+    """
+    Test that arithmetic, greetings and short definitional questions go direct, while
+    time-sensitive, URL and open-ended messages, and questions about versioned products or AI models,
+    are researched. Ordinary capitalized names and bare numbers do not count as named entities or arithmetic.
+    """
+    assert classify_query(message).route == route
+
+
+def test_run_chat_direct_route_skips_crew(monkeypatch):
+    """
+    Test that a simple message is answered by DirectAnswerTool without building the crew,
+    that a client can force the research route, and that a failed direct answer falls back to research.
+    """
+    crews = []
+
+    class FakeCrew:
+        def __init__(self, inputs, run_id=None):
+            crews.append(inputs["query"])
+            self.run_id = run_id or "run"
+            self.final_answer = "researched"
+
+        def crew(self):
+            return self
+
+        def kickoff(self, inputs):
+            return "researched"
+
+    class FakeDirectAnswerTool:
+        answer = "Final Answer: 84"
+
+        def _run(self, query):
+            return self.answer
+
+    monkeypatch.setattr(research_runner, "LatestAIResearchCrew", FakeCrew)
+    monkeypatch.setattr(research_runner, "DirectAnswerTool", FakeDirectAnswerTool)
+    monkeypatch.setattr(research_runner, "_cached_answer", lambda *args: (None, None))
+    monkeypatch.setattr(research_runner, "_remember_answer", lambda *args: None)
+
+    direct = research_runner.run_chat({"message": "what is 12 * 7?"})
+    assert direct["result"] == "84" and "timings" in direct
+    assert direct["route"]["route"] == "direct" and direct["route"]["estimated_time_saved_ms"] > 0
+    assert crews == []
+
+    forced = research_runner.run_chat({"message": "what is 12 * 7?", "route": "research"})
+    assert forced["result"] == "researched"
+    assert (forced["route"]["route"], forced["route"]["classifier"]) == ("research", "request")
+    assert crews == ["what is 12 * 7?"]
+
+    FakeDirectAnswerTool.answer = "Final Answer: Service temporarily unavailable"
+    fallback = research_runner.run_chat({"message": "what is 12 * 7?"})
+    assert fallback["result"] == "researched"
+    assert fallback["route"]["reason"] == "direct answer failed"
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+import pytest
+
+from app.services.run_artifacts import RunArtifactStore
+
+
+def test_artifacts_are_scoped_to_their_run():
+    """
+    Test that two runs writing the same artifact names do not overwrite each other.
+    """
+    store = RunArtifactStore()
+    store.put("run-a", "research_task", "URL: https://a.example | Title: A | Snippet: a")
+    store.put("run-b", "research_task", "URL: https://b.example | Title: B | Snippet: b")
+    store.append("run-a", "steps", "step 1")
+
+    assert "a.example" in store.get("run-a", "research_task")
+    assert "b.example" in store.get("run-b", "research_task")
+    assert store.get("run-a", "steps") == ["step 1"]
+    assert store.get("run-b", "steps", []) == []
+
+
+def test_oldest_runs_are_evicted_and_debug_sink_is_optional(tmp_path):
+    """
+    Test that the store keeps at most max_runs runs and only writes files when a debug directory is set.
+    """
+    store = RunArtifactStore(max_runs=2, debug_dir=str(tmp_path))
+    for run_id in ["run-1", "run-2", "run-3"]:
+        store.put(run_id, "synthesize_task", f"answer for {run_id}")
+
+    assert store.get_run("run-1") == {}
+    assert store.get("run-3", "synthesize_task") == "answer for run-3"
+    assert (tmp_path / "run-3" / "synthesize_task.txt").read_text() == "answer for run-3"
+    assert RunArtifactStore().debug_path("run-1", "output_log.txt") is None
+
+
+if __name__ == "__main__":
+    pytest.main()
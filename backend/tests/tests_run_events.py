@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+import json
+import threading
+
+import pytest
+
+from app.services import run_events
+from app.services.run_events import RunEventBroker
+
+
+def test_subscriber_receives_history_and_live_events():
+    """
+    Test that a subscriber that connects mid-run first receives the events already published,
+    then the live ones, and that the stream ends at the terminal event.
+    """
+    broker = RunEventBroker()
+    broker.publish("run-1", "step", {"entry": "first"})
+
+    events = broker.subscribe("run-1", heartbeat_seconds=0.05)
+    assert next(events).data == {"entry": "first"}
+
+    def finish_run():
+        broker.publish("run-1", "search_links", {"links": [{"url": "https://example.com"}]})
+        broker.publish("run-1", "result", {"ok": True})
+
+    threading.Timer(0.1, finish_run).start()
+    received = [event for event in events if event is not None]
+
+    assert [event.type for event in received] == ["search_links", "result"]
+    assert [event.seq for event in received] == [1, 2]
+
+
+def test_events_are_isolated_per_run_and_closed_after_terminal():
+    """
+    Test that runs do not see each other's events and nothing is recorded after a run ends.
+    """
+    broker = RunEventBroker()
+    broker.publish("run-a", "step", {"entry": "a"})
+    broker.publish("run-b", "step", {"entry": "b"})
+    broker.publish("run-a", "error", {"error": "boom"})
+    broker.publish("run-a", "step", {"entry": "late"})
+
+    assert [event.data for event in broker.subscribe("run-a")] == [{"entry": "a"}, {"error": "boom"}]
+    assert broker.workflow("run-b") == ["b"]
+
+
+def test_workflow_is_bounded_and_mirrored_to_jsonl(tmp_path):
+    """
+    Test that each run keeps only its most recent events and that the optional JSON-lines sink
+    receives every event.
+    """
+    sink = tmp_path / "events.jsonl"
+    broker = RunEventBroker(max_events_per_run=3, jsonl_path=str(sink))
+    for i in range(5):
+        broker.publish("run-1", "step", {"entry": f"step {i}"})
+    broker.publish("run-1", "search_links", {"links": []})
+
+    assert broker.workflow("run-1") == ["step 3", "step 4"]
+    records = [json.loads(line) for line in sink.read_text().splitlines()]
+    assert [record["seq"] for record in records] == list(range(6))
+    assert records[0]["run_id"] == "run-1"
+
+
+def test_idle_runs_are_purged_even_without_a_terminal_event(monkeypatch):
+    """
+    Test that runs that never publish a result or error (a crew kicked off directly, a
+    subscription to an unknown id) are dropped once idle for the retention period, while a
+    run that is still publishing or being watched is kept.
+    """
+    clock = [100.0]
+    monkeypatch.setattr(run_events.time, "monotonic", lambda: clock[0])
+    broker = RunEventBroker(retention_seconds=60)
+    broker.publish("direct-kickoff", "step", {"entry": "orphaned"})
+    next(broker.subscribe("unknown-run", heartbeat_seconds=0.01))
+    broker.publish("active", "step", {"entry": "first"})
+    watcher = broker.subscribe("watched", heartbeat_seconds=0.01)
+    next(watcher)
+
+    clock[0] += 45
+    broker.publish("active", "step", {"entry": "second"})
+    clock[0] += 30
+    broker.publish("active", "step", {"entry": "third"})
+
+    assert set(broker._channels) == {"active", "watched"}
+    assert broker.workflow("direct-kickoff") == []
+
+
+if __name__ == "__main__":
+    pytest.main()